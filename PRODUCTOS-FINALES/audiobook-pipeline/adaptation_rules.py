@@ -0,0 +1,211 @@
+"""Motor de reglas de adaptacion (sustituciones regex) cargadas desde paquetes de idioma en rules/."""
+import functools
+import hashlib
+import json
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+
+RULES_DIR = Path(__file__).parent / 'rules'
+DEFAULT_LANGUAGE = 'es'
+LINE_SEPARATOR = '\n'     # Las reglas no cruzan saltos de linea: cada linea se procesa por separado
+
+_TEMPLATE_GROUP_RE = re.compile(r'\\(?:g<(\d+)>|(\d+))')
+
+
+@dataclass
+class Rule:
+    """
+    Sustitucion regex de un paquete de idioma.
+    
+    keywords son textos (en minusculas) de los que la regla necesita al
+    menos uno para poder aplicarse; trigger es una regex con la misma
+    funcion para reglas sin palabra fija. Una linea sin ninguno de ellos
+    no se procesa. Las reglas de stage 1 se aplican despues de las de
+    stage 0 (por ejemplo, juntar los espacios que deja una eliminacion).
+    """
+    name: str
+    pattern: str
+    replacement: str
+    group: str = ''
+    ignore_case: bool = False
+    keywords: Tuple[str, ...] = ()
+    trigger: Optional[str] = None
+    stage: int = 0
+
+
+class _Stage:
+    """Reglas de una etapa unidas en una sola regex (una alternativa con nombre por regla)."""
+    
+    def __init__(self, rules: Sequence[Rule]):
+        alternatives = []
+        self._templates: Dict[str, Tuple[str, bool]] = {}
+        group_index = 1
+        
+        for number, rule in enumerate(rules):
+            name = f"r{number}"
+            body = f"(?i:{rule.pattern})" if rule.ignore_case else rule.pattern
+            alternatives.append(f"(?P<{name}>{body})")
+            # Los grupos de la regla (\1, \2...) pasan a su numero dentro de la regex combinada
+            offset = group_index
+            template = _TEMPLATE_GROUP_RE.sub(
+                lambda m: f"\\g<{int(m.group(1) or m.group(2)) + offset}>", rule.replacement
+            )
+            self._templates[name] = (template, '\\' in template)
+            group_index += 1 + re.compile(rule.pattern).groups
+        
+        self.regex = re.compile('|'.join(alternatives))
+    
+    def _replace(self, match: re.Match) -> str:
+        template, has_groups = self._templates[match.lastgroup]
+        return match.expand(template) if has_groups else template
+    
+    def apply(self, text: str) -> str:
+        return self.regex.sub(self._replace, text)
+
+
+class RuleEngine:
+    """
+    Aplica todas las reglas de un paquete de idioma en una pasada por linea.
+    
+    Primero un prefiltro busca las palabras clave de todas las reglas en el
+    texto en minusculas (str.find, en C) y los triggers con una sola regex;
+    solo las lineas (parrafos, tras convertir las listas) con algun acierto
+    pasan por las regex combinadas, una por etapa. La mayoria no contienen
+    "figura", "pagina", "Dr." ni dobles espacios y se copian tal cual.
+    """
+    
+    def __init__(self, rules: Sequence[Rule], language: str = DEFAULT_LANGUAGE, version: str = ''):
+        self.rules = list(rules)
+        self.language = language
+        self.version = version
+        self.keywords = sorted({keyword.lower() for rule in self.rules for keyword in rule.keywords})
+        triggers = [rule.trigger for rule in self.rules if rule.trigger]
+        self._trigger_re = re.compile('|'.join(f"(?:{trigger})" for trigger in triggers)) if triggers else None
+        self._stages = [_Stage([rule for rule in self.rules if rule.stage == stage])
+                        for stage in sorted({rule.stage for rule in self.rules})]
+        
+        unfiltered = [rule.name for rule in self.rules if not rule.keywords and not rule.trigger]
+        if unfiltered:
+            raise ValueError(f"Reglas sin keywords ni trigger (no se pueden prefiltrar): {', '.join(unfiltered)}")
+    
+    def _hits(self, text: str, lowered: str) -> List[int]:
+        """Al menos una posicion por cada linea donde alguna regla podria aplicarse."""
+        hits = []
+        for keyword in self.keywords:
+            position = lowered.find(keyword)
+            while position != -1:
+                hits.append(position)
+                # El resto de la linea ya se va a procesar: saltar a la siguiente
+                line_end = lowered.find(LINE_SEPARATOR, position)
+                if line_end == -1:
+                    break
+                position = lowered.find(keyword, line_end)
+        
+        if self._trigger_re is not None:
+            match = self._trigger_re.search(text)
+            while match:
+                hits.append(match.start())
+                line_end = text.find(LINE_SEPARATOR, match.start())
+                if line_end == -1:
+                    break
+                match = self._trigger_re.search(text, line_end)
+        
+        return hits
+    
+    def _touched_lines(self, text: str) -> List[Tuple[int, int]]:
+        """Tramos (inicio, fin) de las lineas con algun acierto del prefiltro, en orden."""
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # Minusculas de otra longitud (caracteres como 'İ'): las posiciones no coinciden, se procesa todo
+            return [(0, len(text))]
+        spans = {}
+        for position in self._hits(text, lowered):
+            start = text.rfind(LINE_SEPARATOR, 0, position)
+            start = 0 if start == -1 else start + len(LINE_SEPARATOR)
+            if start not in spans:
+                end = text.find(LINE_SEPARATOR, position)
+                spans[start] = len(text) if end == -1 else end
+        return sorted(spans.items())
+    
+    def apply(self, text: str) -> str:
+        """
+        Aplica las reglas al texto, linea a linea: una pasada por etapa.
+        
+        En cada etapa todas las reglas se buscan a la vez (la coincidencia
+        mas a la izquierda gana, y a igual posicion la regla anterior del
+        paquete) sobre el texto original de la linea. Coincide con aplicar
+        cada regla con re.sub, en orden, salvo cuando una sustitucion crea
+        una coincidencia nueva al juntar dos trozos ("Dr.etc.", "Pagina
+        9como indica la imagen1"): la cadena de re.sub la veria con la
+        regla siguiente y aqui no se vuelve a buscar. Las reglas que deben
+        ver el resultado de otras van en una etapa posterior (stage).
+        """
+        spans = self._touched_lines(text)
+        if not spans:
+            return text
+        
+        pieces = []
+        last_end = 0
+        for start, end in spans:
+            line = text[start:end]
+            for stage in self._stages:
+                line = stage.apply(line)
+            pieces.append(text[last_end:start])
+            pieces.append(line)
+            last_end = end
+        pieces.append(text[last_end:])
+        return ''.join(pieces)
+    
+    def iter_apply(self, lines: Iterable[str]) -> Iterator[str]:
+        """
+        Version en stream de apply: recibe y devuelve lineas (sin el salto de linea).
+        
+        El prefiltro se hace linea a linea, asi los pasos de adaptacion se
+        encadenan como generadores sin reconstruir el texto entre ellos.
+        """
+        keywords = self.keywords
+        trigger_re = self._trigger_re
+        for line in lines:
+            lowered = line.lower()
+            if any(keyword in lowered for keyword in keywords) or (trigger_re is not None and trigger_re.search(line)):
+                for stage in self._stages:
+                    line = stage.apply(line)
+            yield line
+
+
+def rules_path(language: str = DEFAULT_LANGUAGE) -> Path:
+    """Ruta del paquete de reglas de un idioma (rules/<idioma>.json)."""
+    return RULES_DIR / f"{language}.json"
+
+
+@functools.lru_cache(maxsize=None)
+def load_rule_engine(language: str = DEFAULT_LANGUAGE, groups: Optional[Tuple[str, ...]] = None) -> RuleEngine:
+    """
+    Carga (una vez por proceso) el motor de reglas de un idioma.
+    
+    Args:
+        language: Paquete de reglas (rules/<idioma>.json)
+        groups: Solo las reglas de estos grupos ('visual', 'flow'...); None = todas
+    
+    Returns:
+        RuleEngine con version = hash del archivo de reglas (cambia al editarlo)
+    """
+    path = rules_path(language)
+    if not path.exists():
+        available = ', '.join(sorted(p.stem for p in RULES_DIR.glob('*.json')))
+        raise FileNotFoundError(f"No hay reglas de adaptacion para '{language}' (disponibles: {available})")
+    
+    raw = path.read_bytes()
+    data = json.loads(raw.decode('utf-8'))
+    rules = []
+    for entry in data['rules']:
+        entry = dict(entry, keywords=tuple(entry.get('keywords', ())))
+        rule = Rule(**entry)
+        if groups is None or rule.group in groups:
+            rules.append(rule)
+    
+    return RuleEngine(rules, language=data.get('language', language),
+                      version=hashlib.sha256(raw).hexdigest()[:16])
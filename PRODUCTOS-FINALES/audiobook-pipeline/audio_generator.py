@@ -7,6 +7,13 @@ import tempfile
 import os
 import time
 
+from duration_model import voice_profile
+
+
+DEFAULT_RATE = "+15%"  # Velocidad 1.15x
+# Perfil para calibrar la duracion (voz femenina en espanol elegida automaticamente)
+VOICE_PROFILE = voice_profile('edge', 'es-female', DEFAULT_RATE)
+
 
 async def get_spanish_female_voice() -> str:
     """Obtiene una voz femenina en español."""
@@ -47,7 +54,7 @@ async def get_spanish_female_voice() -> str:
     return spanish_female_voices[0].get('Name', spanish_female_voices[0].get('ShortName', ''))
 
 
-async def text_to_speech(text: str, output_path: str, voice_name: str = None, rate: str = "+15%", max_retries: int = 3, delay: float = 2.0) -> str:
+async def text_to_speech(text: str, output_path: str, voice_name: str = None, rate: str = DEFAULT_RATE, max_retries: int = 3, delay: float = 2.0) -> str:
     """
     Convierte texto a audio usando edge-tts con reintentos.
     
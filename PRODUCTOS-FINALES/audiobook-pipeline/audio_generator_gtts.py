@@ -6,14 +6,26 @@ import os
 from gtts import gTTS
 import time
 
+from duration_model import voice_profile
+from sentences import split_into_chunks
 
-def split_text_into_chunks(text: str, max_chars: int = 5000) -> list:
+
+PLAYBACK_SPEED = 1.15  # Equivalente a +15% de edge-tts
+VOICE_PROFILE = voice_profile('gtts', 'es', f"x{PLAYBACK_SPEED}")
+
+
+def split_text_into_chunks(text: str, max_chars: int = 5000, sentence_ends=None) -> list:
     """
     Divide el texto en chunks para evitar el limite de caracteres de gTTS.
     
+    Los cortes salen del indice de frases (sentences.split_into_chunks):
+    cada chunk termina en un final de frase, con las mismas reglas que el
+    resumen y la segmentacion.
+    
     Args:
         text: Texto a dividir
         max_chars: Maximo de caracteres por chunk (gTTS tiene limite de ~5000)
+        sentence_ends: Indice de frases del texto (el de la adaptacion; se calcula si falta)
     
     Returns:
         Lista de chunks de texto
@@ -21,31 +33,11 @@ def split_text_into_chunks(text: str, max_chars: int = 5000) -> list:
     if len(text) <= max_chars:
         return [text]
     
-    chunks = []
-    current_chunk = ""
-    
-    # Dividir por oraciones cuando sea posible
-    sentences = text.split('. ')
-    
-    for sentence in sentences:
-        # Si agregar esta oracion excede el limite
-        if len(current_chunk) + len(sentence) + 2 > max_chars and current_chunk:
-            chunks.append(current_chunk.strip())
-            current_chunk = sentence
-        else:
-            if current_chunk:
-                current_chunk += ". " + sentence
-            else:
-                current_chunk = sentence
-    
-    # Agregar ultimo chunk
-    if current_chunk:
-        chunks.append(current_chunk.strip())
-    
-    return chunks
+    return split_into_chunks(text, max_chars, sentence_ends)
 
 
-def text_to_speech_gtts(text: str, output_path: str, lang: str = 'es', slow: bool = False, max_retries: int = 3) -> str:
+def text_to_speech_gtts(text: str, output_path: str, lang: str = 'es', slow: bool = False, max_retries: int = 3,
+                        sentence_ends=None) -> str:
     """
     Convierte texto a audio usando gTTS (Google Text-to-Speech).
     
@@ -55,6 +47,7 @@ def text_to_speech_gtts(text: str, output_path: str, lang: str = 'es', slow: boo
         lang: Idioma (default: 'es' para espanol)
         slow: Si True, habla mas lento (default: False)
         max_retries: Numero maximo de reintentos
+        sentence_ends: Indice de frases del texto (sentences.sentence_ends), para los chunks
     
     Returns:
         Ruta del archivo de audio generado
@@ -67,7 +60,7 @@ def text_to_speech_gtts(text: str, output_path: str, lang: str = 'es', slow: boo
     output_dir.mkdir(parents=True, exist_ok=True)
     
     # Dividir texto en chunks si es muy largo (aumentar a 5000 para menos chunks)
-    text_chunks = split_text_into_chunks(text, max_chars=5000)
+    text_chunks = split_text_into_chunks(text, max_chars=5000, sentence_ends=sentence_ends)
     
     temp_files = []
     last_error = None
@@ -125,7 +118,7 @@ def text_to_speech_gtts(text: str, output_path: str, lang: str = 'es', slow: boo
                 combined_audio += segment
             
             # Aplicar velocidad 1.15x (equivalente a +15% de edge-tts)
-            combined_audio = combined_audio.speedup(playback_speed=1.15)
+            combined_audio = combined_audio.speedup(playback_speed=PLAYBACK_SPEED)
             
             # Exportar con compresion (96 kbps)
             combined_audio.export(output_path, format="mp3", bitrate="96k")
@@ -144,7 +137,8 @@ def text_to_speech_gtts(text: str, output_path: str, lang: str = 'es', slow: boo
                     pass
 
 
-def generate_chapter_audio_gtts(chapter_title: str, chapter_content: str, output_dir: Path, chapter_num: int, delay_between_chapters: float = 0.1) -> str:
+def generate_chapter_audio_gtts(chapter_title: str, chapter_content: str, output_dir: Path, chapter_num: int, delay_between_chapters: float = 0.1,
+                                sentence_ends=None) -> str:
     """
     Genera audio para un capitulo usando gTTS.
     
@@ -154,6 +148,7 @@ def generate_chapter_audio_gtts(chapter_title: str, chapter_content: str, output
         output_dir: Directorio de salida
         chapter_num: Numero de capitulo
         delay_between_chapters: Tiempo de espera entre capitulos (segundos)
+        sentence_ends: Indice de frases del capitulo adaptado (se calcula si falta)
     
     Returns:
         Ruta del archivo MP3 generado
@@ -172,7 +167,8 @@ def generate_chapter_audio_gtts(chapter_title: str, chapter_content: str, output
     output_path = output_dir / f"{chapter_prefix}.mp3"
     
     # Generar audio
-    text_to_speech_gtts(chapter_content, str(output_path), lang='es', slow=False, max_retries=3)
+    text_to_speech_gtts(chapter_content, str(output_path), lang='es', slow=False, max_retries=3,
+                        sentence_ends=sentence_ends)
     
     return str(output_path)
 
@@ -6,6 +6,13 @@ import os
 import pyttsx3
 import time
 
+from duration_model import voice_profile
+
+
+SPEECH_RATE = 170      # Palabras por minuto de pyttsx3 (default ~200)
+PLAYBACK_SPEED = 1.15  # Equivalente a +15% de edge-tts
+VOICE_PROFILE = voice_profile('pyttsx3', 'es', f"{SPEECH_RATE}x{PLAYBACK_SPEED}")
+
 
 def generate_chapter_audio_pyttsx3(chapter_title: str, chapter_content: str, output_dir: Path, chapter_num: int, delay_between_chapters: float = 0.1) -> str:
     """
@@ -58,7 +65,7 @@ def generate_chapter_audio_pyttsx3(chapter_title: str, chapter_content: str, out
         
         # Configurar velocidad (valores tipicos: 50-200, default ~200)
         # Reducir velocidad para mejor comprension
-        engine.setProperty('rate', 170)  # Similar a velocidad normal
+        engine.setProperty('rate', SPEECH_RATE)  # Similar a velocidad normal
         
         # Configurar volumen (0.0 a 1.0)
         engine.setProperty('volume', 1.0)
@@ -72,7 +79,7 @@ def generate_chapter_audio_pyttsx3(chapter_title: str, chapter_content: str, out
         audio = AudioSegment.from_wav(temp_wav_path)
         
         # Aplicar velocidad 1.15x (equivalente a edge-tts)
-        audio = audio.speedup(playback_speed=1.15)
+        audio = audio.speedup(playback_speed=PLAYBACK_SPEED)
         
         # Exportar con compresion (96 kbps)
         audio.export(str(output_path), format="mp3", bitrate="96k")
@@ -1,17 +1,31 @@
 """Script principal del pipeline de generacion de audiolibros."""
 import asyncio
+import itertools
+import os
 import click
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from tqdm import tqdm
 
-from pdf_extractor import extract_and_clean_pdf
-from chapter_detector import segment_text
-from narrative_adapter import adapt_for_audiobook
+from pdf_extractor import PDF_BACKENDS, extract_document, iter_pdf_pages, text_cache_key
+from pdf_ocr import DEFAULT_OCR_LANGUAGE
+from text_cache import TextCache
+from duration_model import DurationStats, audio_duration_seconds
+from chapter_detector import segment_text, segment_pages
+from text_headings import HEADING_SCORE_THRESHOLD
+from narrative_adapter import (
+    DEFAULT_ADAPTATION_CACHE_DIR, SUMMARY_REDUCTION, AdaptationMemo, adapt_for_audiobook_indexed, adapt_chapters,
+)
+from sentences import sentence_ends
 from audio_generator import generate_chapter_audio
 from audio_generator_gtts import generate_chapter_audio_gtts
 
 
-async def process_audiobook(pdf_path: str, output_dir: str = "output", tts_engine: str = "gtts"):
+async def process_audiobook(pdf_path: str, output_dir: str = "output", tts_engine: str = "gtts", workers: int = 1, stream: bool = False, use_cache: bool = True, backend: str = 'auto',
+                            strip_headers: bool = True, layout: bool = False, low_memory: bool = False,
+                            max_memory_mb: float = None, ocr_language: str = DEFAULT_OCR_LANGUAGE, ocr_workers: int = 0,
+                            heading_threshold: float = HEADING_SCORE_THRESHOLD, apply_summary: bool = True,
+                            jobs: int = 1):
     """Procesa un PDF completo y genera audiolibro."""
     # Usar carpeta output por defecto si no se especifica
     pdf_path_obj = Path(pdf_path)
@@ -21,8 +35,26 @@ async def process_audiobook(pdf_path: str, output_dir: str = "output", tts_engin
     if not pdf_path_obj.exists():
         raise FileNotFoundError(f"El archivo PDF no existe: {pdf_path}")
     
+    cache = TextCache() if use_cache else None
+    memo = AdaptationMemo(apply_summary=apply_summary) if use_cache else None
+    
+    # La deteccion de titulos por tipografia necesita las estadisticas de todo el libro
+    if stream and layout:
+        print("⚠️  --layout analiza todo el libro antes de segmentar: se ignora --stream")
+        stream = False
+    
+    # Con el texto ya en cache no hay extraccion que solapar: usar el modo normal
+    if stream and not (cache and cache.contains(text_cache_key(str(pdf_path_obj), cache, backend, strip_headers,
+                                                                  ocr_language))):
+        return await process_audiobook_stream(pdf_path_obj, output_path_obj, tts_engine, backend=backend,
+                                              strip_headers=strip_headers, ocr_language=ocr_language,
+                                              apply_summary=apply_summary, memo=memo)
+    
     print(f"📖 Extrayendo texto de: {pdf_path_obj.name}")
-    text = extract_and_clean_pdf(str(pdf_path_obj))
+    document = extract_document(str(pdf_path_obj), workers=workers, cache=cache, backend=backend,
+                                strip_headers=strip_headers, layout=layout, low_memory=low_memory,
+                                max_rss_mb=max_memory_mb, ocr_language=ocr_language, ocr_workers=ocr_workers)
+    text = document.text
     
     if not text.strip():
         raise ValueError("No se pudo extraer texto del PDF. Verifica que el PDF contenga texto.")
@@ -33,60 +65,250 @@ async def process_audiobook(pdf_path: str, output_dir: str = "output", tts_engin
     pdf_name = pdf_path_obj.stem  # Nombre sin extension
     
     print("\n📚 Detectando y segmentando capitulos...")
-    chapters = segment_text(text, pdf_title=pdf_name, min_audio_minutes=20, max_audio_minutes=60)
+    duration_stats = DurationStats()
+    words_per_minute = calibrated_words_per_minute(duration_stats, tts_engine, text, apply_summary)
+    chapters = segment_text(text, pdf_title=pdf_name, min_audio_minutes=20, max_audio_minutes=60,
+                            outline=document.outline if layout else None, bookmarks=document.bookmarks,
+                            words_per_minute=words_per_minute, heading_threshold=heading_threshold)
     
     if not chapters:
         raise ValueError("No se pudieron detectar o crear capitulos.")
     
     print(f"✅ {len(chapters)} capitulo(s) detectado(s)")
     for i, chapter in enumerate(chapters, 1):
-        word_count = len(chapter.content.split())
-        estimated_minutes = word_count / 173  # palabras por minuto a 1.15x
+        word_count = chapter.word_count
+        estimated_minutes = word_count / words_per_minute
         # Mostrar primeras palabras para verificar que cada parte es diferente
-        first_words = chapter.content.split()[:5]
+        first_words = chapter.content.split(maxsplit=5)[:5]
         preview = ' '.join(first_words)
         print(f"   {i}. {chapter.title} (~{estimated_minutes:.1f} min, {word_count} palabras) | Inicia: '{preview}...'")
     
     print("\n✍️  Adaptando texto para audiolibro...")
-    adapted_chapters = []
-    for chapter in tqdm(chapters, desc="Adaptando capitulos"):
-        # Desactivar resumen para MVP (mas rapido, menos procesamiento)
-        adapted_content = adapt_for_audiobook(chapter.content, apply_summary=False)
-        adapted_chapters.append((chapter.title, adapted_content))
+    adapted_chapters = adapt_chapters_in_pool(chapters, apply_summary=apply_summary, jobs=jobs, memo=memo)
+    source_sizes = [(chapter.char_count, chapter.word_count) for chapter in chapters]
     
     print("\n🎙️  Generando archivos de audio...")
     print(f"   Usando motor: {tts_engine.upper()}")
-    generated_files = []
+    generated_files = await generate_audio_files(adapted_chapters, output_path_obj, tts_engine, duration_stats,
+                                                 source_sizes, apply_summary)
     
-    # Seleccionar funcion de generacion de audio
+    print("\n🎉 ¡Proceso completado!")
+    print(f"📁 Archivos generados en: {output_path_obj.absolute()}")
+    print(f"📊 Total de archivos: {len(generated_files)}")
+    if memo is not None:
+        print(f"🧠 Adaptacion en cache: {memo.report()}")
+    
+    return generated_files
+
+
+async def process_audiobook_stream(pdf_path_obj: Path, output_path_obj: Path, tts_engine: str = "gtts", backend: str = 'auto',
+                                   strip_headers: bool = True, ocr_language: str = DEFAULT_OCR_LANGUAGE,
+                                   apply_summary: bool = True, memo: AdaptationMemo = None):
+    """
+    Procesa el PDF en streaming: paginas -> partes -> adaptacion -> audio.
+    
+    Cada parte se sintetiza en cuanto se completa, mientras las paginas
+    siguientes aun no se han leido. La memoria queda acotada a una parte.
+    """
+    print(f"📖 Extrayendo texto en streaming de: {pdf_path_obj.name}")
+    pages = iter_pdf_pages(str(pdf_path_obj), backend=backend, strip_headers=strip_headers, ocr_language=ocr_language)
+    duration_stats = DurationStats()
+    words_per_minute = calibrated_words_per_minute(duration_stats, tts_engine, apply_summary=apply_summary)
+    chapters = segment_pages(pages, pdf_title=pdf_path_obj.stem, words_per_minute=words_per_minute)
+    
+    first_chapter = next(chapters, None)
+    if first_chapter is None:
+        raise ValueError("No se pudo extraer texto del PDF. Verifica que el PDF contenga texto.")
+    
+    source_sizes = []
+    chapters = _record_source_sizes(itertools.chain([first_chapter], chapters), source_sizes)
+    adapted_chapters = adapt_chapters(chapters, apply_summary=apply_summary, memo=memo)
+    
+    print("\n🎙️  Generando archivos de audio a medida que se extrae el texto...")
+    print(f"   Usando motor: {tts_engine.upper()}")
+    generated_files = await generate_audio_files(adapted_chapters, output_path_obj, tts_engine, duration_stats,
+                                                 source_sizes, apply_summary)
+    
+    print("\n🎉 ¡Proceso completado!")
+    print(f"📁 Archivos generados en: {output_path_obj.absolute()}")
+    print(f"📊 Total de archivos: {len(generated_files)}")
+    if memo is not None:
+        print(f"🧠 Adaptacion en cache: {memo.report()}")
+    
+    return generated_files
+
+
+def _record_source_sizes(chapters, source_sizes: list):
+    """Deja pasar los capitulos y anota (caracteres, palabras) de cada uno en source_sizes al leerlo."""
+    for chapter in chapters:
+        source_sizes.append((chapter.char_count, chapter.word_count))
+        yield chapter
+
+
+def select_tts_engine(tts_engine: str):
+    """
+    Devuelve (funcion de generacion, es_async, usa_indice_de_frases) para el motor TTS indicado.
+    
+    Los motores que parten el texto en chunks (gTTS) reciben el indice de
+    frases del capitulo adaptado en el argumento sentence_ends.
+    """
     if tts_engine.lower() == 'pyttsx3':
         from audio_generator_pyttsx3 import generate_chapter_audio_pyttsx3
-        generate_func = generate_chapter_audio_pyttsx3
-        is_async = False
+        return generate_chapter_audio_pyttsx3, False, False
     elif tts_engine.lower() == 'gtts':
         from audio_generator_gtts import generate_chapter_audio_gtts
-        generate_func = generate_chapter_audio_gtts
-        is_async = False
+        return generate_chapter_audio_gtts, False, True
     else:
         from audio_generator import generate_chapter_audio
-        generate_func = generate_chapter_audio
-        is_async = True
+        return generate_chapter_audio, True, False
+
+
+def tts_voice_profile(tts_engine: str, apply_summary: bool = False) -> str:
+    """
+    Perfil (motor, voz, velocidad) del motor TTS para las estadisticas de duracion.
+    
+    La calibracion relaciona el texto original con el audio, asi que con
+    resumen (que quita SUMMARY_REDUCTION de las frases) el perfil es otro.
+    """
+    if tts_engine.lower() == 'pyttsx3':
+        from audio_generator_pyttsx3 import VOICE_PROFILE
+    elif tts_engine.lower() == 'gtts':
+        from audio_generator_gtts import VOICE_PROFILE
+    else:
+        from audio_generator import VOICE_PROFILE
+    if apply_summary:
+        return f"{VOICE_PROFILE}|resumen-{SUMMARY_REDUCTION}"
+    return VOICE_PROFILE
+
+
+def adapt_chapters_in_pool(chapters: list, apply_summary: bool = True, jobs: int = 1,
+                           memo: AdaptationMemo = None) -> list:
+    """
+    Adapta los capitulos (adapt_for_audiobook_indexed) en un pool de procesos.
+    
+    Cada capitulo es independiente, asi que se reparten entre `jobs`
+    procesos y la barra avanza al terminar cada uno; el resultado se
+    devuelve en el orden de los capitulos y es identico al modo serial.
+    
+    Con memo, los capitulos ya adaptados se leen de disco (y se indexan una
+    vez) y solo los demas pasan por el pool; sus resultados se guardan al
+    terminar cada uno.
+    
+    Args:
+        chapters: Capitulos (objetos con title y content)
+        apply_summary: Aplicar el resumen moderado
+        jobs: Procesos (1 = modo serial, 0 = uno por CPU)
+        memo: Cache de capitulos adaptados (None = adaptar todos)
+    
+    Returns:
+        Lista de (titulo, texto adaptado, indice de frases del texto adaptado)
+    """
+    adapted = [None] * len(chapters)
+    keys = [None] * len(chapters)
+    if memo is not None:
+        for index, chapter in enumerate(chapters):
+            keys[index] = memo.key(chapter.content)
+            content = memo.get(keys[index])
+            if content is not None:
+                adapted[index] = content, sentence_ends(content)
+    pending = [index for index, result in enumerate(adapted) if result is None]
+    
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+    jobs = min(jobs, len(pending))
+    
+    progress = tqdm(total=len(chapters), initial=len(chapters) - len(pending),
+                    desc=f"Adaptando capitulos ({jobs} procesos)" if jobs > 1 else "Adaptando capitulos")
+    with progress:
+        if jobs <= 1:
+            for index in pending:
+                adapted[index] = adapt_for_audiobook_indexed(chapters[index].content, apply_summary=apply_summary)
+                if memo is not None:
+                    memo.put(keys[index], adapted[index][0])
+                progress.update()
+        else:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                futures = {executor.submit(adapt_for_audiobook_indexed, chapters[index].content, apply_summary): index
+                           for index in pending}
+                for future in as_completed(futures):
+                    index = futures[future]
+                    adapted[index] = future.result()
+                    if memo is not None:
+                        memo.put(keys[index], adapted[index][0])
+                    progress.update()
+    
+    return [(chapter.title, content, ends) for chapter, (content, ends) in zip(chapters, adapted)]
+
+
+def calibrated_words_per_minute(duration_stats: DurationStats, tts_engine: str, text: str = None,
+                                apply_summary: bool = True) -> float:
+    """Ritmo de lectura para segmentar: el medido en ejecuciones anteriores con el mismo motor (y resumen), o el fijo."""
+    profile = tts_voice_profile(tts_engine, apply_summary)
+    words_per_minute = duration_stats.words_per_minute(profile, text)
+    stats = duration_stats.get(profile)
+    if stats is None:
+        print(f"   ⏱️  Duracion sin calibrar para {profile}: {words_per_minute:.0f} palabras/min")
+    else:
+        print(f"   ⏱️  Duracion calibrada para {profile}: {stats.chars_per_second:.1f} caracteres/s "
+              f"({stats.seconds / 3600:.1f} h medidas) -> {words_per_minute:.0f} palabras/min")
+    return words_per_minute
+
+
+async def generate_audio_files(adapted_chapters, output_path_obj: Path, tts_engine: str,
+                               duration_stats: DurationStats = None, source_sizes: list = None,
+                               apply_summary: bool = True) -> list:
+    """
+    Genera un MP3 por capitulo adaptado.
+    
+    adapted_chapters puede ser una lista o un generador de tuplas
+    (titulo, contenido, indice de frases del contenido); en el segundo caso
+    se consume de forma perezosa. El indice pasa a los motores que parten el
+    texto en chunks, que asi no vuelven a buscar los finales de frase.
+    Con duration_stats se mide la duracion de cada MP3 y al final se guarda
+    la relacion caracteres -> segundos del motor para calibrar la
+    segmentacion de las siguientes ejecuciones.
+    
+    La segmentacion mide el texto del libro, no el adaptado (que el resumen
+    acorta), asi que se calibra con source_sizes: (caracteres, palabras) del
+    texto original de cada capitulo, en el mismo orden. Puede ser una lista
+    que crece a medida que se leen los capitulos (modo streaming). Sin
+    source_sizes se usa el texto enviado a TTS.
+    """
+    generated_files = []
+    measured_chars = measured_words = 0
+    measured_seconds = 0.0
+    
+    # Seleccionar funcion de generacion de audio
+    generate_func, is_async, uses_sentence_index = select_tts_engine(tts_engine)
     
-    for i, (title, content) in enumerate(tqdm(adapted_chapters, desc="Generando audio"), 1):
+    for i, (title, content, ends) in enumerate(tqdm(adapted_chapters, desc="Generando audio"), 1):
         try:
+            extra = {'sentence_ends': ends} if uses_sentence_index else {}
             if is_async:
-                output_file = await generate_func(title, content, output_path_obj, i)
+                output_file = await generate_func(title, content, output_path_obj, i, **extra)
             else:
-                output_file = generate_func(title, content, output_path_obj, i)
+                output_file = generate_func(title, content, output_path_obj, i, **extra)
             generated_files.append(output_file)
             print(f"   ✅ {Path(output_file).name}")
         except Exception as e:
             print(f"   ❌ Error en {title}: {e}")
             continue
+        
+        if duration_stats is not None:
+            seconds = audio_duration_seconds(output_file)
+            if seconds:
+                chars, words = source_sizes[i - 1] if source_sizes is not None else (len(content), len(content.split()))
+                measured_chars += chars
+                measured_words += words
+                measured_seconds += seconds
     
-    print(f"\n🎉 ¡Proceso completado!")
-    print(f"📁 Archivos generados en: {output_path_obj.absolute()}")
-    print(f"📊 Total de archivos: {len(generated_files)}")
+    if duration_stats is not None and measured_seconds > 0:
+        profile = tts_voice_profile(tts_engine, apply_summary)
+        stats = duration_stats.record(profile, measured_chars, measured_words, measured_seconds)
+        duration_stats.save()
+        print(f"   ⏱️  Duracion medida: {measured_seconds / 60:.1f} min para {measured_chars} caracteres "
+              f"({measured_chars / measured_seconds:.1f} caracteres/s); calibracion de {profile}: "
+              f"{stats.chars_per_second:.1f} caracteres/s")
     
     return generated_files
 
@@ -96,8 +318,45 @@ async def process_audiobook(pdf_path: str, output_dir: str = "output", tts_engin
 @click.option('--output', '-o', default='output', help='Carpeta de salida para los MP3')
 @click.option('--tts', default='pyttsx3', type=click.Choice(['pyttsx3', 'gtts', 'edge'], case_sensitive=False), 
               help='Motor de texto a voz: pyttsx3 (offline, rapido, recomendado), gtts (Google) o edge (Microsoft)')
-def main(pdf_path: str, output: str, tts: str):
+@click.option('--workers', '-w', default=1, type=int, show_default=True,
+              help='Procesos para extraer el PDF en paralelo (0 = uno por CPU)')
+@click.option('--stream', is_flag=True, default=False,
+              help='Procesa el PDF pagina a pagina: cada parte pasa a TTS sin esperar a que termine la extraccion')
+@click.option('--no-cache', 'no_cache', is_flag=True, default=False,
+              help='No usar la cache de texto extraido ni la de capitulos adaptados (siempre vuelve a leer el PDF y adaptar)')
+@click.option('--clear-cache', 'clear_cache', is_flag=True, default=False,
+              help='Vacia la cache de texto extraido y la de capitulos adaptados y termina')
+@click.option('--backend', default='auto', type=click.Choice(['auto'] + list(PDF_BACKENDS), case_sensitive=False),
+              show_default=True, help='Motor de extraccion de PDF: auto (el mas rapido instalado), pymupdf o pdfplumber')
+@click.option('--keep-headers', 'keep_headers', is_flag=True, default=False,
+              help='No eliminar cabeceras, pies y numeros de pagina repetidos')
+@click.option('--layout', is_flag=True, default=False,
+              help='Detecta los titulos por tamano de letra y negrita y corta los capitulos en ellos')
+@click.option('--low-memory', 'low_memory', is_flag=True, default=False,
+              help='Lee el PDF por ventanas de paginas y guarda el texto en disco: memoria acotada en libros enormes')
+@click.option('--max-memory', 'max_memory', type=int, default=None,
+              help='Limite de memoria en MB para la extraccion (implica --low-memory)')
+@click.option('--no-ocr', 'no_ocr', is_flag=True, default=False,
+              help='No hacer OCR de las paginas escaneadas (solo imagen)')
+@click.option('--ocr-lang', 'ocr_lang', default=DEFAULT_OCR_LANGUAGE, show_default=True,
+              help='Idioma(s) de Tesseract para el OCR, por ejemplo spa o spa+eng')
+@click.option('--ocr-workers', 'ocr_workers', default=0, type=int, show_default=True,
+              help='Procesos de OCR en paralelo (0 = uno por CPU)')
+@click.option('--heading-threshold', 'heading_threshold', default=HEADING_SCORE_THRESHOLD, type=float, show_default=True,
+              help='Puntuacion minima de un titulo detectado por rasgos del texto (mas alta = menos capitulos)')
+@click.option('--summary/--no-summary', 'summary', default=True, show_default=True,
+              help='Resumen moderado: quita el 15% de las frases menos relevantes de cada capitulo')
+@click.option('--jobs', '-j', default=1, type=int, show_default=True,
+              help='Procesos para adaptar los capitulos en paralelo (0 = uno por CPU; no aplica a --stream)')
+def main(pdf_path: str, output: str, tts: str, workers: int, stream: bool, no_cache: bool, clear_cache: bool, backend: str,
+         keep_headers: bool, layout: bool, low_memory: bool, max_memory: int, no_ocr: bool, ocr_lang: str, ocr_workers: int,
+         heading_threshold: float, summary: bool, jobs: int):
     """Genera audiolibro desde un PDF."""
+    if clear_cache:
+        removed = TextCache().clear() + TextCache(DEFAULT_ADAPTATION_CACHE_DIR).clear()
+        print(f"🧹 Cache vaciada: {removed} entrada(s) eliminada(s)")
+        return
+    
     # Si no se especifica PDF, buscar en carpeta input
     if pdf_path is None:
         input_dir = Path('input')
@@ -128,7 +387,13 @@ def main(pdf_path: str, output: str, tts: str):
         output = str(output_dir)
     
     try:
-        asyncio.run(process_audiobook(pdf_path, output, tts))
+        asyncio.run(process_audiobook(pdf_path, output, tts, workers=workers, stream=stream,
+                                     use_cache=not no_cache, backend=backend.lower(),
+                                     strip_headers=not keep_headers, layout=layout,
+                                     low_memory=low_memory, max_memory_mb=max_memory,
+                                     ocr_language=None if no_ocr else ocr_lang, ocr_workers=ocr_workers,
+                                     heading_threshold=heading_threshold, apply_summary=summary,
+                                     jobs=jobs))
     except KeyboardInterrupt:
         print("\n\n⚠️  Proceso cancelado por el usuario")
     except Exception as e:
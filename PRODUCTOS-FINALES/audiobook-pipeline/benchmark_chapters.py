@@ -0,0 +1,167 @@
+"""Benchmark de split_long_chapter/combine_small_chapters: escalado con el numero de secciones."""
+import random
+import time
+from dataclasses import dataclass
+from typing import List
+
+import click
+
+from chapter_detector import Chapter, combine_small_chapters, split_long_chapter
+from benchmark_clean_text import SAMPLE_WORDS
+
+
+WORDS_PER_MINUTE = 173  # Con velocidad 1.15x
+
+
+@dataclass
+class TextChapter:
+    """Capitulo con copia de su texto, como el Chapter original."""
+    title: str
+    content: str
+    start_index: int
+    end_index: int
+
+
+def split_long_chapter_original(chapter: TextChapter, max_words: int) -> List[TextChapter]:
+    """Implementacion original de split_long_chapter (vuelve a partir cada parrafo), como referencia."""
+    words = chapter.content.split()
+    if len(words) <= max_words:
+        return [chapter]
+    
+    parts = []
+    current_part = []
+    current_word_count = 0
+    part_num = 1
+    
+    separator = '\n\n'
+    paragraphs = chapter.content.split(separator)
+    if max(len(para.split()) for para in paragraphs) > max_words:
+        separator = '\n'
+        paragraphs = chapter.content.split(separator)
+    
+    for para in paragraphs:
+        para_word_count = len(para.split())
+        if current_word_count + para_word_count > max_words and current_part:
+            parts.append(TextChapter(f"{chapter.title} - Parte {part_num}", separator.join(current_part),
+                                     chapter.start_index, chapter.end_index))
+            current_part = [para]
+            current_word_count = para_word_count
+            part_num += 1
+        else:
+            current_part.append(para)
+            current_word_count += para_word_count
+    
+    if current_part:
+        parts.append(TextChapter(f"{chapter.title} - Parte {part_num}", separator.join(current_part),
+                                 chapter.start_index, chapter.end_index))
+    return parts
+
+
+def combine_small_chapters_original(chapters: List[TextChapter], min_words: int) -> List[TextChapter]:
+    """Implementacion original de combine_small_chapters (concatena el texto en cada union), como referencia."""
+    combined = []
+    current_chapter = None
+    current_words = 0
+    
+    for chapter in chapters:
+        chapter_words = len(chapter.content.split())
+        if current_chapter is None:
+            current_chapter = chapter
+            current_words = chapter_words
+        elif current_words + chapter_words < min_words:
+            combined_title = current_chapter.title
+            if chapter.title != current_chapter.title:
+                combined_title = f"{current_chapter.title} y {chapter.title}"
+            current_chapter = TextChapter(combined_title, current_chapter.content + "\n\n" + chapter.content,
+                                          current_chapter.start_index, chapter.end_index)
+            current_words += chapter_words
+        else:
+            combined.append(current_chapter)
+            current_chapter = chapter
+            current_words = chapter_words
+    
+    if current_chapter:
+        combined.append(current_chapter)
+    return combined
+
+
+def generate_sections(count: int, seed: int = 0) -> tuple:
+    """
+    Genera un libro de `count` secciones y sus posiciones.
+    
+    La mayoria son secciones muy cortas (3-40 palabras, como los apartados
+    de un manual o las entradas de un glosario): cientos de ellas se
+    combinan en cada parte. Una de cada 500 es un capitulo largo que hay
+    que dividir.
+    
+    Returns:
+        (texto, lista de (titulo, inicio, fin))
+    """
+    rng = random.Random(seed)
+    pieces = []
+    sections = []
+    position = 0
+    
+    for i in range(count):
+        long_chapter = i % 500 == 0
+        paragraphs = rng.randint(200, 400) if long_chapter else rng.randint(1, 2)
+        body = '\n\n'.join(
+            ' '.join(rng.choice(SAMPLE_WORDS) for _ in range(rng.randint(30, 80) if long_chapter else rng.randint(3, 20)))
+            for _ in range(paragraphs)
+        )
+        sections.append((f"Seccion {i + 1}", position, position + len(body)))
+        pieces.append(body)
+        position += len(body) + 2
+    
+    return '\n\n'.join(pieces), sections
+
+
+def best_time(func, repeat: int):
+    """Ejecuta func() varias veces y devuelve (mejor tiempo, resultado)."""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start_time)
+    return min(timings), result
+
+
+@click.command()
+@click.option('--sections', '-s', default='100,1000,10000', show_default=True,
+              help='Numeros de secciones a probar (separados por comas)')
+@click.option('--min-minutes', default=20, type=int, show_default=True, help='Duracion minima de cada parte')
+@click.option('--max-minutes', default=60, type=int, show_default=True, help='Duracion maxima de cada parte')
+@click.option('--repeat', '-r', default=3, type=int, show_default=True, help='Repeticiones (se toma la mejor)')
+@click.option('--seed', default=0, type=int, show_default=True, help='Semilla del generador')
+def main(sections, min_minutes, max_minutes, repeat, seed):
+    """Compara dividir y combinar secciones con la implementacion original y muestra el escalado."""
+    min_words = min_minutes * WORDS_PER_MINUTE
+    max_words = max_minutes * WORDS_PER_MINUTE
+    
+    print(f"{'secciones':>10} {'palabras':>10} {'original':>10} {'lineal':>10} {'us/secc. orig':>14} {'us/secc. lineal':>16} {'aceleracion':>12} {'identica':>9}")
+    for count in (int(value) for value in sections.split(',')):
+        text, spans = generate_sections(count, seed)
+        
+        def run_original():
+            chapters = [TextChapter(title, text[start:end], start, end) for title, start, end in spans]
+            parts = [part for chapter in chapters for part in split_long_chapter_original(chapter, max_words)]
+            return combine_small_chapters_original(parts, min_words)
+        
+        def run_linear():
+            chapters = [Chapter(title, spans=[(text, start, end)], start_index=start, end_index=end)
+                        for title, start, end in spans]
+            parts = [part for chapter in chapters for part in split_long_chapter(chapter, max_words)]
+            return combine_small_chapters(parts, min_words)
+        
+        original_time, original_result = best_time(run_original, repeat)
+        linear_time, linear_result = best_time(run_linear, repeat)
+        identical = [(c.title, c.content) for c in original_result] == [(c.title, c.content) for c in linear_result]
+        total_words = sum(chapter.word_count for chapter in linear_result)
+        
+        print(f"{count:>10} {total_words:>10} {original_time:>9.3f}s {linear_time:>9.3f}s "
+              f"{original_time / count * 1e6:>14.1f} {linear_time / count * 1e6:>16.1f} {original_time / linear_time:>11.1f}x {'si' if identical else 'NO':>9}")
+
+
+if __name__ == "__main__":
+    main()
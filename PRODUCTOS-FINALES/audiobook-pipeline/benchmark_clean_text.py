@@ -0,0 +1,113 @@
+"""Benchmark de clean_text: normalizador de una pasada contra la cadena de re.sub original."""
+import random
+import re
+import time
+
+import click
+
+from pdf_extractor import clean_text
+
+
+SAMPLE_WORDS = (
+    "el la de que y en los se del las un por con no una su para es al lo como "
+    "más pero sus le ya o este sí porque esta entre cuando muy sin sobre también "
+    "me hasta hay donde quien desde todo nos durante todos uno les ni contra otros "
+    "capítulo canción niño árbol corazón información económica política"
+).split()
+
+
+def clean_text_regex(text: str) -> str:
+    """Implementacion original de clean_text (seis pasadas de re.sub), como referencia."""
+    text = re.sub(r' +', ' ', text)
+    text = re.sub(r'\n{3,}', '\n\n', text)
+    text = re.sub(r'(\w+)-\s*\n\s*(\w+)', r'\1\2', text)
+    text = re.sub(r' +\n', '\n', text)
+    text = re.sub(r'\n +', '\n', text)
+    text = re.sub(r'[\x00-\x08\x0b-\x0c\x0e-\x1f\x7f-\x9f]', '', text)
+    return text.strip()
+
+
+def generate_raw_text(total_words: int, seed: int = 0) -> str:
+    """
+    Genera texto con los artefactos tipicos de pdfplumber: lineas de ~12
+    palabras, palabras cortadas con guion, dobles espacios, lineas en blanco,
+    numeros de pagina y algun caracter de control.
+    """
+    rng = random.Random(seed)
+    lines = []
+    words_done = 0
+    line_number = 0
+    
+    while words_done < total_words:
+        line_words = [rng.choice(SAMPLE_WORDS) for _ in range(rng.randint(8, 14))]
+        words_done += len(line_words)
+        line = ' '.join(line_words)
+        
+        if rng.random() < 0.15:
+            # Palabra cortada al final de la linea
+            line += ' ' + rng.choice(SAMPLE_WORDS) + '-'
+        if rng.random() < 0.05:
+            line = line.replace(' ', '  ', 1)
+        if rng.random() < 0.02:
+            line += '  '
+        if rng.random() < 0.001:
+            line += '\x0c'
+        
+        lines.append(line)
+        line_number += 1
+        
+        if line_number % 40 == 0:
+            lines.extend(['', '', str(line_number // 40), '', ''])
+        elif rng.random() < 0.05:
+            lines.append('')
+    
+    return '\n'.join(lines)
+
+
+def best_time(func, text: str, repeat: int):
+    """Ejecuta func(text) varias veces y devuelve (mejor tiempo, resultado)."""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        result = func(text)
+        timings.append(time.perf_counter() - start_time)
+    return min(timings), result
+
+
+@click.command()
+@click.option('--words', '-n', default=1_000_000, type=int, show_default=True, help='Palabras del texto sintetico')
+@click.option('--repeat', '-r', default=3, type=int, show_default=True, help='Repeticiones (se toma la mejor)')
+@click.option('--seed', default=0, type=int, show_default=True, help='Semilla del generador')
+@click.option('--long-token', default=3000, type=int, show_default=True,
+              help='Longitud de los tokens del caso patologico')
+def main(words, repeat, seed, long_token):
+    """Compara velocidad y salida de clean_text con la cadena de re.sub original."""
+    text = generate_raw_text(words, seed)
+    print(f"📄 Texto sintetico: {len(text.split())} palabras, {len(text) / 1e6:.1f} M caracteres")
+    
+    regex_time, regex_result = best_time(clean_text_regex, text, repeat)
+    single_time, single_result = best_time(clean_text, text, repeat)
+    
+    print(f"   re.sub encadenados : {regex_time:.3f}s")
+    print(f"   una sola pasada    : {single_time:.3f}s")
+    print(f"   Aceleracion        : x{regex_time / single_time:.1f}")
+    print(f"   Salida identica    : {'si' if regex_result == single_result else 'NO'}")
+    
+    # Caso patologico: tokens muy largos sin espacios (tablas, URLs, lineas de
+    # guiones bajos). En cada posicion de la palabra la regex original prueba
+    # (\w+) hasta el final antes de fallar: coste cuadratico por palabra
+    long_text = ' '.join('x' * long_token for _ in range(20))
+    print(f"\n📄 20 tokens de {long_token} caracteres sin espacios")
+    
+    regex_time, regex_result = best_time(clean_text_regex, long_text, 1)
+    single_time, single_result = best_time(clean_text, long_text, 1)
+    
+    print(f"   re.sub encadenados : {regex_time:.3f}s")
+    print(f"   una sola pasada    : {single_time:.3f}s")
+    print(f"   Aceleracion        : x{regex_time / single_time:.0f}")
+    print(f"   Salida identica    : {'si' if regex_result == single_result else 'NO'}")
+
+
+if __name__ == "__main__":
+    main()
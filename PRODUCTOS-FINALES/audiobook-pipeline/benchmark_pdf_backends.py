@@ -0,0 +1,143 @@
+"""Benchmark de los motores de extraccion de PDF: velocidad y paridad del texto."""
+import contextlib
+import difflib
+import io
+import json
+import sys
+import time
+from pathlib import Path
+
+import click
+
+from pdf_extractor import available_backends, clean_text, extract_document, extract_pages, iter_pdf_pages
+
+
+def page_similarity(reference: str, candidate: str) -> float:
+    """Similitud (0-1) entre las palabras de dos paginas ya limpias."""
+    reference_words = reference.split()
+    candidate_words = candidate.split()
+    if not reference_words and not candidate_words:
+        return 1.0
+    return difflib.SequenceMatcher(None, reference_words, candidate_words, autojunk=False).ratio()
+
+
+def benchmark_pdf(pdf_path: Path, backends: list, workers: int, repeat: int) -> dict:
+    """Mide cada motor sobre un PDF y compara su texto con el del primer motor."""
+    results = {}
+    reference_pages = None
+    reference_name = None
+    
+    for backend_name in backends:
+        timings = []
+        for _ in range(repeat):
+            start_time = time.perf_counter()
+            pages = extract_pages(str(pdf_path), workers=workers, backend=backend_name)
+            timings.append(time.perf_counter() - start_time)
+        
+        best = min(timings)
+        cleaned_pages = [clean_text(page) for page in pages]
+        text = clean_text('\n'.join(page for page in pages if page))
+        
+        result = {
+            'pages': len(pages),
+            'seconds': round(best, 3),
+            'pages_per_second': round(len(pages) / best, 1) if best > 0 else None,
+            'chars': len(text),
+            'words': len(text.split()),
+            'empty_pages': sum(1 for page in cleaned_pages if not page),
+        }
+        
+        if reference_pages is None:
+            reference_pages = cleaned_pages
+            reference_name = backend_name
+        else:
+            # Paridad pagina a pagina contra el motor de referencia
+            similarities = [
+                page_similarity(ref, cand)
+                for ref, cand in zip(reference_pages, cleaned_pages)
+            ]
+            result['reference'] = reference_name
+            result['identical_pages'] = sum(1 for ref, cand in zip(reference_pages, cleaned_pages) if ref == cand)
+            result['mean_similarity'] = round(sum(similarities) / len(similarities), 4) if similarities else 1.0
+            result['min_similarity'] = round(min(similarities), 4) if similarities else 1.0
+            result['speedup'] = round(results[reference_name]['seconds'] / best, 2) if best > 0 else None
+        
+        results[backend_name] = result
+    
+    return results
+
+
+def check_stream_parity(pdf_path: Path, backend_name: str) -> list:
+    """
+    Compara el texto del modo stream (iter_pdf_pages) con el del modo normal (extract_document).
+    
+    Returns:
+        Lineas del diff (vacia si los textos son identicos)
+    """
+    # Ambos modos informan por pantalla: se descarta para no mezclarlo con el informe
+    with contextlib.redirect_stdout(io.StringIO()):
+        batch_text = extract_document(str(pdf_path), backend=backend_name).text
+        stream_text = '\n'.join(page_text for _, page_text in iter_pdf_pages(str(pdf_path), backend=backend_name))
+    if batch_text == stream_text:
+        return []
+    return list(difflib.unified_diff(batch_text.split('\n'), stream_text.split('\n'),
+                                     'normal', 'stream', lineterm='', n=1))
+
+
+@click.command()
+@click.argument('pdf_paths', nargs=-1, type=click.Path(exists=True))
+@click.option('--backend', '-b', 'backends', multiple=True,
+              help='Motor a medir (se puede repetir). Por defecto todos los instalados')
+@click.option('--workers', '-w', default=1, type=int, show_default=True, help='Procesos por extraccion')
+@click.option('--repeat', '-r', default=1, type=int, show_default=True, help='Repeticiones (se toma la mejor)')
+@click.option('--json', 'json_path', type=click.Path(), default=None, help='Guardar el informe en JSON')
+@click.option('--check-stream', 'check_stream', is_flag=True, default=False,
+              help='Comprueba que --stream produce el mismo texto que el modo normal (codigo 1 si no)')
+def main(pdf_paths, backends, workers, repeat, json_path, check_stream):
+    """Compara velocidad y paridad de texto de los motores de PDF sobre PDFs de muestra."""
+    if not pdf_paths:
+        pdf_paths = sorted(str(path) for path in Path('input').glob('*.pdf'))
+    if not pdf_paths:
+        print("❌ No hay PDFs de muestra: pasa rutas o coloca PDFs en la carpeta 'input'")
+        return
+    
+    # Orden de preferencia: el mas lento (pdfplumber) actua como referencia
+    backends = list(backends) or list(reversed(available_backends()))
+    report = {}
+    mismatches = 0
+    
+    for pdf_path in pdf_paths:
+        print(f"\n📄 {Path(pdf_path).name}")
+        results = benchmark_pdf(Path(pdf_path), backends, workers, repeat)
+        report[Path(pdf_path).name] = results
+        
+        for backend_name, result in results.items():
+            line = (f"   {backend_name:<11} {result['pages']:>5} pag  {result['seconds']:>8.2f}s  "
+                    f"{result['pages_per_second'] or 0:>8.1f} pag/s  {result['words']:>8} palabras")
+            if 'reference' in result:
+                line += (f"  | x{result['speedup']} vs {result['reference']}, "
+                         f"paginas identicas {result['identical_pages']}/{result['pages']}, "
+                         f"similitud media {result['mean_similarity']:.3f} (min {result['min_similarity']:.3f})")
+            print(line)
+            
+            if check_stream:
+                diff = check_stream_parity(Path(pdf_path), backend_name)
+                result['stream_identical'] = not diff
+                if diff:
+                    mismatches += 1
+                    print(f"   ❌ {backend_name}: el texto del modo stream difiere del modo normal")
+                    for diff_line in diff[:20]:
+                        print(f"      {diff_line}")
+                else:
+                    print(f"   ✅ {backend_name}: modo stream identico al modo normal")
+    
+    if json_path:
+        Path(json_path).write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding='utf-8')
+        print(f"\n📁 Informe guardado en: {json_path}")
+    
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
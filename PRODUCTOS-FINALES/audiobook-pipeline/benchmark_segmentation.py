@@ -0,0 +1,218 @@
+"""Benchmark de deteccion de capitulos y segmentacion: tiempo y pico de memoria con libros sinteticos."""
+import contextlib
+import io
+import json
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import click
+
+from chapter_detector import (
+    create_automatic_segmentation, detect_chapter_patterns, extract_chapters, extract_chapters_by_features,
+    segment_text, segment_text_by_minutes,
+)
+from benchmark_clean_text import SAMPLE_WORDS
+
+
+WORDS_PER_MINUTE = 173          # Con velocidad 1.15x
+REGRESSION_TOLERANCE = 0.25     # Un 25% mas lento (o mas memoria) que la referencia es una regresion
+MIN_COMPARED_SECONDS = 0.005    # Por debajo, el ruido del reloj domina: no se comparan tiempos
+
+TITLE_WORDS = ["viaje", "regreso", "puerto", "invierno", "camino", "silencio", "ciudad", "memoria", "frontera"]
+
+
+def _sentence(rng: random.Random, word_count: int) -> str:
+    words = [rng.choice(SAMPLE_WORDS) for _ in range(word_count)]
+    words[0] = words[0].capitalize()
+    return ' '.join(words) + '.'
+
+
+def generate_book(total_words: int, headings_per_10k: float = 4.0, list_ratio: float = 0.1, seed: int = 0) -> str:
+    """
+    Genera un libro sintetico en espanol con la forma del texto limpio de un PDF.
+    
+    Parrafos de 1-6 lineas de 18-26 palabras separados por linea en blanco,
+    titulos "Capitulo N: ..." seguidos directamente de su primer parrafo y
+    listas de 3-7 elementos ("- ..." o "1. ...").
+    
+    Args:
+        total_words: Palabras aproximadas del libro
+        headings_per_10k: Titulos de capitulo por cada 10.000 palabras
+        list_ratio: Fraccion de bloques que son listas en lugar de parrafos
+        seed: Semilla del generador
+    """
+    rng = random.Random(seed)
+    words_per_heading = 10_000 / headings_per_10k if headings_per_10k > 0 else float('inf')
+    blocks = []
+    words_done = 0
+    next_heading = 0.0
+    chapter_num = 0
+    
+    while words_done < total_words:
+        if words_done >= next_heading:
+            chapter_num += 1
+            title = ' '.join(rng.choice(TITLE_WORDS) for _ in range(rng.randint(1, 3)))
+            # El titulo va pegado a la primera linea del capitulo (larga), como espera detect_chapter_patterns
+            blocks.append(f"Capítulo {chapter_num}: El {title}\n{_sentence(rng, 24)}")
+            words_done += 27
+            next_heading += words_per_heading
+            continue
+        
+        if rng.random() < list_ratio:
+            numbered = rng.random() < 0.5
+            items = []
+            for i in range(rng.randint(3, 7)):
+                item_words = rng.randint(2, 8)
+                marker = f"{i + 1}." if numbered else "-"
+                items.append(f"{marker} {_sentence(rng, item_words)}")
+                words_done += item_words
+            blocks.append('\n'.join(items))
+        else:
+            lines = []
+            for _ in range(rng.randint(1, 6)):
+                line_words = rng.randint(18, 26)
+                lines.append(_sentence(rng, line_words))
+                words_done += line_words
+            blocks.append('\n'.join(lines))
+    
+    return '\n\n'.join(blocks)
+
+
+def segmenters() -> dict:
+    """Funciones medidas: nombre -> funcion(texto) que devuelve una lista."""
+    min_words = 20 * WORDS_PER_MINUTE
+    max_words = 60 * WORDS_PER_MINUTE
+    return {
+        'detect_chapter_patterns': detect_chapter_patterns,
+        'extract_chapters': extract_chapters,
+        'extract_chapters_by_features': extract_chapters_by_features,
+        'create_automatic_segmentation': lambda text: create_automatic_segmentation(text, min_words, max_words),
+        'segment_text_by_minutes': lambda text: segment_text_by_minutes(text, "Libro sintetico"),
+        'segment_text': lambda text: segment_text(text, "Libro sintetico"),
+    }
+
+
+def measure(func, text: str, repeat: int) -> dict:
+    """Mejor tiempo de varias ejecuciones y pico de memoria (tracemalloc) de una ejecucion aparte."""
+    timings = []
+    result = []
+    # segment_text y compania informan por pantalla: se descarta para no medir la consola
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            start_time = time.perf_counter()
+            result = func(text)
+            timings.append(time.perf_counter() - start_time)
+        
+        # tracemalloc ralentiza la ejecucion: la memoria se mide en una pasada sin cronometrar
+        tracemalloc.start()
+        try:
+            func(text)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    
+    return {
+        'seconds': round(min(timings), 4),
+        'peak_mb': round(peak / 2**20, 2),
+        'items': len(result),
+    }
+
+
+def find_regressions(report: dict, baseline: dict, tolerance: float = REGRESSION_TOLERANCE) -> list:
+    """
+    Compara el informe con una referencia guardada.
+    
+    Returns:
+        Lista de mensajes, uno por medida (tiempo o memoria) que empeora mas
+        de tolerance; los tamanos o funciones que faltan en la referencia no
+        se comparan
+    """
+    regressions = []
+    for size, functions in report['results'].items():
+        for name, current in functions.items():
+            previous = baseline.get('results', {}).get(size, {}).get(name)
+            if previous is None:
+                continue
+            if previous['seconds'] >= MIN_COMPARED_SECONDS and current['seconds'] > previous['seconds'] * (1 + tolerance):
+                regressions.append(f"{name} ({size} palabras): {previous['seconds']:.4f}s -> {current['seconds']:.4f}s")
+            if previous['peak_mb'] > 0 and current['peak_mb'] > previous['peak_mb'] * (1 + tolerance):
+                regressions.append(f"{name} ({size} palabras): {previous['peak_mb']:.2f} MB -> {current['peak_mb']:.2f} MB")
+    return regressions
+
+
+@click.command()
+@click.option('--words', '-n', default='10000,100000,500000,2000000', show_default=True,
+              help='Tamanos de libro a probar, en palabras (separados por comas)')
+@click.option('--headings', default=4.0, type=float, show_default=True, help='Titulos de capitulo por cada 10.000 palabras')
+@click.option('--lists', default=0.1, type=float, show_default=True, help='Fraccion de bloques que son listas')
+@click.option('--only', 'only', multiple=True, help='Medir solo esta funcion (se puede repetir)')
+@click.option('--repeat', '-r', default=3, type=int, show_default=True, help='Repeticiones (se toma la mejor)')
+@click.option('--seed', default=0, type=int, show_default=True, help='Semilla del generador')
+@click.option('--json', 'json_path', type=click.Path(), default=None, help='Guardar el informe en JSON')
+@click.option('--baseline', 'baseline_path', type=click.Path(), default=None,
+              help='Informe de referencia: se marcan las regresiones (y el comando termina con codigo 1)')
+@click.option('--save-baseline', 'save_baseline', is_flag=True, default=False,
+              help='Guarda este informe como referencia en la ruta de --baseline')
+@click.option('--tolerance', default=REGRESSION_TOLERANCE, type=float, show_default=True,
+              help='Empeoramiento admitido frente a la referencia (0.25 = 25%)')
+def main(words, headings, lists, only, repeat, seed, json_path, baseline_path, save_baseline, tolerance):
+    """Mide los detectores de capitulos y los segmentadores sobre libros sinteticos de distintos tamanos."""
+    functions = segmenters()
+    unknown = [name for name in only if name not in functions]
+    if unknown:
+        raise click.BadParameter(f"funciones desconocidas: {', '.join(unknown)} (disponibles: {', '.join(functions)})",
+                                 param_hint='--only')
+    if only:
+        functions = {name: func for name, func in functions.items() if name in only}
+    
+    report = {
+        'config': {'headings_per_10k': headings, 'list_ratio': lists, 'seed': seed},
+        'repeat': repeat,
+        'results': {},
+    }
+    
+    print(f"{'palabras':>10} {'funcion':<30} {'tiempo':>10} {'pal/s':>12} {'pico MB':>9} {'resultado':>10}")
+    for total_words in (int(value) for value in words.split(',')):
+        text = generate_book(total_words, headings, lists, seed)
+        word_count = len(text.split())
+        results = report['results'].setdefault(str(total_words), {})
+        
+        for name, func in functions.items():
+            result = measure(func, text, repeat)
+            results[name] = result
+            words_per_second = word_count / result['seconds'] if result['seconds'] > 0 else 0.0
+            print(f"{word_count:>10} {name:<30} {result['seconds']:>9.4f}s {words_per_second:>12,.0f} "
+                  f"{result['peak_mb']:>9.2f} {result['items']:>10}")
+    
+    if json_path:
+        Path(json_path).write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding='utf-8')
+        print(f"\n📁 Informe guardado en: {json_path}")
+    
+    if not baseline_path:
+        return
+    baseline_file = Path(baseline_path)
+    if save_baseline:
+        baseline_file.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding='utf-8')
+        print(f"📁 Referencia guardada en: {baseline_path}")
+        return
+    if not baseline_file.exists():
+        print(f"⚠️  No existe la referencia {baseline_path}: guardala con --save-baseline")
+        return
+    
+    baseline = json.loads(baseline_file.read_text(encoding='utf-8'))
+    if baseline.get('config') != report['config']:
+        print("⚠️  La referencia se midio con otra configuracion (--headings, --lists o --seed)")
+    regressions = find_regressions(report, baseline, tolerance)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regresion(es) frente a {baseline_path} (tolerancia {tolerance:.0%}):")
+        for message in regressions:
+            print(f"   {message}")
+        sys.exit(1)
+    print(f"\n✅ Sin regresiones frente a {baseline_path} (tolerancia {tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
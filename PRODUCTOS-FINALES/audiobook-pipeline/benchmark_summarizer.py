@@ -0,0 +1,123 @@
+"""Benchmark del resumen LSA: un libro entero resumido capitulo a capitulo, frente a la SVD densa."""
+import itertools
+import random
+import time
+
+import click
+import numpy as np
+
+from benchmark_clean_text import SAMPLE_WORDS
+from sentences import sentence_spans
+from summarizer import LSA_DIMENSIONS, lsa_sentence_ranks, summarize, term_matrix
+
+
+def dense_ranks(text: str) -> np.ndarray:
+    """Mismo ranking con la matriz densa y la SVD completa (como sumy), como referencia."""
+    matrix = term_matrix(text, sentence_spans(text))
+    dense = np.zeros(matrix.shape)
+    dense[matrix.rows, matrix.cols] = matrix.values
+    u, sigma, _ = np.linalg.svd(dense, full_matrices=False)
+    k = min(LSA_DIMENSIONS, len(sigma))
+    return np.sqrt(((sigma[:k] ** 2) * (u[:, :k] ** 2)).sum(axis=1))
+
+
+def sumy_summarize(text: str, reduction_percent: float) -> str:
+    """moderate_summarize original (sumy: parser, stemmer y LsaSummarizer nuevos en cada llamada)."""
+    from sumy.parsers.plaintext import PlaintextParser
+    from sumy.nlp.tokenizers import Tokenizer
+    from sumy.summarizers.lsa import LsaSummarizer
+    from sumy.nlp.stemmers import Stemmer
+    from sumy.utils import get_stop_words
+    
+    target = max(3, int(len(sentence_spans(text)) * (1 - reduction_percent)))
+    parser = PlaintextParser.from_string(text, Tokenizer('spanish'))
+    summarizer = LsaSummarizer(Stemmer('spanish'))
+    summarizer.stop_words = get_stop_words('spanish')
+    return ' '.join(str(sentence) for sentence in summarizer(parser.document, target))
+
+
+SYLLABLES = ["ma", "ra", "lo", "cu", "te", "sin", "pe", "dro", "ca", "mi", "no", "ven", "tu", "la", "gra", "bi", "sol", "fe"]
+
+
+def generate_chapters(total_words: int, chapter_words: int, vocabulary: int, seed: int = 0) -> list:
+    """
+    Genera capitulos con un vocabulario realista: `vocabulary` palabras
+    inventadas con frecuencias de Zipf (pocas muy frecuentes, muchas raras)
+    mezcladas con palabras vacias, en frases de 8-30 palabras y parrafos de
+    2-6 frases. Cuantos mas terminos distintos, mas cara es la SVD densa.
+    """
+    rng = random.Random(seed)
+    words = sorted({''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+                    for _ in range(vocabulary * 2)})[:vocabulary]
+    rng.shuffle(words)
+    cumulative = list(itertools.accumulate(1 / rank for rank in range(1, len(words) + 1)))
+    
+    chapters = []
+    for chapter_start in range(0, total_words, chapter_words):
+        paragraphs = []
+        words_done = 0
+        while words_done < min(chapter_words, total_words - chapter_start):
+            sentences = []
+            for _ in range(rng.randint(2, 6)):
+                length = rng.randint(8, 30)
+                content = rng.choices(words, cum_weights=cumulative, k=length)
+                sentence = [word if rng.random() < 0.6 else rng.choice(SAMPLE_WORDS) for word in content]
+                sentences.append(' '.join(sentence).capitalize() + '.')
+                words_done += length
+            paragraphs.append(' '.join(sentences))
+        chapters.append('\n\n'.join(paragraphs))
+    return chapters
+
+
+@click.command()
+@click.option('--words', '-n', default=1_000_000, type=int, show_default=True, help='Palabras del libro sintetico')
+@click.option('--chapter-words', default=10_380, type=int, show_default=True,
+              help='Palabras por capitulo (10.380 = 60 minutos)')
+@click.option('--vocabulary', default=20_000, type=int, show_default=True, help='Palabras distintas del libro')
+@click.option('--reduction', default=0.15, type=float, show_default=True, help='Fraccion de frases a quitar')
+@click.option('--compare', default=3, type=int, show_default=True,
+              help='Capitulos a comparar con la SVD densa y con sumy (0 = ninguno)')
+@click.option('--seed', default=0, type=int, show_default=True, help='Semilla del generador')
+def main(words, chapter_words, vocabulary, reduction, compare, seed):
+    """Mide el resumen de un libro completo y lo compara con la SVD densa y con el resumen de sumy."""
+    chapters = generate_chapters(words, chapter_words, vocabulary, seed)
+    summarize(chapters[0][:2000], reduction)  # Carga stemmer y palabras vacias fuera de la medida
+    
+    start_time = time.perf_counter()
+    summaries = [summarize(chapter, reduction) for chapter in chapters]
+    elapsed = time.perf_counter() - start_time
+    
+    sentences_before = sum(len(sentence_spans(chapter)) for chapter in chapters)
+    sentences_after = sum(len(sentence_spans(summary)) for summary in summaries)
+    print(f"📚 {len(chapters)} capitulo(s), {words} palabras: {elapsed:.2f}s "
+          f"({words / elapsed:,.0f} palabras/s, {elapsed / len(chapters) * 1000:.1f} ms/capitulo)")
+    print(f"   Frases: {sentences_before} -> {sentences_after} "
+          f"({1 - sentences_after / sentences_before:.1%} menos)")
+    
+    for i, chapter in enumerate(chapters[:compare], 1):
+        sentences = sentence_spans(chapter)
+        target = max(3, int(len(sentences) * (1 - reduction)))
+        
+        start_time = time.perf_counter()
+        ranks = lsa_sentence_ranks(term_matrix(chapter, sentences))
+        sparse_time = time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        exact = dense_ranks(chapter)
+        dense_time = time.perf_counter() - start_time
+        
+        kept = set(np.argsort(-ranks, kind='stable')[:target].tolist())
+        kept_exact = set(np.argsort(-exact, kind='stable')[:target].tolist())
+        line = (f"   Capitulo {i}: {len(sentences)} frases | dispersa {sparse_time * 1000:.1f} ms, "
+                f"densa {dense_time * 1000:.1f} ms, mismas frases {len(kept & kept_exact) / target:.1%}")
+        
+        try:
+            start_time = time.perf_counter()
+            sumy_summarize(chapter, reduction)
+            line += f" | sumy {(time.perf_counter() - start_time) * 1000:.0f} ms"
+        except LookupError:
+            line += " | sumy: faltan los datos punkt de nltk (python -m nltk.downloader punkt)"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,72 +1,227 @@
 """Modulo para detectar y segmentar capitulos."""
+import bisect
 import re
-from typing import List, Tuple, Optional
-from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Sequence, Tuple, Optional
+
+import numpy as np
+
+from duration_model import DEFAULT_WORDS_PER_MINUTE
+from layout_outline import MAX_LEVELS, OutlineEntry, heading_pattern
+from sentences import sentence_ends
+from text_headings import HEADING_SCORE_THRESHOLD, detect_heading_lines
+
+
+# Tramo de texto de un capitulo: (texto, inicio, fin). El texto es el del
+# libro completo, compartido por todos los capitulos
+TextSpan = Tuple[str, int, int]
+
+
+def strip_span(text: str, start: int, end: int) -> Tuple[int, int]:
+    """Posiciones de text[start:end].strip() sin copiar el tramo."""
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+def _iter_paragraphs(spans: Sequence[TextSpan], separator: str) -> Iterator[Tuple[TextSpan, int]]:
+    """
+    Parrafos de los tramos de un capitulo, con su numero de palabras.
+    
+    Equivale a content.split(separator) (la union de tramos con un parrafo
+    en blanco tambien separa), pero sin construir el texto del capitulo.
+    """
+    for source, start, end in spans:
+        pos = start
+        while True:
+            cut = source.find(separator, pos, end)
+            para_end = end if cut < 0 else cut
+            yield (source, pos, para_end), len(source[pos:para_end].split())
+            if cut < 0:
+                break
+            pos = cut + len(separator)
 
 
-@dataclass
 class Chapter:
-    """Representa un capitulo detectado."""
-    title: str
-    content: str
-    start_index: int
-    end_index: int
-
-
-def detect_chapter_patterns(text: str) -> List[Tuple[int, str]]:
-    """Detecta patrones comunes de titulos de capitulo."""
-    # NOTA: Los patrones regex mantienen tildes para detectar correctamente
-    # SOLO detectar patrones muy específicos para evitar falsos positivos
-    patterns = [
-        # "CAPITULO 1" o "CAPITULO 1" (acepta con y sin tilde) - Prioridad alta
-        r'(?i)^(?:cap[íi]tulo|cap\.?)\s*(\d+[a-z]?)[\.\s:]+(.+?)$',
-        # "Capitulo 1: Titulo" (acepta con y sin tilde) - Prioridad alta
-        r'(?i)^cap[íi]tulo\s+(\d+[a-z]?)[\.\s:]+(.+?)$',
-        # "PARTE I" o "PARTE 1" - Prioridad alta
-        r'(?i)^(?:parte|part)\s+([IVX\d]+)[\.\s:]+(.+?)$',
-    ]
-    
-    lines = text.split('\n')
+    """
+    Representa un capitulo detectado.
+    
+    No guarda una copia de su texto sino tramos (texto, inicio, fin) del
+    texto del libro, compartido por todos los capitulos. El texto se
+    construye solo al leer `content` (los tramos se unen con un parrafo en
+    blanco) y no se guarda; el numero de palabras se calcula una vez.
+    
+    Chapter(title, content, start_index, end_index) sigue funcionando para
+    capitulos con el texto ya construido (por ejemplo, los del streaming).
+    """
+    __slots__ = ('title', 'start_index', 'end_index', 'spans', '_word_count')
+    
+    def __init__(self, title: str, content: Optional[str] = None, start_index: int = 0, end_index: int = 0,
+                 spans: Sequence[TextSpan] = (), word_count: Optional[int] = None):
+        """
+        Args:
+            title: Titulo del capitulo
+            content: Texto ya construido (alternativa a spans)
+            start_index: Inicio en el texto original (linea, palabra o caracter segun el origen)
+            end_index: Fin en el texto original
+            spans: Tramos (texto, inicio, fin) que forman el capitulo, en orden
+            word_count: Numero de palabras si ya se conoce
+        """
+        self.title = title
+        self.start_index = start_index
+        self.end_index = end_index
+        self.spans = ((content, 0, len(content)),) if content is not None else tuple(spans)
+        self._word_count = word_count
+    
+    @property
+    def content(self) -> str:
+        """Texto del capitulo (se construye en cada acceso)."""
+        return '\n\n'.join(source[start:end] for source, start, end in self.spans)
+    
+    @content.setter
+    def content(self, value: str) -> None:
+        self.spans = ((value, 0, len(value)),)
+        self._word_count = None
+    
+    @property
+    def char_count(self) -> int:
+        """Longitud de content, sin construir el texto."""
+        return sum(end - start for _, start, end in self.spans) + 2 * max(len(self.spans) - 1, 0)
+    
+    @property
+    def word_count(self) -> int:
+        """Numero de palabras (calculado una vez, parrafo a parrafo)."""
+        if self._word_count is None:
+            self.paragraphs()
+        return self._word_count
+    
+    def paragraphs(self, separator: str = '\n\n') -> List[Tuple[TextSpan, int]]:
+        """
+        Parrafos (tramo, palabras) del capitulo, como content.split(separator).
+        
+        Al recorrerlos guarda el numero de palabras del capitulo, asi que
+        dividir y despues combinar cuenta las palabras una sola vez.
+        """
+        paragraphs = list(_iter_paragraphs(self.spans, separator))
+        if self._word_count is None:
+            self._word_count = sum(para_word_count for _, para_word_count in paragraphs)
+        return paragraphs
+    
+    def __repr__(self) -> str:
+        return (f"Chapter(title={self.title!r}, start_index={self.start_index}, "
+                f"end_index={self.end_index}, spans={len(self.spans)})")
+
+
+# Titulos de capitulo reconocidos. Los tres patrones originales
+#   (?i)^(?:cap[íi]tulo|cap\.?)\s*(\d+[a-z]?)[\.\s:]+(.+?)$
+#   (?i)^cap[íi]tulo\s+(\d+[a-z]?)[\.\s:]+(.+?)$
+#   (?i)^(?:parte|part)\s+([IVX\d]+)[\.\s:]+(.+?)$
+# unidos en una alternancia compilada que recorre todo el texto en modo
+# MULTILINE. [^\S\n] es \s sin salto de linea para no saltar a la linea
+# siguiente, y el titulo debe tener algun caracter visible despues del separador
+# (equivale a aplicar los patrones a la linea sin espacios en los extremos)
+# NOTA: Los patrones regex mantienen tildes para detectar correctamente
+# SOLO detectar patrones muy específicos para evitar falsos positivos
+CHAPTER_MARKER_RE = re.compile(
+    r'^[^\S\n]*'
+    r'(?:(?:cap[íi]tulo|cap\.?)[^\S\n]*\d+[a-z]?'   # "CAPITULO 1", "Cap. 2" (con y sin tilde)
+    r'|(?:parte|part)[^\S\n]+[IVX\d]+)'              # "PARTE I" o "PARTE 1"
+    r'(?:[.:]|[^\S\n])[^\n]*?\S',
+    re.IGNORECASE | re.MULTILINE
+)
+MIN_MARKER_LENGTH = 16       # Caracteres minimos del titulo (sin espacios en los extremos)
+MAX_MARKER_LENGTH = 200
+MIN_NEXT_LINE_LENGTH = 100   # La linea siguiente debe ser un parrafo, no un elemento de lista
+MIN_CHAPTER_MARKERS = 3
+
+MAX_CUT_DRIFT = 0.10   # Desviacion maxima del corte en final de frase (10% de la parte)
+
+
+def line_start_offsets(text: str) -> List[int]:
+    """
+    Indice de lineas: posicion en text donde empieza cada linea.
+    
+    Se calcula una sola vez y lo comparten la deteccion y la extraccion de
+    capitulos; la linea n ocupa text[starts[n]:starts[n + 1] - 1].
+    """
+    starts = [0]
+    starts.extend(match.end() for match in re.finditer('\n', text))
+    return starts
+
+
+def detect_chapter_patterns(text: str, line_starts: Optional[Sequence[int]] = None) -> List[Tuple[int, str]]:
+    """
+    Detecta patrones comunes de titulos de capitulo.
+    
+    Una sola busqueda de CHAPTER_MARKER_RE sobre todo el texto; el numero de
+    linea de cada coincidencia sale del indice de lineas (bisect).
+    
+    Args:
+        text: Texto completo
+        line_starts: Indice de lineas de text (line_start_offsets); se calcula si falta
+    
+    Returns:
+        Lista de (numero de linea, titulo)
+    """
+    if line_starts is None:
+        line_starts = line_start_offsets(text)
+    total_lines = len(line_starts)
     chapter_markers = []
     
-    for i, line in enumerate(lines):
-        line_stripped = line.strip()
+    for match in CHAPTER_MARKER_RE.finditer(text):
+        i = bisect.bisect_right(line_starts, match.start()) - 1
+        line_end = line_starts[i + 1] - 1 if i + 1 < total_lines else len(text)
+        line_stripped = text[line_starts[i]:line_end].strip()
         # Filtrar lineas muy cortas o muy largas
-        if len(line_stripped) < 15 or len(line_stripped) > 200:
+        if len(line_stripped) < MIN_MARKER_LENGTH or len(line_stripped) > MAX_MARKER_LENGTH:
             continue
         
         # Verificar que la linea siguiente tenga contenido sustancial
         # para evitar detectar elementos de lista como capitulos
-        if i + 1 < len(lines):
-            next_line = lines[i + 1].strip()
-            if len(next_line) < 100:  # Aumentado a 100 para ser más estricto
+        if i + 1 < total_lines:
+            next_end = line_starts[i + 2] - 1 if i + 2 < total_lines else len(text)
+            if len(text[line_starts[i + 1]:next_end].strip()) < MIN_NEXT_LINE_LENGTH:
                 continue
         
-        for pattern in patterns:
-            match = re.match(pattern, line_stripped)
-            if match:
-                # Verificar que tenga texto significativo (no solo numeros)
-                if any(c.isalpha() for c in line_stripped) and len(line_stripped) > 15:
-                    chapter_markers.append((i, line_stripped))
-                    break
+        chapter_markers.append((i, line_stripped))
     
     # Si detecta muy pocos capítulos (menos de 3), probablemente son falsos positivos
     # En ese caso, retornar lista vacía para forzar segmentación automática
-    if len(chapter_markers) < 3:
+    if len(chapter_markers) < MIN_CHAPTER_MARKERS:
         return []
     
     return chapter_markers
 
 
 def extract_chapters(text: str) -> List[Chapter]:
-    """Extrae capitulos del texto."""
-    chapter_markers = detect_chapter_patterns(text)
+    """Extrae capitulos del texto (cortando por posiciones del indice de lineas)."""
+    line_starts = line_start_offsets(text)
+    return _chapters_from_markers(text, line_starts, detect_chapter_patterns(text, line_starts))
+
+
+def extract_chapters_by_features(text: str, threshold: float = HEADING_SCORE_THRESHOLD) -> List[Chapter]:
+    """
+    Extrae capitulos con titulos detectados por rasgos del texto
+    (text_headings.detect_heading_lines): "CAPITULO UNO", titulos en
+    mayusculas o numeros romanos que las regex no reconocen.
     
+    Args:
+        text: Texto del libro
+        threshold: Puntuacion minima de un titulo (mas alta = menos titulos)
+    """
+    line_starts = line_start_offsets(text)
+    return _chapters_from_markers(text, line_starts, detect_heading_lines(text, line_starts, threshold))
+
+
+def _chapters_from_markers(text: str, line_starts: Sequence[int],
+                           chapter_markers: Sequence[Tuple[int, str]]) -> List[Chapter]:
+    """Corta el texto en capitulos en las lineas de chapter_markers ((linea, titulo))."""
     if not chapter_markers:
         return []
     
     chapters = []
-    lines = text.split('\n')
+    total_lines = len(line_starts)
     
     for i, (marker_idx, title) in enumerate(chapter_markers):
         start_idx = marker_idx
@@ -75,18 +230,22 @@ def extract_chapters(text: str) -> List[Chapter]:
         if i + 1 < len(chapter_markers):
             end_idx = chapter_markers[i + 1][0]
         else:
-            end_idx = len(lines)
+            end_idx = total_lines
         
-        # Extraer contenido del capitulo
-        chapter_lines = lines[start_idx:end_idx]
-        # Remover el titulo del contenido si esta duplicado
-        content = '\n'.join(chapter_lines[1:]) if len(chapter_lines) > 1 else '\n'.join(chapter_lines)
-        content = content.strip()
+        # Contenido del capitulo: de la linea siguiente al titulo hasta el
+        # salto de linea anterior al siguiente titulo (sin copiar el texto)
+        content_end = line_starts[end_idx] - 1 if end_idx < total_lines else len(text)
+        if start_idx + 1 < end_idx:
+            content_start = line_starts[start_idx + 1]
+        else:
+            # Capitulo de una sola linea: el contenido es el propio titulo
+            content_start = line_starts[start_idx]
+        content_start, content_end = strip_span(text, content_start, content_end)
         
-        if content:  # Solo agregar si tiene contenido
+        if content_start < content_end:  # Solo agregar si tiene contenido
             chapters.append(Chapter(
                 title=title,
-                content=content,
+                spans=[(text, content_start, content_end)],
                 start_index=start_idx,
                 end_index=end_idx
             ))
@@ -94,192 +253,597 @@ def extract_chapters(text: str) -> List[Chapter]:
     return chapters
 
 
+class IncrementalChapterDetector:
+    """
+    Version incremental de extract_chapters.
+    
+    Recibe el texto por fragmentos (lineas o paginas) y entrega cada
+    capitulo en cuanto se confirma el titulo siguiente (la linea posterior
+    al titulo es un parrafo). El resultado es identico a
+    extract_chapters(texto completo): mismos titulos, contenidos y numeros
+    de linea, y ningun capitulo si hay menos de MIN_CHAPTER_MARKERS titulos.
+    
+    Solo se guarda el capitulo en curso (y, hasta ver MIN_CHAPTER_MARKERS
+    titulos, los anteriores); el texto previo al primer titulo se descarta
+    al leerlo, igual que en extract_chapters.
+    
+    Uso:
+        detector = IncrementalChapterDetector()
+        for page_number, page_text in pages:
+            for chapter in detector.feed_page(page_text):
+                ...
+        for chapter in detector.finish():
+            ...
+    """
+    
+    def __init__(self):
+        self._partial = ''           # Ultima linea, aun sin salto de linea
+        self._line_number = 0        # Numero de la siguiente linea completa
+        self._candidate = None       # (numero, titulo, linea) pendiente de ver la linea siguiente
+        self._chapter = None         # (numero, titulo, linea) del capitulo en curso
+        self._lines = []             # Lineas del capitulo en curso (sin el titulo)
+        self._held = []              # Capitulos cerrados antes de confirmar MIN_CHAPTER_MARKERS
+        self._markers = 0
+        self._pages = 0
+        self._finished = False
+    
+    @property
+    def confirmed(self) -> bool:
+        """Indica si ya se vieron suficientes titulos para emitir capitulos."""
+        return self._markers >= MIN_CHAPTER_MARKERS
+    
+    def feed(self, text: str) -> List[Chapter]:
+        """
+        Anade texto (cualquier fragmento; las lineas se parten en '\\n').
+        
+        Returns:
+            Capitulos que quedaron cerrados con este fragmento
+        """
+        if self._finished:
+            raise RuntimeError("El detector ya se cerro con finish()")
+        lines = (self._partial + text).split('\n')
+        self._partial = lines.pop()
+        emitted = []
+        for line in lines:
+            self._add_line(line, emitted)
+        return emitted
+    
+    def feed_page(self, page_text: str) -> List[Chapter]:
+        """Anade una pagina; las paginas se unen con '\\n' y las vacias se saltan (como _join_pages)."""
+        if not page_text:
+            return []
+        self._pages += 1
+        return self.feed(page_text if self._pages == 1 else '\n' + page_text)
+    
+    def finish(self) -> List[Chapter]:
+        """Cierra el texto y devuelve los capitulos restantes."""
+        if self._finished:
+            return []
+        self._finished = True
+        emitted = []
+        
+        # La ultima linea no tiene linea siguiente: el titulo pendiente se acepta sin mirarla
+        self._add_line(self._partial, emitted)
+        if self._candidate is not None:
+            self._open_chapter(self._candidate, emitted)
+            self._candidate = None
+        self._close_chapter(self._line_number, emitted)
+        
+        if not self.confirmed:
+            # Menos de MIN_CHAPTER_MARKERS titulos: falsos positivos, como en detect_chapter_patterns
+            self._held = []
+            return []
+        return emitted
+    
+    def _add_line(self, line: str, emitted: List[Chapter]) -> None:
+        line_number = self._line_number
+        self._line_number += 1
+        line_stripped = line.strip()
+        
+        # Confirmar o descartar el titulo de la linea anterior
+        if self._candidate is not None:
+            if len(line_stripped) >= MIN_NEXT_LINE_LENGTH:
+                self._open_chapter(self._candidate, emitted)
+            elif self._chapter is not None:
+                self._lines.append(self._candidate[2])
+            self._candidate = None
+        
+        if (MIN_MARKER_LENGTH <= len(line_stripped) <= MAX_MARKER_LENGTH
+                and CHAPTER_MARKER_RE.match(line)):
+            self._candidate = (line_number, line_stripped, line)
+        elif self._chapter is not None:
+            self._lines.append(line)
+    
+    def _open_chapter(self, marker: Tuple[int, str, str], emitted: List[Chapter]) -> None:
+        # Contar el titulo antes de cerrar el anterior: al confirmar el
+        # MIN_CHAPTER_MARKERS-esimo ya se emiten los capitulos retenidos
+        self._markers += 1
+        self._close_chapter(marker[0], emitted)
+        self._chapter = marker
+        self._lines = []
+    
+    def _close_chapter(self, end_idx: int, emitted: List[Chapter]) -> None:
+        if self._chapter is None:
+            return
+        start_idx, title, title_line = self._chapter
+        # Capitulo de una sola linea: el contenido es el propio titulo
+        content = '\n'.join(self._lines) if self._lines else title_line
+        content = content.strip()
+        self._chapter = None
+        self._lines = []
+        
+        if content:  # Solo agregar si tiene contenido
+            self._held.append(Chapter(title=title, content=content, start_index=start_idx, end_index=end_idx))
+        if self.confirmed:
+            emitted.extend(self._held)
+            self._held = []
+
+
+def _join_spans(spans: Sequence[TextSpan], separator: str) -> List[TextSpan]:
+    """Une en un solo tramo los parrafos consecutivos del mismo texto (separator.join sin copiar)."""
+    joined = []
+    for source, start, end in spans:
+        if joined:
+            last_source, last_start, last_end = joined[-1]
+            if last_source is source and last_end + len(separator) == start and source[last_end:start] == separator:
+                joined[-1] = (source, last_start, end)
+                continue
+        joined.append((source, start, end))
+    return joined
+
+
 def split_long_chapter(chapter: Chapter, max_words: int = 10380) -> List[Chapter]:
-    """Divide un capitulo largo en partes mas pequenas."""
-    words = chapter.content.split()
+    """
+    Divide un capitulo largo en partes mas pequenas.
     
-    if len(words) <= max_words:
+    Cada parrafo se cuenta una vez (Chapter.paragraphs) y las partes son
+    tramos del mismo texto que el capitulo: no se copia ni se vuelve a
+    partir el texto. Coste lineal en el numero de parrafos.
+    """
+    # Dividir por parrafos cuando sea posible
+    separator = '\n\n'
+    paragraphs = chapter.paragraphs(separator)
+    
+    if chapter.word_count <= max_words:
         return [chapter]
     
+    # Texto de PDF sin parrafos marcados: dividir por lineas
+    if max(para_word_count for _, para_word_count in paragraphs) > max_words:
+        separator = '\n'
+        paragraphs = chapter.paragraphs(separator)
+    
     parts = []
-    current_part = []
+    part_start = 0
     current_word_count = 0
-    part_num = 1
-    
-    # Dividir por parrafos cuando sea posible
-    paragraphs = chapter.content.split('\n\n')
-    
-    for para in paragraphs:
-        para_words = para.split()
-        para_word_count = len(para_words)
-        
-        if current_word_count + para_word_count > max_words and current_part:
-            # Crear parte actual
-            part_content = '\n\n'.join(current_part)
-            parts.append(Chapter(
-                title=f"{chapter.title} - Parte {part_num}",
-                content=part_content,
-                start_index=chapter.start_index,
-                end_index=chapter.end_index
-            ))
-            current_part = [para]
-            current_word_count = para_word_count
-            part_num += 1
-        else:
-            current_part.append(para)
-            current_word_count += para_word_count
     
-    # Agregar última parte
-    if current_part:
-        part_content = '\n\n'.join(current_part)
+    def add_part(part_end: int) -> None:
         parts.append(Chapter(
-            title=f"{chapter.title} - Parte {part_num}",
-            content=part_content,
+            title=f"{chapter.title} - Parte {len(parts) + 1}",
+            spans=_join_spans([span for span, _ in paragraphs[part_start:part_end]], separator),
             start_index=chapter.start_index,
-            end_index=chapter.end_index
+            end_index=chapter.end_index,
+            word_count=current_word_count
         ))
     
+    for i, (_, para_word_count) in enumerate(paragraphs):
+        if current_word_count + para_word_count > max_words and i > part_start:
+            # Cerrar la parte actual
+            add_part(i)
+            part_start = i
+            current_word_count = 0
+        current_word_count += para_word_count
+    
+    # Agregar última parte
+    if part_start < len(paragraphs):
+        add_part(len(paragraphs))
+    
     return parts
 
 
+def _merge_chapters(group: List[Chapter], titles: List[str], word_count: int) -> Chapter:
+    """Un capitulo con los tramos de todo el grupo (se unen una sola vez, al cerrar el grupo)."""
+    if len(group) == 1:
+        return group[0]
+    return Chapter(
+        title=' y '.join(titles),
+        spans=[span for chapter in group for span in chapter.spans],
+        start_index=group[0].start_index,
+        end_index=group[-1].end_index,
+        word_count=word_count
+    )
+
+
 def combine_small_chapters(chapters: List[Chapter], min_words: int) -> List[Chapter]:
-    """Combina capitulos pequeños hasta alcanzar el minimo de palabras."""
-    if not chapters:
-        return []
+    """
+    Combina capitulos pequeños hasta alcanzar el minimo de palabras.
     
+    Los capitulos de cada grupo se acumulan en una lista y se unen una sola
+    vez al cerrar el grupo (antes se concatenaba el texto en cada union,
+    coste cuadratico con cientos de secciones pequenas). Las palabras de
+    cada capitulo vienen de su contador cacheado.
+    """
     combined = []
-    current_chapter = None
+    group = []
+    titles = []
+    title_length = 0
     current_words = 0
     
     for chapter in chapters:
-        chapter_words = len(chapter.content.split())
+        chapter_words = chapter.word_count
         
-        if current_chapter is None:
-            # Iniciar nuevo capitulo combinado
-            current_chapter = chapter
-            current_words = chapter_words
-        elif current_words + chapter_words < min_words:
-            # Combinar con el capitulo actual
-            # Usar el titulo del primero y combinar contenido
-            combined_title = current_chapter.title
-            if chapter.title != current_chapter.title:
-                combined_title = f"{current_chapter.title} y {chapter.title}"
-            
-            combined_content = current_chapter.content + "\n\n" + chapter.content
-            current_chapter = Chapter(
-                title=combined_title,
-                content=combined_content,
-                start_index=current_chapter.start_index,
-                end_index=chapter.end_index
-            )
+        if group and current_words + chapter_words < min_words:
+            # Combinar con el grupo actual: "Titulo 1 y Titulo 2 y ..." salvo
+            # si el titulo coincide con el del grupo (partes repetidas)
+            if len(chapter.title) != title_length or chapter.title != ' y '.join(titles):
+                titles.append(chapter.title)
+                title_length += len(' y ') + len(chapter.title)
+            group.append(chapter)
             current_words += chapter_words
         else:
-            # El capitulo actual ya tiene suficientes palabras, guardarlo
-            combined.append(current_chapter)
-            # Iniciar nuevo capitulo
-            current_chapter = chapter
+            # El grupo actual ya tiene suficientes palabras, guardarlo
+            if group:
+                combined.append(_merge_chapters(group, titles, current_words))
+            # Iniciar nuevo grupo
+            group = [chapter]
+            titles = [chapter.title]
+            title_length = len(chapter.title)
             current_words = chapter_words
     
-    # Agregar el ultimo capitulo
-    if current_chapter:
-        combined.append(current_chapter)
+    # Agregar el ultimo grupo
+    if group:
+        combined.append(_merge_chapters(group, titles, current_words))
     
     return combined
 
 
-def segment_text_by_minutes(text: str, pdf_title: str, minutes_per_chapter: int = 45) -> List[Chapter]:
+def build_sentence_index(text: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Indice de frases: donde termina cada frase y cuantas palabras hay hasta ahi.
+    
+    Un solo recorrido del texto (sentences.sentence_ends); las palabras se cuentan
+    frase a frase y se acumulan, asi que nunca se crea la lista de palabras
+    del libro. Los finales de parrafo tambien cuentan como final de frase.
+    
+    Returns:
+        (posiciones en text del final de cada frase,
+         palabras acumuladas hasta ese final), ambos crecientes. La ultima
+        frase termina en len(text)
+    """
+    ends = sentence_ends(text)
+    if not len(ends):
+        ends = np.zeros(1, dtype=np.int64)
+    
+    counts = np.empty(len(ends), dtype=np.int64)
+    start = 0
+    for i, end in enumerate(ends.tolist()):
+        counts[i] = len(text[start:end].split())
+        start = end
+    
+    return ends, np.cumsum(counts)
+
+
+def sentence_cuts(cumulative_words: np.ndarray, words_per_part: int,
+                  max_drift: float = MAX_CUT_DRIFT) -> List[Tuple[int, Optional[int]]]:
+    """
+    Elige los cortes de las partes en el indice de frases.
+    
+    Cada parte termina en el final de frase mas cercano a words_per_part
+    palabras desde su inicio (searchsorted: O(log n) por corte). Si el
+    final de frase mas cercano se aleja mas de max_drift * words_per_part
+    (texto sin puntuacion), la parte se corta en la palabra exacta.
+    
+    Args:
+        cumulative_words: Palabras acumuladas al final de cada frase (build_sentence_index)
+        words_per_part: Palabras objetivo de cada parte
+        max_drift: Desviacion maxima admitida, en fraccion de la parte
+    
+    Returns:
+        Lista de (palabras acumuladas al final de la parte, indice de la
+        frase donde termina o None si se corta en mitad de una frase)
+    """
+    total_words = int(cumulative_words[-1]) if len(cumulative_words) else 0
+    max_offset = max_drift * words_per_part
+    cuts = []
+    part_start = 0
+    
+    while total_words - part_start > words_per_part:
+        target = part_start + words_per_part
+        i = int(np.searchsorted(cumulative_words, target))
+        # Candidatas: el ultimo final de frase antes del objetivo y el primero despues
+        if i > 0 and cumulative_words[i - 1] > part_start and target - cumulative_words[i - 1] <= cumulative_words[i] - target:
+            i -= 1
+        
+        if abs(int(cumulative_words[i]) - target) > max_offset:
+            cuts.append((target, None))
+            part_start = target
+        else:
+            cuts.append((int(cumulative_words[i]), i))
+            part_start = int(cumulative_words[i])
+    
+    if total_words > part_start:
+        cuts.append((total_words, len(cumulative_words) - 1))
+    
+    return cuts
+
+
+def segment_text_by_minutes(text: str, pdf_title: str, minutes_per_chapter: int = 45,
+                            words_per_minute: float = DEFAULT_WORDS_PER_MINUTE) -> List[Chapter]:
     """
-    Segmenta el texto dividiendo por minutos consecutivos (enfoque MVP simple).
+    Segmenta el texto en partes de minutos consecutivos que terminan en final de frase.
     
-    Parte 1: min 0 hasta min 45
-    Parte 2: min 45 hasta min 90
-    Parte 3: min 90 hasta min 135
+    Parte 1: min 0 hasta ~min 45
+    Parte 2: ~min 45 hasta ~min 90
     Y asi sucesivamente hasta terminar el PDF.
     
+    Cada parte termina en el final de frase mas cercano a los
+    minutes_per_chapter minutos (ver sentence_cuts) y conserva los saltos
+    de parrafo del texto.
+    
     Args:
         text: Texto completo a segmentar
         pdf_title: Nombre del archivo PDF (sin extension)
         minutes_per_chapter: Minutos por parte (default: 45)
+        words_per_minute: Ritmo del motor TTS (calibrado con duration_model)
     
     Returns:
-        Lista de capitulos de exactamente minutes_per_chapter minutos cada uno
+        Lista de capitulos de ~minutes_per_chapter minutos cada uno
+        (start/end_index son posiciones en palabras)
     """
-    words_per_minute = 173  # Con velocidad 1.15x
-    words_per_part = minutes_per_chapter * words_per_minute  # ~7785 palabras por parte de 45 min
+    words_per_part = round(minutes_per_chapter * words_per_minute)  # ~7785 palabras por parte de 45 min a 173 pal/min
+    
+    sentence_ends, cumulative_words = build_sentence_index(text)
+    cuts = sentence_cuts(cumulative_words, words_per_part)
     
     # Calcular total de palabras y minutos
-    words_list = text.split()
-    total_words = len(words_list)
+    total_words = int(cumulative_words[-1])
     total_minutes = total_words / words_per_minute
-    num_parts = max(1, int(total_minutes / minutes_per_chapter) + (1 if total_minutes % minutes_per_chapter > 0 else 0))
     
     # Obtener primeras 5 palabras del titulo del PDF
     title_words = pdf_title.split()[:5]
     base_title = ' '.join(title_words)
     
     print(f"   📊 Total: {total_words} palabras (~{total_minutes:.1f} minutos)")
-    print(f"   📚 Dividiendo en {num_parts} parte(s) de {minutes_per_chapter} minutos cada una")
+    print(f"   📚 Dividiendo en {len(cuts)} parte(s) de ~{minutes_per_chapter} minutos cada una (cortes en final de frase)")
     print(f"   📝 Parte 1: min 0-{minutes_per_chapter}, Parte 2: min {minutes_per_chapter}-{minutes_per_chapter*2}, etc.")
     
+    # Palabras exactas para los cortes en mitad de una frase (texto sin puntuacion)
+    word_run_re = re.compile(r'(?:\s*+\S++){%d}' % words_per_part)
+    
     chapters = []
+    start_offset = 0
+    start_word_idx = 0
     
-    # Dividir por palabras consecutivas
-    # Cada parte tiene exactamente words_per_part palabras (excepto la ultima)
-    for i in range(num_parts):
-        # Calcular rango de palabras para esta parte
-        start_word_idx = i * words_per_part
-        end_word_idx = min((i + 1) * words_per_part, total_words)
-        
-        # Obtener palabras de esta parte
-        part_words = words_list[start_word_idx:end_word_idx]
-        
-        if not part_words:
-            continue
-        
-        # Reconstruir texto: unir palabras con espacios
-        part_text = ' '.join(part_words)
-        
-        # Verificacion: mostrar primeras palabras de cada parte para confirmar que son diferentes
-        first_words = ' '.join(part_words[:10])  # Primeras 10 palabras
-        last_words = ' '.join(part_words[-10:])  # Ultimas 10 palabras
-        
-        # Calcular minutos de esta parte
-        part_minutes_start = (i * minutes_per_chapter)
-        part_minutes_end = min((i + 1) * minutes_per_chapter, total_minutes)
+    for i, (end_word_idx, sentence) in enumerate(cuts):
+        if sentence is not None:
+            end_offset = int(sentence_ends[sentence])
+        else:
+            first_word = strip_span(text, start_offset, len(text))[0]
+            end_offset = word_run_re.match(text, first_word).end()
         
-        chapters.append(Chapter(
+        part_start, part_end = strip_span(text, start_offset, end_offset)
+        chapter = Chapter(
             title=f"{base_title} - Parte {i + 1}",
-            content=part_text,
+            spans=[(text, part_start, part_end)],
             start_index=start_word_idx,
-            end_index=end_word_idx
-        ))
+            end_index=end_word_idx,
+            word_count=end_word_idx - start_word_idx
+        )
+        chapters.append(chapter)
         
         # Mostrar preview de cada parte para verificar que son diferentes
-        if i < 3 or i == num_parts - 1:  # Mostrar primeras 3 y ultima
-            print(f"      Parte {i+1}: Inicia con '{first_words[:50]}...' | Termina con '...{last_words[-50:]}'")
+        if i < 3 or i == len(cuts) - 1:  # Mostrar primeras 3 y ultima
+            content = chapter.content
+            first_words = ' '.join(content.split(maxsplit=10)[:10])  # Primeras 10 palabras
+            last_words = ' '.join(content.rsplit(maxsplit=10)[-10:])  # Ultimas 10 palabras
+            print(f"      Parte {i+1} (~{chapter.word_count / words_per_minute:.1f} min): "
+                  f"Inicia con '{first_words[:50]}...' | Termina con '...{last_words[-50:]}'")
+        
+        start_offset = end_offset
+        start_word_idx = end_word_idx
     
     return chapters
 
 
-def segment_text(text: str, pdf_title: str = "", min_audio_minutes: int = 20, max_audio_minutes: int = 60) -> List[Chapter]:
+def _outline_chapter_level(outline: Sequence[OutlineEntry]) -> int:
+    """Nivel de titulo que separa capitulos: el primero con al menos 2 entradas acumuladas."""
+    for level in range(1, MAX_LEVELS + 1):
+        if sum(1 for entry in outline if entry.level <= level) >= 2:
+            return level
+    return MAX_LEVELS
+
+
+def chapters_from_outline(text: str, outline: Sequence[OutlineEntry], max_level: Optional[int] = None) -> List[Chapter]:
     """
-    Segmenta el texto en partes usando divisor simple por minutos (MVP).
+    Corta el texto en los titulos del esquema (outline) del PDF.
     
-    Enfoque simple: calcula minutos totales y divide en partes de 45 minutos.
-    Nombres: primeras 5 palabras del PDF + "Parte X"
+    Cada entrada ya trae su posicion en el texto limpio, asi que no hace
+    falta recorrer el texto linea a linea como en detect_chapter_patterns.
+    
+    Args:
+        text: Texto limpio del libro
+        outline: Entradas del esquema localizadas en text (char_offset >= 0)
+        max_level: Nivel maximo de titulo que abre capitulo (None = automatico)
+    
+    Returns:
+        Capitulos con el titulo de cada entrada; el texto anterior al primer
+        titulo se conserva como "Inicio". start/end_index son posiciones en text
     """
-    # Limpiar nombre del PDF (quitar extension y caracteres especiales)
-    if not pdf_title:
-        pdf_title = "Documento"
-    else:
-        # Quitar extension .pdf
-        pdf_title = pdf_title.replace('.pdf', '').replace('.PDF', '')
-        # Limpiar caracteres especiales para nombre
-        import re
-        pdf_title = re.sub(r'[<>:"/\\|?*]', '', pdf_title)
+    if max_level is None:
+        max_level = _outline_chapter_level(outline)
+    
+    entries = sorted((entry for entry in outline if entry.char_offset >= 0 and entry.level <= max_level),
+                     key=lambda entry: entry.char_offset)
+    chapters = []
+    
+    first_offset = entries[0].char_offset if entries else len(text)
+    intro_start, intro_end = strip_span(text, 0, first_offset)
+    if intro_start < intro_end:
+        chapters.append(Chapter(title="Inicio", spans=[(text, intro_start, intro_end)], start_index=0, end_index=first_offset))
+    
+    for i, entry in enumerate(entries):
+        end_offset = entries[i + 1].char_offset if i + 1 < len(entries) else len(text)
+        
+        # Quitar el titulo del contenido
+        content_start = entry.char_offset
+        match = heading_pattern(entry.title).match(text, entry.char_offset, end_offset)
+        if match:
+            content_start = match.end()
+        
+        content_start, content_end = strip_span(text, content_start, end_offset)
+        if content_start < content_end:
+            chapters.append(Chapter(
+                title=entry.title,
+                spans=[(text, content_start, content_end)],
+                start_index=entry.char_offset,
+                end_index=end_offset
+            ))
+    
+    return chapters
+
+
+def fit_chapters_to_duration(chapters: List[Chapter], min_audio_minutes: int = 20, max_audio_minutes: int = 60,
+                             words_per_minute: float = DEFAULT_WORDS_PER_MINUTE) -> List[Chapter]:
+    """Divide los capitulos de mas de max_audio_minutes y combina los de menos de min_audio_minutes."""
+    parts = []
+    for chapter in chapters:
+        parts.extend(split_long_chapter(chapter, max_words=round(max_audio_minutes * words_per_minute)))
+    return combine_small_chapters(parts, min_words=round(min_audio_minutes * words_per_minute))
+
+
+def segment_text(text: str, pdf_title: str = "", min_audio_minutes: int = 20, max_audio_minutes: int = 60,
+                 outline: Optional[Sequence[OutlineEntry]] = None,
+                 bookmarks: Optional[Sequence[OutlineEntry]] = None,
+                 words_per_minute: float = DEFAULT_WORDS_PER_MINUTE,
+                 heading_threshold: float = HEADING_SCORE_THRESHOLD) -> List[Chapter]:
+    """
+    Segmenta el texto en capitulos o partes.
+    
+    Orden de preferencia:
+    1. Marcadores (indice) del PDF: ya traen su posicion en el texto, no
+       hace falta recorrerlo
+    2. Titulos detectados por tipografia (outline, modo --layout)
+    3. Titulos detectados con regex linea a linea (extract_chapters)
+    4. Titulos detectados por rasgos de cada linea (longitud, mayusculas,
+       numeracion, lineas en blanco alrededor...) con puntuacion minima
+       heading_threshold (extract_chapters_by_features)
+    5. Divisor simple por minutos (MVP): partes de ~45 minutos que
+       terminan en final de frase, con nombre = primeras 5 palabras del
+       PDF + "Parte X"
+    
+    En los casos 1-4 los capitulos largos se dividen en partes de
+    max_audio_minutes y los cortos se combinan hasta min_audio_minutes.
+    Los minutos se convierten a palabras con words_per_minute, el ritmo
+    calibrado del motor TTS (duration_model.DurationStats).
+    """
+    pdf_title = _clean_pdf_title(pdf_title)
+    
+    sources = (
+        ("el indice del PDF", bookmarks),
+        ("el esquema tipografico del PDF", outline),
+    )
+    for source_name, entries in sources:
+        if not entries:
+            continue
+        chapters = chapters_from_outline(text, entries)
+        if len(chapters) >= 2:
+            parts = fit_chapters_to_duration(chapters, min_audio_minutes, max_audio_minutes, words_per_minute)
+            print(f"   📑 {len(chapters)} capitulo(s) segun {source_name} -> {len(parts)} parte(s)")
+            return parts
+        print(f"   ⚠️  {source_name[0].upper()}{source_name[1:]} no tiene suficientes titulos")
+    
+    chapters = extract_chapters(text)
+    if chapters:
+        parts = fit_chapters_to_duration(chapters, min_audio_minutes, max_audio_minutes, words_per_minute)
+        print(f"   📑 {len(chapters)} capitulo(s) detectados en el texto -> {len(parts)} parte(s)")
+        return parts
+    
+    chapters = extract_chapters_by_features(text, heading_threshold)
+    if chapters:
+        parts = fit_chapters_to_duration(chapters, min_audio_minutes, max_audio_minutes, words_per_minute)
+        print(f"   📑 {len(chapters)} capitulo(s) detectados por rasgos del texto -> {len(parts)} parte(s)")
+        return parts
     
     # Usar divisor simple de 45 minutos por parte
-    return segment_text_by_minutes(text, pdf_title, minutes_per_chapter=45)
+    return segment_text_by_minutes(text, pdf_title, minutes_per_chapter=45, words_per_minute=words_per_minute)
+
+
+def _clean_pdf_title(pdf_title: str) -> str:
+    """Limpia el nombre del PDF (quita extension y caracteres especiales)."""
+    if not pdf_title:
+        return "Documento"
+    
+    # Quitar extension .pdf
+    pdf_title = pdf_title.replace('.pdf', '').replace('.PDF', '')
+    # Limpiar caracteres especiales para nombre
+    return re.sub(r'[<>:"/\\|?*]', '', pdf_title)
+
+
+def iter_segments_by_minutes(pages: Iterable[Tuple[int, str]], pdf_title: str, minutes_per_chapter: int = 45,
+                             words_per_minute: float = DEFAULT_WORDS_PER_MINUTE) -> Iterator[Chapter]:
+    """
+    Version en streaming de segment_text_by_minutes.
+    
+    Consume paginas (numero, texto) a medida que se extraen y entrega cada
+    parte en cuanto acumula sus palabras, sin esperar al final del PDF.
+    Solo se mantienen en memoria las palabras de la parte en curso.
+    
+    Args:
+        pages: Iterable de tuplas (numero de pagina, texto limpio)
+        pdf_title: Nombre del archivo PDF (sin extension)
+        minutes_per_chapter: Minutos por parte (default: 45)
+        words_per_minute: Ritmo del motor TTS (calibrado con duration_model)
+    
+    Yields:
+        Capitulos de exactamente minutes_per_chapter minutos (en streaming
+        no se conoce el texto siguiente, asi que se corta en la palabra
+        exacta en lugar del final de frase de segment_text_by_minutes)
+    """
+    words_per_part = round(minutes_per_chapter * words_per_minute)
+    
+    base_title = ' '.join(pdf_title.split()[:5])
+    
+    part_words = []
+    part_first_page = None
+    part_num = 1
+    start_word_idx = 0
+    
+    for page_number, page_text in pages:
+        if part_first_page is None:
+            part_first_page = page_number
+        part_words.extend(page_text.split())
+        
+        # Una pagina puede completar mas de una parte
+        while len(part_words) >= words_per_part:
+            chapter_words = part_words[:words_per_part]
+            del part_words[:words_per_part]
+            
+            print(f"      Parte {part_num}: paginas {part_first_page}-{page_number} ({len(chapter_words)} palabras)")
+            yield Chapter(
+                title=f"{base_title} - Parte {part_num}",
+                content=' '.join(chapter_words),
+                start_index=start_word_idx,
+                end_index=start_word_idx + len(chapter_words)
+            )
+            part_num += 1
+            start_word_idx += len(chapter_words)
+            part_first_page = page_number if part_words else None
+    
+    # Ultima parte (puede ser mas corta)
+    if part_words:
+        print(f"      Parte {part_num}: paginas {part_first_page}-final ({len(part_words)} palabras)")
+        yield Chapter(
+            title=f"{base_title} - Parte {part_num}",
+            content=' '.join(part_words),
+            start_index=start_word_idx,
+            end_index=start_word_idx + len(part_words)
+        )
+
+
+def segment_pages(pages: Iterable[Tuple[int, str]], pdf_title: str = "",
+                  words_per_minute: float = DEFAULT_WORDS_PER_MINUTE) -> Iterator[Chapter]:
+    """Equivalente en streaming de segment_text para paginas de iter_pdf_pages."""
+    return iter_segments_by_minutes(pages, _clean_pdf_title(pdf_title), minutes_per_chapter=45,
+                                    words_per_minute=words_per_minute)
 
 
 def create_automatic_segmentation(text: str, min_words: int, max_words: int) -> List[Chapter]:
@@ -0,0 +1,134 @@
+"""Modelo de duracion del audio por motor TTS, calibrado con las duraciones medidas en cada ejecucion."""
+import json
+import os
+import re
+import tempfile
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+
+DEFAULT_STATS_PATH = Path('cache') / 'duracion_tts.json'
+DEFAULT_WORDS_PER_MINUTE = 173       # Estimacion sin calibrar (velocidad 1.15x)
+MIN_CALIBRATION_SECONDS = 10 * 60    # Audio medido necesario antes de usar la calibracion
+MAX_STATS_SECONDS = 20 * 3600        # Al superarlo se reducen los acumulados: los datos antiguos pierden peso
+
+_WORD_RE = re.compile(r'\S+')
+
+
+@dataclass
+class VoiceStats:
+    """Acumulados medidos para un motor/voz/velocidad."""
+    chars: float = 0.0
+    words: float = 0.0
+    seconds: float = 0.0
+    runs: int = 0
+    
+    @property
+    def chars_per_second(self) -> float:
+        return self.chars / self.seconds if self.seconds else 0.0
+    
+    @property
+    def words_per_minute(self) -> float:
+        return self.words * 60 / self.seconds if self.seconds else 0.0
+
+
+def voice_profile(engine: str, voice: str, rate: str) -> str:
+    """Clave de las estadisticas: cada combinacion motor/voz/velocidad tiene su ritmo."""
+    return f"{engine}|{voice}|{rate}"
+
+
+def audio_duration_seconds(audio_path: str) -> Optional[float]:
+    """Duracion de un archivo de audio (ffprobe a traves de pydub), o None si no se puede medir."""
+    try:
+        from pydub.utils import mediainfo
+        return float(mediainfo(str(audio_path))['duration'])
+    except Exception:
+        return None
+
+
+class DurationStats:
+    """
+    Almacen local (JSON) de caracteres -> segundos medidos por motor TTS.
+    
+    Tras cada ejecucion se suma lo generado (caracteres y palabras del texto
+    original de cada capitulo, antes de adaptarlo, y duracion real de los
+    MP3); la segmentacion, que mide ese mismo texto, usa el ritmo calibrado
+    en lugar de los 173 palabras/minuto fijos. Los acumulados se
+    limitan a MAX_STATS_SECONDS para que un cambio de voz se note pronto.
+    """
+    
+    def __init__(self, path: Path = DEFAULT_STATS_PATH):
+        self.path = Path(path)
+        self.profiles: Dict[str, VoiceStats] = self._load()
+    
+    def _load(self) -> Dict[str, VoiceStats]:
+        try:
+            data = json.loads(self.path.read_text(encoding='utf-8'))
+            return {profile: VoiceStats(**values) for profile, values in data.items()}
+        except (FileNotFoundError, ValueError, TypeError):
+            return {}
+    
+    def get(self, profile: str) -> Optional[VoiceStats]:
+        """Estadisticas del perfil si hay suficiente audio medido, o None."""
+        stats = self.profiles.get(profile)
+        if stats is None or stats.seconds < MIN_CALIBRATION_SECONDS:
+            return None
+        return stats
+    
+    def record(self, profile: str, chars: int, words: int, seconds: float) -> VoiceStats:
+        """Suma una ejecucion al perfil y devuelve sus estadisticas actualizadas."""
+        stats = self.profiles.setdefault(profile, VoiceStats())
+        stats.chars += chars
+        stats.words += words
+        stats.seconds += seconds
+        stats.runs += 1
+        
+        if stats.seconds > MAX_STATS_SECONDS:
+            scale = MAX_STATS_SECONDS / stats.seconds
+            stats.chars *= scale
+            stats.words *= scale
+            stats.seconds = MAX_STATS_SECONDS
+        
+        return stats
+    
+    def save(self) -> None:
+        """Guarda las estadisticas (escritura atomica)."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        content = json.dumps({profile: asdict(stats) for profile, stats in self.profiles.items()},
+                             ensure_ascii=False, indent=2)
+        fd, temp_path = tempfile.mkstemp(dir=self.path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(content)
+            os.replace(temp_path, self.path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+    
+    def words_per_minute(self, profile: str, text: Optional[str] = None) -> float:
+        """
+        Palabras por minuto para segmentar un texto con este perfil.
+        
+        Con el texto, el ritmo sale de los caracteres por segundo medidos y
+        de la longitud media de las palabras de ese libro (un libro de
+        palabras largas dura mas con las mismas palabras). Sin texto (modo
+        streaming) se usan las palabras por minuto medidas.
+        
+        Args:
+            profile: Perfil del motor TTS (voice_profile)
+            text: Texto que se va a segmentar (opcional)
+        
+        Returns:
+            Palabras por minuto calibradas, o DEFAULT_WORDS_PER_MINUTE sin calibracion
+        """
+        stats = self.get(profile)
+        if stats is None:
+            return DEFAULT_WORDS_PER_MINUTE
+        if text:
+            # Contar sin construir la lista de palabras del libro (como str.split)
+            word_count = sum(1 for _ in _WORD_RE.finditer(text))
+            if word_count:
+                return stats.chars_per_second * 60 * word_count / len(text)
+        return stats.words_per_minute
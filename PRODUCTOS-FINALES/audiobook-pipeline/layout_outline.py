@@ -0,0 +1,180 @@
+"""Deteccion de titulos por metricas tipograficas (tamano, negrita, posicion) y esquema del libro."""
+import re
+from collections import Counter, defaultdict
+from dataclasses import dataclass, replace
+from typing import List, NamedTuple, Sequence
+
+import numpy as np
+
+
+# Version del clasificador: forma parte de los metadatos de la cache, al
+# cambiarla se recalcula el esquema aunque el texto siga en cache
+OUTLINE_VERSION = "1"
+
+HEADING_SIZE_RATIO = 1.15    # Un titulo es al menos un 15% mas grande que el cuerpo
+MAX_HEADING_SHARE = 0.10     # Un estilo con mas del 10% de los caracteres es texto normal
+MAX_HEADING_LENGTH = 150     # Caracteres maximos de un titulo
+MAX_BOLD_HEADING_WORDS = 12  # Palabras maximas de un titulo solo en negrita
+MAX_HEADING_PAGES = 3        # El mismo texto en mas paginas es una cabecera, no un titulo
+MAX_LEVELS = 3
+
+_BOLD_FONT_RE = re.compile(r'bold|black|heavy|semibold|demi', re.IGNORECASE)
+
+
+class LayoutLine(NamedTuple):
+    """Linea de una pagina con sus metricas tipograficas."""
+    text: str
+    size: float   # Tamano de letra dominante (pt)
+    bold: bool
+    top: float    # Posicion vertical relativa (0 = borde superior, 1 = inferior)
+
+
+@dataclass
+class OutlineEntry:
+    """Titulo del esquema del libro."""
+    title: str
+    page: int              # Pagina (empezando en 1)
+    char_offset: int = -1  # Posicion en el texto limpio (-1 = sin localizar)
+    level: int = 1         # 1 = titulo principal
+
+
+def is_bold_font(font_name: str) -> bool:
+    """Indica si el nombre de la fuente corresponde a una variante en negrita."""
+    return bool(_BOLD_FONT_RE.search(font_name or ''))
+
+
+def heading_pattern(title: str):
+    """Regex que encuentra el titulo en el texto limpio aunque cambien los saltos de linea o mayusculas."""
+    return re.compile(r'\s+'.join(re.escape(word) for word in title.split()), re.IGNORECASE)
+
+
+def classify_headings(page_lines: Sequence[Sequence[LayoutLine]]) -> List[OutlineEntry]:
+    """
+    Clasifica como titulos las lineas con un estilo poco frecuente.
+    
+    Las estadisticas se calculan sobre todo el libro a la vez (numpy):
+    el tamano del cuerpo es la mediana del tamano ponderada por caracteres,
+    y un tamano es de titulo si supera al cuerpo en HEADING_SIZE_RATIO y
+    ocupa como mucho MAX_HEADING_SHARE de los caracteres. Cada tamano de
+    titulo es un nivel (el mayor = 1). Las lineas en negrita del tamano del
+    cuerpo cuentan como el nivel mas bajo si la negrita es poco frecuente.
+    
+    Args:
+        page_lines: Lineas de cada pagina (en orden), con sus metricas
+    
+    Returns:
+        Entradas del esquema sin localizar en el texto (char_offset = -1)
+    """
+    lines = [(page_number, line) for page_number, page in enumerate(page_lines, 1) for line in page]
+    if not lines:
+        return []
+    
+    count = len(lines)
+    # Tamanos redondeados a medio punto para agrupar variaciones minimas
+    sizes = np.fromiter((line.size for _, line in lines), dtype=float, count=count)
+    sizes = np.round(sizes * 2) / 2
+    lengths = np.fromiter((len(line.text) for _, line in lines), dtype=np.int64, count=count)
+    bold = np.fromiter((line.bold for _, line in lines), dtype=bool, count=count)
+    
+    total_chars = lengths.sum()
+    if total_chars == 0:
+        return []
+    
+    # Proporcion de caracteres de cada tamano y tamano del cuerpo (percentil 50)
+    unique_sizes, size_index = np.unique(sizes, return_inverse=True)
+    size_share = np.bincount(size_index, weights=lengths, minlength=len(unique_sizes)) / total_chars
+    body_size = unique_sizes[min(np.searchsorted(np.cumsum(size_share), 0.5), len(unique_sizes) - 1)]
+    
+    heading_sizes = (unique_sizes >= body_size * HEADING_SIZE_RATIO) & (size_share <= MAX_HEADING_SHARE)
+    size_levels = np.zeros(len(unique_sizes), dtype=np.int64)
+    ranked = np.flatnonzero(heading_sizes)[::-1]
+    size_levels[ranked] = np.minimum(np.arange(1, len(ranked) + 1), MAX_LEVELS)
+    levels = size_levels[size_index]
+    
+    # Negrita del tamano del cuerpo: titulos de seccion si es poco frecuente
+    if lengths[bold].sum() / total_chars <= MAX_HEADING_SHARE:
+        word_counts = np.fromiter((len(line.text.split()) for _, line in lines), dtype=np.int64, count=count)
+        bold_headings = bold & (levels == 0) & (sizes >= body_size - 0.5) & (word_counts <= MAX_BOLD_HEADING_WORDS)
+        levels[bold_headings] = min(len(ranked) + 1, MAX_LEVELS)
+    
+    candidates = (levels > 0) & (lengths <= MAX_HEADING_LENGTH)
+    
+    # Un texto repetido en muchas paginas (titulo del libro en la cabecera) no es un titulo
+    pages_by_text = defaultdict(set)
+    for i in np.flatnonzero(candidates):
+        page_number, line = lines[i]
+        pages_by_text[line.text.lower()].add(page_number)
+    repeated = {text for text, pages in pages_by_text.items() if len(pages) > MAX_HEADING_PAGES}
+    
+    entries = []
+    previous = -2
+    for i in np.flatnonzero(candidates):
+        page_number, line = lines[i]
+        if line.text.lower() in repeated or not any(c.isalpha() for c in line.text):
+            continue
+        level = int(levels[i])
+        
+        last = entries[-1] if entries else None
+        if last and previous == i - 1 and last.page == page_number and last.level == level:
+            # Titulo en varias lineas: unirlas (y la palabra cortada con guion)
+            if last.title.endswith('-') and line.text[:1].isalnum():
+                last.title = last.title[:-1] + line.text
+            else:
+                last.title = f"{last.title} {line.text}"
+        else:
+            entries.append(OutlineEntry(title=line.text, page=page_number, level=level))
+        previous = i
+    
+    return entries
+
+
+def locate_outline(entries: Sequence[OutlineEntry], text: str, page_offsets: Sequence[int],
+                   page_start_fallback: bool = False) -> List[OutlineEntry]:
+    """
+    Busca cada titulo en el texto limpio, dentro de su pagina.
+    
+    Los titulos que no aparecen (por ejemplo, eliminados como cabecera)
+    se descartan, o se situan al inicio de su pagina con page_start_fallback.
+    Las posiciones resultantes son crecientes.
+    
+    Args:
+        entries: Entradas del esquema con su numero de pagina
+        text: Texto limpio del libro
+        page_offsets: Posicion en text donde empieza cada pagina. Vacio si no
+                      se conoce (cache antigua): se busca en el resto del texto
+        page_start_fallback: Usar el inicio de la pagina si no se encuentra el titulo
+    
+    Returns:
+        Entradas con char_offset apuntando al inicio del titulo en text
+    """
+    located = []
+    search_from = 0
+    total_pages = len(page_offsets)
+    
+    for entry in entries:
+        if not total_pages:
+            page_start, window_end = search_from, len(text)
+        elif 1 <= entry.page <= total_pages:
+            page_start = max(page_offsets[entry.page - 1], search_from)
+            page_end = page_offsets[entry.page] if entry.page < total_pages else len(text)
+            # Margen por si el titulo continua en la pagina siguiente
+            window_end = min(len(text), page_end + len(entry.title))
+        else:
+            continue
+        
+        match = heading_pattern(entry.title).search(text, page_start, window_end)
+        if match is None:
+            if page_start_fallback and total_pages:
+                located.append(replace(entry, char_offset=page_start))
+                search_from = page_start
+            continue
+        
+        located.append(replace(entry, char_offset=match.start()))
+        search_from = match.end()
+    
+    return located
+
+
+def outline_levels(entries: Sequence[OutlineEntry]) -> Counter:
+    """Numero de entradas por nivel."""
+    return Counter(entry.level for entry in entries)
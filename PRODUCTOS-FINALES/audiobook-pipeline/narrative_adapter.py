@@ -1,137 +1,132 @@
 """Modulo para adaptar texto a formato narrativo para audiolibro."""
 import re
-from typing import List
-from sumy.parsers.plaintext import PlaintextParser
-from sumy.nlp.tokenizers import Tokenizer
-from sumy.summarizers.lsa import LsaSummarizer
-from sumy.nlp.stemmers import Stemmer
-from sumy.utils import get_stop_words
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
 
+import numpy as np
 
-def remove_visual_references(text: str) -> str:
-    """Elimina referencias visuales comunes."""
-    patterns_replacements = [
-        (r'como se (muestra|ve|observa|puede ver|ilustra) (arriba|abajo|en la (figura|imagen|tabla|gráfico))', ''),
-        (r'como (muestra|muestran|indica|indican) (la|el|las|los) (figura|imagen|tabla|gráfico)', ''),
-        (r'ver (la|el|las|los) (figura|imagen|tabla|gráfico)', ''),
-        (r'\(ver (figura|imagen|tabla|gráfico)', '('),
-        (r'en la (página|pág\.?) \d+', ''),
-        (r'\(véase (página|pág\.?) \d+\)', ''),
-    ]
-    
-    for pattern, replacement in patterns_replacements:
-        text = re.sub(pattern, replacement, text, flags=re.IGNORECASE)
-    
-    return text
+from adaptation_rules import DEFAULT_LANGUAGE, load_rule_engine
+from sentences import sentence_ends
+from summarizer import summarize, summarize_indexed
+from text_cache import TextCache
 
 
-def convert_lists_to_prose(text: str) -> str:
-    """Convierte listas numeradas o con viñetas a prosa narrativa."""
-    lines = text.split('\n')
-    result_lines = []
-    in_list = False
+SUMMARY_REDUCTION = 0.15  # Fraccion de frases que quita el resumen moderado
+# Version que forma parte de la clave de cache: subirla al cambiar el codigo de adaptacion
+# o del resumen (las reglas de rules/<idioma>.json entran en la clave con su propio hash)
+ADAPTATION_VERSION = "1"
+DEFAULT_ADAPTATION_CACHE_DIR = Path('cache') / 'adaptacion'
+
+
+def remove_visual_references(text: str, language: str = DEFAULT_LANGUAGE) -> str:
+    """Elimina referencias visuales comunes (reglas del grupo 'visual' de rules/<idioma>.json)."""
+    return load_rule_engine(language, groups=('visual',)).apply(text)
+
+
+# Marcadores de item de lista: numero ("1." "2)"), viñeta ("-" "•" "*") y letra ("a." "b)"), en ese orden
+LIST_MARKER_RE = re.compile(r'(?:\d+[.)]\s+)?(?:[-•*]\s+)?(?:[a-z][.)]\s+)?')
+
+
+def _list_to_sentence(list_items: List[str]) -> str:
+    """Une los items de una lista en una frase ("a, b, y c.")."""
+    if len(list_items) == 1:
+        return list_items[0] + '.'
+    if len(list_items) == 2:
+        return f"{list_items[0]} y {list_items[1]}."
+    items_text = ', '.join(list_items[:-1])
+    return f"{items_text}, y {list_items[-1]}."
+
+
+def iter_prose_lines(lines: Iterable[str]) -> Iterator[str]:
+    """
+    Convierte listas a prosa linea a linea (generador).
+    
+    Cada linea pasa una vez por LIST_MARKER_RE: si empieza por un marcador
+    es un item (sin el marcador); los items seguidos se emiten como una
+    frase al llegar la primera linea que no es item. Las lineas vacias se
+    descartan.
+    
+    Args:
+        lines: Lineas del texto (sin el salto de linea), por ejemplo la
+            salida de otro paso de adaptacion
+    
+    Yields:
+        Lineas de salida
+    """
     list_items = []
     
     for line in lines:
         stripped = line.strip()
+        marker_end = LIST_MARKER_RE.match(stripped).end()
         
-        # Detectar inicio de lista (números, viñetas, guiones)
-        is_list_item = (
-            re.match(r'^[\d]+[\.\)]\s+', stripped) or
-            re.match(r'^[-•*]\s+', stripped) or
-            re.match(r'^[a-z][\.\)]\s+', stripped)
-        )
+        if marker_end:
+            list_items.append(stripped[marker_end:])
+            continue
         
-        if is_list_item:
-            if not in_list:
-                in_list = True
-            # Extraer texto del ítem
-            item_text = re.sub(r'^[\d]+[\.\)]\s+', '', stripped)
-            item_text = re.sub(r'^[-•*]\s+', '', item_text)
-            item_text = re.sub(r'^[a-z][\.\)]\s+', '', item_text)
-            list_items.append(item_text.strip())
-        else:
-            if in_list and list_items:
-                # Convertir lista acumulada a prosa
-                if len(list_items) == 1:
-                    result_lines.append(list_items[0] + '.')
-                elif len(list_items) == 2:
-                    result_lines.append(f"{list_items[0]} y {list_items[1]}.")
-                else:
-                    items_text = ', '.join(list_items[:-1])
-                    result_lines.append(f"{items_text}, y {list_items[-1]}.")
-                list_items = []
-                in_list = False
-            
-            if stripped:  # Solo agregar líneas no vacías
-                result_lines.append(line)
-    
-    # Procesar última lista si termina el texto
-    if in_list and list_items:
-        if len(list_items) == 1:
-            result_lines.append(list_items[0] + '.')
-        elif len(list_items) == 2:
-            result_lines.append(f"{list_items[0]} y {list_items[1]}.")
-        else:
-            items_text = ', '.join(list_items[:-1])
-            result_lines.append(f"{items_text}, y {list_items[-1]}.")
+        if list_items:
+            yield _list_to_sentence(list_items)
+            list_items = []
+        
+        if stripped:  # Solo agregar lineas no vacias
+            yield line
     
-    return '\n'.join(result_lines)
+    # Procesar ultima lista si termina el texto
+    if list_items:
+        yield _list_to_sentence(list_items)
 
 
-def improve_sentence_flow(text: str) -> str:
-    """Mejora el flujo de oraciones para audio."""
-    # NOTA: Mantenemos las tildes en el texto para el audio
-    # Eliminar abreviaciones problematicas
-    text = re.sub(r'\bDr\.', 'Doctor', text)
-    text = re.sub(r'\bSr\.', 'Señor', text)
-    text = re.sub(r'\bSra\.', 'Señora', text)
-    text = re.sub(r'\betc\.', 'etcétera', text)
-    
-    # Asegurar espacios después de puntuación
-    text = re.sub(r'([.!?])([A-Z])', r'\1 \2', text)
-    
-    # Eliminar espacios multiples
-    text = re.sub(r' +', ' ', text)
+def convert_lists_to_prose(text: str) -> str:
+    """Convierte listas numeradas o con viñetas a prosa narrativa."""
+    return '\n'.join(iter_prose_lines(text.split('\n')))
+
+
+def improve_sentence_flow(text: str, language: str = DEFAULT_LANGUAGE) -> str:
+    """
+    Mejora el flujo de oraciones para audio (reglas del grupo 'flow' de rules/<idioma>.json).
     
-    return text
+    Desarrolla abreviaturas (Dr., Sr., etc.), asegura un espacio tras la
+    puntuacion y elimina espacios multiples. Se mantienen las tildes.
+    """
+    return load_rule_engine(language, groups=('flow',)).apply(text)
 
 
 def moderate_summarize(text: str, reduction_percent: float = 0.15) -> str:
     """
     Resumen moderado usando LSA (Latent Semantic Analysis).
     
-    reduction_percent: porcentaje de reduccion (0.15 = 15% menos texto)
+    reduction_percent: porcentaje de reduccion (0.15 = 15% menos frases)
+    
+    Usa summarizer.summarize: matriz dispersa y SVD truncada aleatoria,
+    lineal en el tamano del texto (un libro entero en segundos).
     """
     if not text.strip():
         return text
     
-    # Calcular numero de oraciones objetivo
-    sentences = re.split(r'[.!?]+', text)
-    sentences = [s.strip() for s in sentences if s.strip()]
-    
-    if len(sentences) < 3:
-        return text  # Texto muy corto, no resumir
-    
-    target_sentences = max(3, int(len(sentences) * (1 - reduction_percent)))
-    
     try:
-        # Usar sumy para resumen extractivo
-        parser = PlaintextParser.from_string(text, Tokenizer('spanish'))
-        stemmer = Stemmer('spanish')
-        summarizer = LsaSummarizer(stemmer)
-        summarizer.stop_words = get_stop_words('spanish')
-        
-        summary_sentences = summarizer(parser.document, target_sentences)
-        summarized_text = ' '.join(str(sentence) for sentence in summary_sentences)
-        
-        return summarized_text
+        return summarize(text, reduction_percent=reduction_percent)
     except Exception:
         # Si falla el resumen, devolver texto original
         return text
 
 
-def adapt_for_audiobook(text: str, apply_summary: bool = True) -> str:
+def adapt_lines(lines: Iterable[str], language: str = DEFAULT_LANGUAGE) -> Iterator[str]:
+    """
+    Pasos de adaptacion linea a linea, encadenados como generadores.
+    
+    Referencias visuales -> listas a prosa -> flujo de oraciones. Las
+    reglas de rules/<idioma>.json solo se aplican a las lineas donde
+    aparece alguna de sus palabras clave.
+    
+    Yields:
+        Lineas adaptadas (sin lineas vacias)
+    """
+    lines = load_rule_engine(language, groups=('visual',)).iter_apply(lines)
+    lines = iter_prose_lines(lines)
+    return load_rule_engine(language, groups=('flow',)).iter_apply(lines)
+
+
+def adapt_for_audiobook(text: str, apply_summary: bool = True, language: str = DEFAULT_LANGUAGE,
+                        reduction_percent: float = SUMMARY_REDUCTION) -> str:
     """
     Adapta texto completo para audiolibro.
     
@@ -140,23 +135,119 @@ def adapt_for_audiobook(text: str, apply_summary: bool = True) -> str:
     - Conversion de listas a prosa
     - Mejora de flujo de oraciones
     - Resumen moderado (opcional)
-    """
-    # Paso 1: Eliminar referencias visuales
-    text = remove_visual_references(text)
     
-    # Paso 2: Convertir listas a prosa
-    text = convert_lists_to_prose(text)
+    Los pasos 1-3 se encadenan linea a linea (adapt_lines): el texto se
+    parte una vez y se vuelve a unir una vez, sin copias intermedias.
+    """
+    return adapt_for_audiobook_indexed(text, apply_summary, language, reduction_percent)[0]
+
+
+def adapt_for_audiobook_indexed(text: str, apply_summary: bool = True, language: str = DEFAULT_LANGUAGE,
+                                reduction_percent: float = SUMMARY_REDUCTION) -> Tuple[str, np.ndarray]:
+    """
+    adapt_for_audiobook con el indice de frases del texto adaptado.
     
-    # Paso 3: Mejorar flujo
-    text = improve_sentence_flow(text)
+    El texto se indexa una sola vez (sentences.sentence_ends), antes del
+    resumen: el resumen usa ese indice y devuelve el de su propio texto, que
+    es el que reciben los chunks de TTS.
     
-    # Paso 4: Resumen moderado (15% de reducción)
-    if apply_summary:
-        text = moderate_summarize(text, reduction_percent=0.15)
+    Returns:
+        (texto adaptado, indice de frases del texto adaptado)
+    """
+    # Pasos 1-3: referencias visuales, listas a prosa y flujo
+    text = '\n'.join(adapt_lines(text.split('\n'), language))
     
-    # Limpieza final
+    # Limpieza final (antes del resumen: sus frases ya salen sin espacios en los extremos)
     text = re.sub(r'\n{3,}', '\n\n', text)
     text = text.strip()
+    ends = sentence_ends(text)
+    
+    # Paso 4: Resumen moderado (15% de reducción)
+    if apply_summary and text:
+        try:
+            text, ends = summarize_indexed(text, reduction_percent=reduction_percent, ends=ends)
+        except Exception:
+            # Si falla el resumen, se queda el texto sin resumir (como moderate_summarize)
+            pass
+    
+    return text, ends
+
+
+class AdaptationMemo:
+    """
+    Capitulos ya adaptados, guardados en disco (TextCache).
+    
+    La clave es el hash del texto del capitulo mas la version de las reglas
+    (hash de rules/<idioma>.json), ADAPTATION_VERSION, el idioma, si se
+    resume y el porcentaje de reduccion: al cambiar solo el motor TTS o la
+    voz, los capitulos sin cambios se leen de disco en lugar de adaptarse.
+    """
+    
+    def __init__(self, cache: Optional[TextCache] = None, apply_summary: bool = True,
+                 language: str = DEFAULT_LANGUAGE, reduction_percent: float = SUMMARY_REDUCTION):
+        self.cache = cache if cache is not None else TextCache(DEFAULT_ADAPTATION_CACHE_DIR)
+        self.apply_summary = apply_summary
+        self.language = language
+        self.reduction_percent = reduction_percent
+        self._versions = (ADAPTATION_VERSION, load_rule_engine(language).version, language,
+                          f"summary={apply_summary}", f"reduction={reduction_percent}")
+        self.hits = 0
+        self.misses = 0
+    
+    def key(self, text: str) -> str:
+        """Clave de cache de un capitulo."""
+        return self.cache.make_text_key(text, *self._versions)
+    
+    def get(self, key: str) -> Optional[str]:
+        """Texto adaptado guardado (None si no esta); cuenta aciertos y fallos."""
+        adapted = self.cache.get(key)
+        if adapted is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return adapted
+    
+    def put(self, key: str, adapted: str) -> None:
+        self.cache.put(key, adapted)
     
-    return text
+    def adapt(self, text: str) -> Tuple[str, np.ndarray]:
+        """
+        adapt_for_audiobook_indexed con la cache: solo se adapta si el capitulo no esta guardado.
+        
+        Se guarda solo el texto: con un acierto el indice de frases se
+        calcula una vez sobre el texto leido de disco.
+        """
+        key = self.key(text)
+        adapted = self.get(key)
+        if adapted is not None:
+            return adapted, sentence_ends(adapted)
+        adapted, ends = adapt_for_audiobook_indexed(text, apply_summary=self.apply_summary, language=self.language,
+                                                    reduction_percent=self.reduction_percent)
+        self.put(key, adapted)
+        return adapted, ends
+    
+    def report(self) -> str:
+        return f"{self.hits} acierto(s), {self.misses} fallo(s)"
+
 
+def adapt_chapters(chapters: Iterable, apply_summary: bool = True, language: str = DEFAULT_LANGUAGE,
+                   memo: Optional[AdaptationMemo] = None) -> Iterator[Tuple[str, str, np.ndarray]]:
+    """
+    Adapta capitulos a medida que llegan (generador).
+    
+    Acepta cualquier iterable de objetos con `title` y `content` (por ejemplo
+    el stream de chapter_detector.segment_pages), asi cada capitulo adaptado
+    puede pasar a TTS mientras se siguen leyendo paginas del PDF.
+    
+    Con memo, los capitulos ya adaptados se leen de disco (memo fija
+    entonces apply_summary e idioma).
+    
+    Yields:
+        Tuplas (titulo, texto adaptado, indice de frases del texto adaptado)
+    """
+    for chapter in chapters:
+        if memo is not None:
+            yield (chapter.title, *memo.adapt(chapter.content))
+        else:
+            yield (chapter.title, *adapt_for_audiobook_indexed(chapter.content, apply_summary=apply_summary,
+                                                               language=language))
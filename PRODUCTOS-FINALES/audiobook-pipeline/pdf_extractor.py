@@ -1,21 +1,895 @@
 """Modulo para extraer y limpiar texto de PDFs."""
+import bisect
+import difflib
+import hashlib
+import importlib.util
+import json
+import gc
+import os
 import re
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from collections import Counter, deque
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
-from typing import List, Tuple
-import pdfplumber
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Type
 
+from chapter_detector import CHAPTER_MARKER_RE
+from layout_outline import OUTLINE_VERSION, LayoutLine, OutlineEntry, classify_headings, is_bold_font, locate_outline, outline_levels
+from pdf_ocr import DEFAULT_OCR_LANGUAGE, is_ocr_available, needs_ocr, ocr_engine_tag, ocr_page, ocr_pages
+from text_cache import TextCache
+from text_headings import KEYWORD_HEADING_RE
 
-def extract_text_from_pdf(pdf_path: str) -> str:
-    """Extrae texto completo de un PDF."""
-    text_parts = []
+
+# Versiones que forman parte de la clave de cache: subirlas al cambiar
+# la extraccion o la limpieza invalida automaticamente el texto guardado.
+# La clave incluye ademas el motor usado y su version (ver PdfBackend.version)
+EXTRACTOR_VERSION = "3"
+CLEAN_TEXT_VERSION = "3"  # numeros de pagina solo si siguen la secuencia de las paginas vecinas
+
+
+# Palabra cortada con guion al final de una pagina ya limpia
+_TRAILING_HYPHEN = re.compile(r'(\w+)-$')
+
+
+class PdfBackend:
+    """
+    Interfaz comun de los motores de extraccion de texto.
+    
+    Cada motor importa su libreria al usarse, asi los que no esten
+    instalados simplemente no aparecen como disponibles.
+    """
+    name = ''
+    module = ''
+    
+    @classmethod
+    def is_available(cls) -> bool:
+        """Indica si la libreria del motor esta instalada."""
+        return importlib.util.find_spec(cls.module) is not None
+    
+    def version(self) -> str:
+        """Identificador del motor y de la version de su libreria."""
+        raise NotImplementedError
+    
+    def page_count(self, pdf_path: str) -> int:
+        """Devuelve el numero de paginas del PDF."""
+        raise NotImplementedError
+    
+    def iter_page_texts(self, pdf_path: str, start: int = 0, end: Optional[int] = None) -> Iterator[str]:
+        """Devuelve el texto de cada pagina en [start, end) ('' si no tiene texto)."""
+        raise NotImplementedError
+    
+    def iter_page_layouts(self, pdf_path: str, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[str, List[LayoutLine]]]:
+        """Devuelve (texto, lineas con tamano/negrita/posicion) de cada pagina en [start, end)."""
+        raise NotImplementedError
+    
+    def get_toc(self, pdf_path: str) -> List[OutlineEntry]:
+        """Devuelve los marcadores (indice) del PDF con su nivel y pagina, o [] si no tiene."""
+        raise NotImplementedError
+    
+    def page_fingerprints(self, pdf_path: str) -> List[str]:
+        """
+        Huella de cada pagina: hash de su flujo de contenido, de su tamano y
+        de los recursos que usa.
+        
+        Entran los flujos de los XObject (formularios e imagenes, tambien
+        los anidados dentro de formularios) y el nombre, la codificacion y
+        el ToUnicode de cada fuente: paginas con el mismo flujo que dibujan
+        otro formulario u otra imagen (libros escaneados) tienen huellas
+        distintas. No interpreta el contenido (no extrae texto), asi que es
+        mucho mas rapido que la extraccion; cada flujo compartido se resume
+        una sola vez.
+        """
+        raise NotImplementedError
+    
+    def release_memory(self) -> None:
+        """Libera las caches globales de la libreria (entre ventanas del modo de memoria acotada)."""
+    
+    def image_page_indices(self, pdf_path: str, page_indices: List[int]) -> List[int]:
+        """De las paginas indicadas, devuelve las que contienen alguna imagen."""
+        raise NotImplementedError
+    
+    def render_page(self, pdf_path: str, page_index: int, dpi: int):
+        """Renderiza una pagina como imagen PIL en escala de grises (para OCR)."""
+        raise NotImplementedError
+
+
+class PdfplumberBackend(PdfBackend):
+    """Motor basado en pdfplumber: mas lento, respeta bien el layout."""
+    name = 'pdfplumber'
+    module = 'pdfplumber'
+    
+    def version(self) -> str:
+        import pdfplumber
+        return f"pdfplumber-{pdfplumber.__version__}"
+    
+    def page_count(self, pdf_path: str) -> int:
+        import pdfplumber
+        with pdfplumber.open(pdf_path) as pdf:
+            return len(pdf.pages)
+    
+    def _open_pages(self, pdf_path: str, start: int, end: Optional[int]):
+        """Abre el PDF creando solo los objetos de las paginas [start, end)."""
+        import pdfplumber
+        # pdfplumber mantiene vivos todos los objetos de pagina creados
+        # mientras el PDF esta abierto: pedir solo los del rango
+        page_numbers = list(range(start + 1, end + 1)) if end is not None else None
+        return pdfplumber.open(pdf_path, pages=page_numbers)
+    
+    def iter_page_texts(self, pdf_path: str, start: int = 0, end: Optional[int] = None) -> Iterator[str]:
+        with self._open_pages(pdf_path, start, end) as pdf:
+            for page in (pdf.pages if end is not None else pdf.pages[start:]):
+                page_text = page.extract_text() or ''
+                # Liberar la cache de layout de la pagina ya procesada
+                page.flush_cache()
+                yield page_text
+    
+    def iter_page_layouts(self, pdf_path: str, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[str, List[LayoutLine]]]:
+        with self._open_pages(pdf_path, start, end) as pdf:
+            for page in (pdf.pages if end is not None else pdf.pages[start:]):
+                page_text = page.extract_text() or ''
+                words = page.extract_words(extra_attrs=['size', 'fontname'])
+                lines = _group_words_into_lines(words, float(page.height) or 1.0)
+                page.flush_cache()
+                yield page_text, lines
+    
+    def get_toc(self, pdf_path: str) -> List[OutlineEntry]:
+        import pdfplumber
+        from pdfminer.pdfdocument import PDFNoOutlines
+        with pdfplumber.open(pdf_path) as pdf:
+            page_numbers = {page.page_obj.pageid: page.page_number for page in pdf.pages}
+            entries = []
+            try:
+                for level, title, dest, action, _ in pdf.doc.get_outlines():
+                    page_number = _resolve_outline_page(pdf.doc, dest, action, page_numbers)
+                    if page_number is not None:
+                        entries.append(_toc_entry(title, page_number, level))
+            except PDFNoOutlines:
+                return []
+            return [entry for entry in entries if entry is not None]
+    
+    def page_fingerprints(self, pdf_path: str) -> List[str]:
+        import pdfplumber
+        from pdfminer.pdftypes import resolve1
+        fingerprints = []
+        stream_digests = {}
+        with pdfplumber.open(pdf_path) as pdf:
+            for page in pdf.pages:
+                digest = hashlib.blake2b(repr(page.page_obj.mediabox).encode('ascii'), digest_size=16)
+                for stream in page.page_obj.contents:
+                    digest.update(resolve1(stream).get_data())
+                _digest_pdfminer_resources(digest, page.page_obj.resources, stream_digests, set())
+                fingerprints.append(digest.hexdigest())
+        return fingerprints
+    
+    def image_page_indices(self, pdf_path: str, page_indices: List[int]) -> List[int]:
+        import pdfplumber
+        if not page_indices:
+            return []
+        with pdfplumber.open(pdf_path, pages=[index + 1 for index in page_indices]) as pdf:
+            return [page.page_number - 1 for page in pdf.pages if page.images]
+    
+    def render_page(self, pdf_path: str, page_index: int, dpi: int):
+        with self._open_pages(pdf_path, page_index, page_index + 1) as pdf:
+            return pdf.pages[0].to_image(resolution=dpi).original.convert("L")
+
+
+class PyMuPDFBackend(PdfBackend):
+    """Motor basado en PyMuPDF (fitz): mucho mas rapido en libros de prosa."""
+    name = 'pymupdf'
+    module = 'fitz'
+    
+    def version(self) -> str:
+        import fitz  # pip install PyMuPDF
+        return f"pymupdf-{fitz.VersionBind}"
+    
+    def page_count(self, pdf_path: str) -> int:
+        import fitz
+        with fitz.open(pdf_path) as doc:
+            return doc.page_count
+    
+    def iter_page_texts(self, pdf_path: str, start: int = 0, end: Optional[int] = None) -> Iterator[str]:
+        import fitz
+        with fitz.open(pdf_path) as doc:
+            end = doc.page_count if end is None else min(end, doc.page_count)
+            for page_index in range(start, end):
+                # sort=True ordena los bloques por posicion (arriba-abajo,
+                # izquierda-derecha), como hace pdfplumber
+                page_text = doc.load_page(page_index).get_text("text", sort=True)
+                yield page_text.rstrip()
+    
+    def iter_page_layouts(self, pdf_path: str, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[str, List[LayoutLine]]]:
+        import fitz
+        with fitz.open(pdf_path) as doc:
+            end = doc.page_count if end is None else min(end, doc.page_count)
+            for page_index in range(start, end):
+                page = doc.load_page(page_index)
+                # Se analiza la pagina una sola vez para el texto y las metricas
+                textpage = page.get_textpage()
+                page_text = page.get_text("text", sort=True, textpage=textpage).rstrip()
+                layout = page.get_text("dict", sort=True, textpage=textpage)
+                height = page.rect.height or 1.0
+                
+                lines = []
+                for block in layout['blocks']:
+                    for line in block.get('lines', ()):
+                        spans = [span for span in line['spans'] if span['text'].strip()]
+                        if not spans:
+                            continue
+                        # El estilo de la linea es el del span con mas texto
+                        main_span = max(spans, key=lambda span: len(span['text']))
+                        bold = bool(main_span['flags'] & 16) or is_bold_font(main_span['font'])  # bit 4 = negrita
+                        text = ''.join(span['text'] for span in line['spans']).strip()
+                        lines.append(LayoutLine(text, round(main_span['size'], 1), bold, line['bbox'][1] / height))
+                
+                yield page_text, lines
+    
+    def get_toc(self, pdf_path: str) -> List[OutlineEntry]:
+        import fitz
+        with fitz.open(pdf_path) as doc:
+            # simple=True: [nivel, titulo, pagina (empezando en 1, -1 si no apunta a ninguna)]
+            entries = [_toc_entry(title, page, level) for level, title, page in doc.get_toc(simple=True) if page >= 1]
+        return [entry for entry in entries if entry is not None]
+    
+    def page_fingerprints(self, pdf_path: str) -> List[str]:
+        import fitz
+        fingerprints = []
+        stream_digests = {}
+        
+        def stream_digest(xref: int) -> bytes:
+            if xref not in stream_digests:
+                stream_digests[xref] = _stream_digest(doc.xref_stream_raw(xref) or b'')
+            return stream_digests[xref]
+        
+        with fitz.open(pdf_path) as doc:
+            for page in doc:
+                digest = hashlib.blake2b(repr(tuple(page.mediabox)).encode('ascii'), digest_size=16)
+                digest.update(page.read_contents())
+                # Formularios e imagenes de la pagina y de sus formularios (recursivo)
+                for xref, name, *_ in page.get_xobjects():
+                    digest.update(f"/{name}".encode('utf-8', 'replace') + stream_digest(xref))
+                for image in page.get_images(full=True):
+                    digest.update(f"/{image[7]}".encode('utf-8', 'replace') + stream_digest(image[0]))
+                for xref, _, font_type, base_font, name, encoding, *_ in page.get_fonts(full=True):
+                    digest.update(f"/{name}:{font_type}:{base_font}:{encoding}".encode('utf-8', 'replace'))
+                    if xref > 0:
+                        kind, value = doc.xref_get_key(xref, "ToUnicode")
+                        if kind == 'xref':
+                            digest.update(stream_digest(int(value.split()[0])))
+                fingerprints.append(digest.hexdigest())
+        return fingerprints
+    
+    def image_page_indices(self, pdf_path: str, page_indices: List[int]) -> List[int]:
+        import fitz
+        with fitz.open(pdf_path) as doc:
+            return [index for index in page_indices if doc.load_page(index).get_images(full=False)]
+    
+    def render_page(self, pdf_path: str, page_index: int, dpi: int):
+        import fitz
+        from PIL import Image
+        with fitz.open(pdf_path) as doc:
+            pixmap = doc.load_page(page_index).get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+            return Image.frombytes("L", (pixmap.width, pixmap.height), pixmap.samples)
+    
+    def release_memory(self) -> None:
+        import fitz
+        # Vaciar el almacen de objetos decodificados (fuentes, imagenes) de MuPDF
+        fitz.TOOLS.store_shrink(100)
+
+
+def _stream_digest(data: bytes) -> bytes:
+    """Resumen corto de un flujo (para la huella de las paginas que lo usan)."""
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _pdf_name(value) -> str:
+    """Nombre PDF (/Nombre de pdfminer) o valor como texto."""
+    return str(getattr(value, 'name', value))
+
+
+def _digest_pdfminer_resources(digest, resources, stream_digests: Dict[int, bytes], seen: set) -> None:
+    """
+    Anade a la huella las fuentes y los XObject de un diccionario de recursos de pdfminer.
+    
+    Los formularios se recorren recursivamente (seen evita ciclos) y el
+    resumen de cada flujo se guarda en stream_digests por numero de objeto.
+    """
+    from pdfminer.pdftypes import PDFObjRef, PDFStream, resolve1
+    
+    def stream_digest(ref) -> bytes:
+        key = ref.objid if isinstance(ref, PDFObjRef) else id(ref)
+        if key not in stream_digests:
+            stream = resolve1(ref)
+            data = stream.get_rawdata() if isinstance(stream, PDFStream) else None
+            stream_digests[key] = _stream_digest(data if data is not None else repr(stream).encode('utf-8', 'replace'))
+        return stream_digests[key]
+    
+    resources = resolve1(resources) or {}
+    if not isinstance(resources, dict):
+        return
+    
+    fonts = resolve1(resources.get('Font')) or {}
+    for name in sorted(fonts):
+        spec = resolve1(fonts[name]) or {}
+        if not isinstance(spec, dict):
+            continue
+        encoding = resolve1(spec.get('Encoding'))
+        font_ref = f"/{name}:{_pdf_name(resolve1(spec.get('Subtype')))}:{_pdf_name(resolve1(spec.get('BaseFont')))}"
+        digest.update(f"{font_ref}:{_pdf_name(encoding) if not isinstance(encoding, dict) else ''}".encode('utf-8', 'replace'))
+        if spec.get('ToUnicode') is not None:
+            digest.update(stream_digest(spec['ToUnicode']))
+    
+    xobjects = resolve1(resources.get('XObject')) or {}
+    for name in sorted(xobjects):
+        ref = xobjects[name]
+        digest.update(f"/{name}".encode('utf-8', 'replace') + stream_digest(ref))
+        stream = resolve1(ref)
+        objid = ref.objid if isinstance(ref, PDFObjRef) else id(stream)
+        if isinstance(stream, PDFStream) and _pdf_name(stream.get('Subtype')) == 'Form' and objid not in seen:
+            seen.add(objid)
+            _digest_pdfminer_resources(digest, stream.get('Resources'), stream_digests, seen)
+
+
+def _toc_entry(title, page_number: int, level: int) -> Optional[OutlineEntry]:
+    """Crea la entrada de un marcador normalizando espacios (None si no tiene titulo)."""
+    title = ' '.join(str(title or '').split())
+    if not title:
+        return None
+    return OutlineEntry(title=title, page=page_number, level=level)
+
+
+def _resolve_outline_page(document, dest, action, page_numbers: Dict[int, int]) -> Optional[int]:
+    """Numero de pagina al que apunta un marcador de pdfminer (destino directo, con nombre o accion GoTo)."""
+    from pdfminer.pdftypes import resolve1
+    from pdfminer.psparser import PSLiteral
+    
+    if dest is None and action is not None:
+        action = resolve1(action)
+        if isinstance(action, dict):
+            dest = action.get('D')
+    
+    dest = resolve1(dest)
+    if isinstance(dest, (PSLiteral, str, bytes)):
+        # Destino con nombre
+        name = dest.name if isinstance(dest, PSLiteral) else dest
+        try:
+            dest = resolve1(document.get_dest(name))
+        except KeyError:
+            return None
+    if isinstance(dest, dict):
+        dest = resolve1(dest.get('D'))
+    
+    if isinstance(dest, list) and dest:
+        return page_numbers.get(getattr(dest[0], 'objid', None))
+    return None
+
+
+def _group_words_into_lines(words: List[dict], page_height: float, tolerance: float = 3.0) -> List[LayoutLine]:
+    """Agrupa las palabras de pdfplumber en lineas por su posicion vertical."""
+    lines = []
+    current = []
+    
+    for word in sorted(words, key=lambda word: (word['top'], word['x0'])):
+        if current and word['top'] - current[0]['top'] > tolerance:
+            lines.append(current)
+            current = []
+        current.append(word)
+    if current:
+        lines.append(current)
+    
+    layout_lines = []
+    for line_words in lines:
+        line_words.sort(key=lambda word: word['x0'])
+        main_word = max(line_words, key=lambda word: len(word['text']))
+        layout_lines.append(LayoutLine(
+            ' '.join(word['text'] for word in line_words),
+            round(float(main_word['size']), 1),
+            is_bold_font(main_word['fontname']),
+            float(line_words[0]['top']) / page_height,
+        ))
+    
+    return layout_lines
+
+
+# Registro de motores disponibles por nombre
+PDF_BACKENDS: Dict[str, Type[PdfBackend]] = {
+    PdfplumberBackend.name: PdfplumberBackend,
+    PyMuPDFBackend.name: PyMuPDFBackend,
+}
+
+# Orden de preferencia para la seleccion automatica (el mas rapido primero)
+AUTO_BACKEND_ORDER = ('pymupdf', 'pdfplumber')
+
+
+def available_backends() -> List[str]:
+    """Nombres de los motores instalados, en orden de preferencia."""
+    return [name for name in AUTO_BACKEND_ORDER if PDF_BACKENDS[name].is_available()]
+
+
+def get_backend(name: str = 'auto') -> PdfBackend:
+    """
+    Devuelve una instancia del motor pedido.
+    
+    Con 'auto' se usa el primer motor instalado de AUTO_BACKEND_ORDER.
+    """
+    if name == 'auto':
+        available = available_backends()
+        if not available:
+            raise RuntimeError("No hay ningun motor de PDF instalado (pip install pdfplumber o PyMuPDF)")
+        name = available[0]
+    
+    if name not in PDF_BACKENDS:
+        raise ValueError(f"Motor de PDF desconocido: {name} (opciones: auto, {', '.join(PDF_BACKENDS)})")
+    
+    backend_class = PDF_BACKENDS[name]
+    if not backend_class.is_available():
+        raise RuntimeError(f"El motor '{name}' no esta instalado (falta el modulo {backend_class.module})")
+    
+    return backend_class()
+
+
+def _extract_page_range(pdf_path: str, start: int, end: int, backend_name: str) -> List[str]:
+    """Extrae el texto de las paginas [start, end) de un PDF (una por elemento)."""
+    backend = get_backend(backend_name)
+    return list(backend.iter_page_texts(pdf_path, start, end))
+
+
+def _extract_page_layout_range(pdf_path: str, start: int, end: int, backend_name: str) -> List[Tuple[str, List[LayoutLine]]]:
+    """Extrae texto y metricas de las lineas de las paginas [start, end)."""
+    backend = get_backend(backend_name)
+    return list(backend.iter_page_layouts(pdf_path, start, end))
+
+
+def _split_page_ranges(total_pages: int, shards: int) -> List[Tuple[int, int]]:
+    """Reparte las paginas en rangos contiguos de tamano similar."""
+    shards = max(1, min(shards, total_pages))
+    base, extra = divmod(total_pages, shards)
+    
+    ranges = []
+    start = 0
+    for i in range(shards):
+        end = start + base + (1 if i < extra else 0)
+        ranges.append((start, end))
+        start = end
+    
+    return ranges
+
+
+def get_page_count(pdf_path: str, backend: str = 'auto') -> int:
+    """Devuelve el numero de paginas de un PDF."""
+    return get_backend(backend).page_count(pdf_path)
+
+
+def _map_page_ranges(range_func, pdf_path: str, workers: int, backend_name: str) -> list:
+    """
+    Aplica range_func(pdf_path, inicio, fin, motor) a todo el PDF.
+    
+    Con workers > 1 reparte rangos contiguos de paginas entre procesos y
+    concatena los resultados en el orden de las paginas.
+    """
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    
+    total_pages = get_page_count(pdf_path, backend_name)
+    ranges = _split_page_ranges(total_pages, workers)
+    
+    if len(ranges) <= 1:
+        return range_func(pdf_path, 0, total_pages, backend_name)
+    
+    # Cada proceso abre el PDF por su cuenta y extrae un rango contiguo;
+    # map() devuelve los resultados en el orden de los rangos
+    with ProcessPoolExecutor(max_workers=len(ranges)) as executor:
+        results = executor.map(
+            range_func,
+            [pdf_path] * len(ranges),
+            [start for start, _ in ranges],
+            [end for _, end in ranges],
+            [backend_name] * len(ranges),
+        )
+        return [page for part in results for page in part]
+
+
+def extract_pages(pdf_path: str, workers: int = 1, backend: str = 'auto') -> List[str]:
+    """
+    Extrae el texto de cada pagina (lista en orden, '' para paginas sin texto).
+    
+    Con workers > 1 reparte rangos contiguos de paginas entre procesos;
+    el resultado es identico al del modo serial.
+    """
+    return _map_page_ranges(_extract_page_range, pdf_path, workers, get_backend(backend).name)
+
+
+def extract_page_layouts(pdf_path: str, workers: int = 1, backend: str = 'auto') -> List[Tuple[str, List[LayoutLine]]]:
+    """
+    Extrae el texto de cada pagina junto con las metricas de sus lineas
+    (tamano de letra dominante, negrita y posicion vertical).
+    
+    El texto es el mismo que devuelve extract_pages.
+    """
+    return _map_page_ranges(_extract_page_layout_range, pdf_path, workers, get_backend(backend).name)
+
+
+def _extract_raw_pages(pdf_path: str, workers: int, backend: str,
+                       layout: bool = False) -> Tuple[List[str], Optional[List[List[LayoutLine]]]]:
+    """Extrae las paginas (y sus lineas si layout) y muestra la velocidad."""
+    backend_name = get_backend(backend).name
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    
+    start_time = time.perf_counter()
+    page_lines = None
+    if layout:
+        page_layouts = extract_page_layouts(pdf_path, workers=workers, backend=backend_name)
+        page_texts = [page_text for page_text, _ in page_layouts]
+        page_lines = [lines for _, lines in page_layouts]
+    else:
+        page_texts = extract_pages(pdf_path, workers=workers, backend=backend_name)
+    total_pages = len(page_texts)
+    
+    elapsed = time.perf_counter() - start_time
+    pages_per_second = total_pages / elapsed if elapsed > 0 else 0.0
+    processes = len(_split_page_ranges(total_pages, workers))
+    print(f"   ⏱️  {total_pages} paginas en {elapsed:.1f}s "
+          f"({pages_per_second:.1f} pag/s, {processes} proceso(s), motor {backend_name})")
+    
+    return page_texts, page_lines
+
+
+def _strip_pages(page_texts: Sequence[str], strip_headers: bool) -> Sequence[str]:
+    """Quita cabeceras y pies repetidos (si strip_headers) y muestra lo eliminado."""
+    if not strip_headers:
+        return page_texts
+    page_texts, stats = strip_running_headers(page_texts)
+    print_boilerplate_stats(stats)
+    return page_texts
+
+
+def extract_text_from_pdf(pdf_path: str, workers: int = 1, backend: str = 'auto', strip_headers: bool = True,
+                          ocr_language: Optional[str] = DEFAULT_OCR_LANGUAGE, ocr_workers: int = 0) -> str:
+    """
+    Extrae texto completo de un PDF.
+    
+    Args:
+        pdf_path: Ruta del PDF
+        workers: Numero de procesos para extraer en paralelo (1 = modo serial,
+                 0 = uno por CPU). El texto resultante es identico al serial.
+        backend: Motor de extraccion ('auto', 'pdfplumber' o 'pymupdf')
+        strip_headers: Quitar cabeceras, pies y numeros de pagina repetidos
+        ocr_language: Idioma de Tesseract para las paginas escaneadas
+                      (None = sin OCR; esas paginas se descartan)
+        ocr_workers: Procesos de OCR (0 = uno por CPU)
+    
+    Returns:
+        Texto de todas las paginas unido por saltos de linea
+    """
+    page_texts, _ = _extract_raw_pages(pdf_path, workers, backend)
+    _ocr_image_pages(pdf_path, page_texts, get_backend(backend).name, ocr_language, ocr_workers)
+    page_texts = _strip_pages(page_texts, strip_headers)
+    
+    # Las paginas sin texto se descartan igual que en el modo serial
+    return '\n'.join(text for text in page_texts if text)
+
+
+# --- Cabeceras, pies de pagina y numeros de pagina ---
+
+# Numero de pagina suelto: "12", "- 12 -", "Pagina 12", "12 de 300", "12/300"
+_PAGE_NUMBER_RE = re.compile(
+    r'^[-–—\s]*(?:p[áa]g(?:ina)?\.?\s*)?\d{1,4}(?:\s*(?:de|/)\s*\d{1,4})?[-–—\s]*$',
+    re.IGNORECASE
+)
+_DIGITS_RE = re.compile(r'\d+')
+
+WORDS_PER_MINUTE = 173  # Velocidad de lectura a 1.15x (igual que chapter_detector)
+
+
+@dataclass
+class BoilerplateStats:
+    """Resumen de lo eliminado como cabecera/pie repetido."""
+    lines: int = 0
+    chars: int = 0
+    words: int = 0
+    
+    @property
+    def tts_minutes(self) -> float:
+        """Minutos de audio que se habrian sintetizado con ese texto."""
+        return self.words / WORDS_PER_MINUTE
+
+
+@dataclass
+class _EdgeLineCount:
+    """Apariciones de un texto en una posicion de borde, en total y por paridad de pagina."""
+    pages: int = 0
+    first: int = 0
+    last: int = 0
+    parity_pages: List[int] = field(default_factory=lambda: [0, 0])
+    parity_first: List[int] = field(default_factory=lambda: [0, 0])
+    parity_last: List[int] = field(default_factory=lambda: [0, 0])
+    
+    def add(self, page_number: int) -> None:
+        parity = page_number % 2
+        if not self.pages:
+            self.first = page_number
+        if not self.parity_pages[parity]:
+            self.parity_first[parity] = page_number
+        self.pages += 1
+        self.last = page_number
+        self.parity_pages[parity] += 1
+        self.parity_last[parity] = page_number
+
+
+class RunningHeaderIndex:
+    """
+    Indice de frecuencia de las primeras y ultimas lineas de cada pagina.
+    
+    Cada linea se cuenta en su posicion exacta (borde y distancia al borde:
+    la primera linea, la segunda...) y por paridad de pagina, porque las
+    cabeceras de los libros alternan entre paginas pares e impares. Una
+    linea del borde de la pagina se considera cabecera/pie si:
+    - es un numero de pagina suelto que sigue la numeracion: una pagina a
+      como mucho `page_number_window` de distancia tiene en el borde un
+      numero con el mismo desfase respecto a su numero de pagina en el PDF
+      (la numeracion impresa puede empezar despues de la portada). Un
+      numero suelto fuera de secuencia ("7" al abrir el capitulo 7, o "1"
+      en la primera pagina) se conserva, o
+    - el mismo texto aparece en esa posicion en al menos `min_ratio` de las
+      paginas del libro (o de las de su paridad): titulo del libro, o
+    - aparece en esa posicion en al menos `min_pages` paginas de la misma
+      paridad y en al menos `run_ratio` de las paginas de esa paridad entre
+      la primera y la ultima aparicion: titulo del capitulo en curso, que
+      solo se repite mientras dura el capitulo, o
+    - el texto con los numeros reemplazados ("Mi libro 23" -> "mi libro #")
+      aparece en esa posicion en al menos `min_ratio` de las paginas.
+    
+    Los umbrales son relativos al numero de paginas: un dialogo corto ("—Si.")
+    que cae en el borde de unas pocas paginas dispersas no es una cabecera.
+    Los titulos de capitulo ("CAPITULO 3: ...", "Epilogo") nunca se eliminan.
+    """
+    
+    def __init__(self, edge_lines: int = 2, min_pages: int = 3, min_ratio: float = 0.2, run_ratio: float = 0.5,
+                 max_line_length: int = 120, page_number_window: int = 2):
+        self.edge_lines = edge_lines
+        self.min_pages = min_pages
+        self.min_ratio = min_ratio
+        self.run_ratio = run_ratio
+        self.page_number_window = page_number_window
+        # Desfases (numero impreso - numero de pagina) de los numeros sueltos del borde de cada pagina
+        self.page_number_offsets: Dict[int, set] = {}
+        self.max_line_length = max_line_length
+        self.pages = 0
+        self.parity_pages = [0, 0]
+        self.exact_counts: Dict[Tuple[str, int, str], _EdgeLineCount] = {}
+        self.pattern_counts: Counter = Counter()
+    
+    @staticmethod
+    def _exact_key(line: str) -> str:
+        return ' '.join(line.split()).lower()
+    
+    def _edge_positions(self, lines: List[str]) -> List[Tuple[int, str, int]]:
+        """Indices (borde y distancia al borde) de las primeras/ultimas lineas no vacias de la pagina."""
+        non_empty = [i for i, line in enumerate(lines) if line.strip()]
+        top = non_empty[:self.edge_lines]
+        positions = [(i, 'top', slot) for slot, i in enumerate(top)]
+        positions += [(i, 'bottom', slot) for slot, i in enumerate(reversed(non_empty[-self.edge_lines:]))
+                      if i not in top]
+        return positions
+    
+    def add_page(self, page_text: str, page_number: int) -> None:
+        """Registra las lineas de borde de una pagina (numero desde 1) en el indice."""
+        lines = page_text.split('\n')
+        self.pages += 1
+        self.parity_pages[page_number % 2] += 1
+        seen = set()
+        for i, edge, slot in self._edge_positions(lines):
+            if len(lines[i].strip()) > self.max_line_length:
+                continue
+            if _PAGE_NUMBER_RE.match(lines[i].strip()):
+                offset = int(_DIGITS_RE.search(lines[i]).group()) - page_number
+                self.page_number_offsets.setdefault(page_number, set()).add(offset)
+            exact = self._exact_key(lines[i])
+            pattern = _DIGITS_RE.sub('#', exact)
+            # Contar cada texto una sola vez por pagina y posicion
+            if (edge, slot, exact) not in seen:
+                self.exact_counts.setdefault((edge, slot, exact), _EdgeLineCount()).add(page_number)
+                seen.add((edge, slot, exact))
+            if pattern != exact and (edge, slot, pattern) not in seen:
+                self.pattern_counts[edge, slot, pattern] += 1
+                seen.add((edge, slot, pattern))
+    
+    def _is_running_line(self, count: _EdgeLineCount) -> bool:
+        """Indica si las apariciones de un texto en una posicion son las de una cabecera/pie."""
+        if count.pages >= max(self.min_pages, self.min_ratio * self.pages):
+            return True
+        for parity in (0, 1):
+            pages = count.parity_pages[parity]
+            if pages < self.min_pages:
+                continue
+            if pages >= self.min_ratio * self.parity_pages[parity]:
+                return True
+            # Paginas de esa paridad entre la primera y la ultima aparicion
+            span = (count.parity_last[parity] - count.parity_first[parity]) // 2 + 1
+            if pages >= self.run_ratio * span:
+                return True
+        return False
+    
+    def _is_page_number(self, line: str, page_number: int) -> bool:
+        """Indica si un numero suelto sigue la numeracion de las paginas vecinas (mismo desfase)."""
+        offset = int(_DIGITS_RE.search(line).group()) - page_number
+        return any(offset in self.page_number_offsets.get(page_number + distance, ())
+                   for distance in range(-self.page_number_window, self.page_number_window + 1) if distance)
+    
+    def is_boilerplate(self, line: str, edge: str, slot: int = 0, page_number: int = 0) -> bool:
+        """
+        Indica si una linea en la posicion indicada (borde y distancia al borde) es cabecera/pie repetido.
+        
+        page_number (desde 1) es el de la pagina de la linea: un numero suelto
+        solo se elimina si sigue la numeracion de las paginas vecinas.
+        """
+        stripped = line.strip()
+        if not stripped or len(stripped) > self.max_line_length:
+            return False
+        if _PAGE_NUMBER_RE.match(stripped):
+            # Fuera de secuencia (un "7" que abre capitulo): nunca es cabecera
+            return self._is_page_number(stripped, page_number)
+        if CHAPTER_MARKER_RE.match(stripped) or KEYWORD_HEADING_RE.match(stripped):
+            return False
+        
+        exact = self._exact_key(stripped)
+        count = self.exact_counts.get((edge, slot, exact))
+        if count is not None and self._is_running_line(count):
+            return True
+        
+        pattern = _DIGITS_RE.sub('#', exact)
+        if pattern == exact:
+            return False
+        return self.pattern_counts[edge, slot, pattern] >= max(self.min_pages, self.min_ratio * self.pages)
+    
+    def strip_page(self, page_text: str, stats: BoilerplateStats, page_number: int = 0) -> str:
+        """Devuelve la pagina (numero desde 1) sin sus lineas de cabecera/pie y acumula lo eliminado."""
+        lines = page_text.split('\n')
+        remove = {i for i, edge, slot in self._edge_positions(lines)
+                  if self.is_boilerplate(lines[i], edge, slot, page_number)}
+        if not remove:
+            return page_text
+        
+        for i in remove:
+            stats.lines += 1
+            stats.chars += len(lines[i].strip())
+            stats.words += len(lines[i].split())
+        
+        return '\n'.join(line for i, line in enumerate(lines) if i not in remove).strip('\n')
+
+
+def strip_running_headers(page_texts: Sequence[str], index: Optional[RunningHeaderIndex] = None) -> Tuple[List[str], BoilerplateStats]:
+    """
+    Elimina cabeceras, pies y numeros de pagina repetidos en todo el libro.
+    
+    Primero indexa las lineas de borde de todas las paginas y despues
+    limpia cada pagina, antes de unir el texto.
+    
+    Returns:
+        Tupla (paginas sin cabeceras/pies, estadisticas de lo eliminado)
+    """
+    index = index or RunningHeaderIndex()
+    for page_number, page_text in enumerate(page_texts, 1):
+        if page_text:
+            index.add_page(page_text, page_number)
+    
+    stats = BoilerplateStats()
+    stripped_pages = [index.strip_page(page_text, stats, page_number) if page_text else page_text
+                      for page_number, page_text in enumerate(page_texts, 1)]
+    return stripped_pages, stats
+
+
+def print_boilerplate_stats(stats: BoilerplateStats) -> None:
+    """Muestra cuanto texto (y audio) se ahorro al quitar cabeceras/pies."""
+    print(f"   ✂️  Cabeceras/pies eliminados: {stats.lines} lineas, {stats.chars} caracteres "
+          f"(~{stats.tts_minutes:.1f} min de TTS ahorrados)")
+
+
+# --- Normalizador de una sola pasada (usado por clean_text) ---
+#
+# Reproduce exactamente la cadena de sustituciones original:
+#   1. ' +' -> ' '
+#   2. '\n{3,}' -> '\n\n'
+#   3. '(\w+)-\s*\n\s*(\w+)' -> '\1\2'  (palabras cortadas por salto de linea)
+#   4. ' +\n' -> '\n' y '\n +' -> '\n'
+#   5. eliminar caracteres de control
+# pero recorriendo el texto una sola vez. Solo se visitan los guiones de corte
+# de linea y los tramos de 2+ espacios/saltos; los espacios simples entre
+# palabras (la gran mayoria) se copian en bloque sin pasar por Python.
+# El primer caracter se comprueba con una sola clase ([-\n ]) para que el
+# motor de regex descarte rapido el resto de posiciones
+_NORMALIZE_RE = re.compile(r'[-\n ](?:(?<=\w-)(\s*\n\s*)(?=\w)|(?<=[ \n])[ \n]+)')
+_WORD_RUN_RE = re.compile(r'\w+')
+_WHITESPACE_RUN_RE = re.compile(r'[ \n]{2,}')
+
+# Caracteres de control a eliminar (se conservan \t, \n y \r)
+_CONTROL_CHARS = [*range(0x00, 0x09), 0x0b, 0x0c, *range(0x0e, 0x20), *range(0x7f, 0xa0)]
+_CONTROL_TABLE = dict.fromkeys(_CONTROL_CHARS)
+_CONTROL_CHARS_RE = re.compile(r'[\x00-\x08\x0b-\x0c\x0e-\x1f\x7f-\x9f]')
+
+
+def _collapse_whitespace_run(run: str) -> str:
+    """
+    Resultado de los pasos 1, 2 y 4 sobre un tramo maximo de espacios/saltos.
+    
+    Sin saltos de linea queda un espacio. Con saltos, todos los espacios del
+    tramo tocan algun salto y desaparecen; cada grupo de 3+ saltos seguidos
+    (separados por espacios en el original) queda en 2.
+    """
+    if '\n' not in run:
+        return ' '
+    newlines = 0
+    for group in run.split(' '):
+        newlines += 2 if len(group) >= 3 else len(group)
+    return '\n' * newlines
+
+
+def _collapse_whitespace_match(match) -> str:
+    return _collapse_whitespace_run(match.group())
+
+
+def _remove_control_chars(text: str) -> str:
+    """
+    Elimina los caracteres de control.
+    
+    str.translate tiene un camino rapido para texto ASCII, pero con texto no
+    ASCII (tildes, enes) es ~15 veces mas lento que la regex compilada, asi
+    que solo se usa en el primer caso.
+    """
+    if text.isascii():
+        return text.translate(_CONTROL_TABLE)
+    return _CONTROL_CHARS_RE.sub('', text)
+
+
+def _normalize_text(text: str, edits: Optional[list] = None) -> str:
+    """
+    Aplica los pasos 1-4 de clean_text en un unico recorrido.
+    
+    Si se pasa la lista edits, se anade una tupla (inicio, fin, longitud de
+    salida antes, longitud de salida despues) por cada tramo reemplazado, para
+    poder traducir posiciones del texto original al normalizado.
+    """
+    parts = []
+    position = 0
+    output_length = 0
+    # Fin de la palabra que quedo a la derecha de la ultima union. En la
+    # version con re.sub esa palabra ya se consumio, asi que un guion justo
+    # detras ("a-\nb-\nc" -> "ab-\nc") no se vuelve a unir
+    joined_word_end = -1
     
-    with pdfplumber.open(pdf_path) as pdf:
-        for page in pdf.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text_parts.append(page_text)
+    for match in _NORMALIZE_RE.finditer(text):
+        start = match.start()
+        hyphen_gap = match.group(1)
+        
+        if hyphen_gap is None:
+            # Tramo de espacios/saltos
+            replacement = _collapse_whitespace_run(match.group())
+            parts.append(text[position:start])
+            parts.append(replacement)
+        elif start != joined_word_end:
+            # Palabra cortada: eliminar guion y salto
+            replacement = ''
+            parts.append(text[position:start])
+            joined_word_end = _WORD_RUN_RE.match(text, match.end()).end()
+        else:
+            # Guion que re.sub no habria unido: solo normalizar el hueco
+            start += 1
+            replacement = _WHITESPACE_RUN_RE.sub(_collapse_whitespace_match, hyphen_gap)
+            parts.append(text[position:start])
+            parts.append(replacement)
+        
+        if edits is not None:
+            output_length += start - position
+            edits.append((start, match.end(), output_length, output_length + len(replacement)))
+            output_length += len(replacement)
+        
+        position = match.end()
     
-    return '\n'.join(text_parts)
+    parts.append(text[position:])
+    return ''.join(parts)
 
 
 def clean_text(text: str) -> str:
@@ -23,28 +897,723 @@ def clean_text(text: str) -> str:
     # NOTA: No usamos unidecode aqui para mantener las tildes en el audio
     # Solo normalizamos espacios y formato
     
-    # Eliminar multiples espacios
-    text = re.sub(r' +', ' ', text)
+    # Espacios multiples, saltos de linea repetidos, palabras cortadas por
+    # saltos de linea y espacios alrededor de saltos: una sola pasada
+    text = _normalize_text(text)
     
-    # Eliminar multiples saltos de linea (maximo 2 consecutivos)
-    text = re.sub(r'\n{3,}', '\n\n', text)
+    # Eliminar caracteres de control excepto saltos de linea y tabs
+    text = _remove_control_chars(text)
     
-    # Arreglar palabras cortadas por saltos de linea
-    text = re.sub(r'(\w+)-\s*\n\s*(\w+)', r'\1\2', text)
+    return text.strip()
+
+
+def clean_text_with_offsets(text: str, positions: List[int]) -> Tuple[str, List[int]]:
+    """
+    Igual que clean_text, pero traduce ademas posiciones del texto original.
     
-    # Limpiar espacios alrededor de saltos de linea
-    text = re.sub(r' +\n', '\n', text)
-    text = re.sub(r'\n +', '\n', text)
+    Una posicion que cae dentro de un tramo eliminado o colapsado pasa al
+    final de su reemplazo, asi el inicio de una pagina apunta a su primer
+    caracter en el texto limpio.
     
-    # Eliminar caracteres de control excepto saltos de linea y tabs
-    text = re.sub(r'[\x00-\x08\x0b-\x0c\x0e-\x1f\x7f-\x9f]', '', text)
+    Args:
+        text: Texto sin limpiar
+        positions: Posiciones (indices de caracter) en text
     
-    return text.strip()
+    Returns:
+        Tupla (texto limpio, posiciones equivalentes en el texto limpio)
+    """
+    edits = []
+    normalized = _normalize_text(text, edits)
+    edit_starts = [edit[0] for edit in edits]
+    
+    mapped = []
+    for position in positions:
+        i = bisect.bisect_right(edit_starts, position) - 1
+        if i < 0:
+            mapped.append(position)
+            continue
+        start, end, before, after = edits[i]
+        if position == start:
+            mapped.append(before)
+        elif position < end:
+            mapped.append(after)
+        else:
+            mapped.append(after + position - end)
+    
+    # Caracteres de control eliminados antes de cada posicion
+    control_positions = [match.start() for match in _CONTROL_CHARS_RE.finditer(normalized)]
+    if control_positions:
+        mapped = [position - bisect.bisect_left(control_positions, position) for position in mapped]
+    cleaned = _remove_control_chars(normalized)
+    
+    # strip() final
+    leading = len(cleaned) - len(cleaned.lstrip())
+    cleaned = cleaned.strip()
+    mapped = [min(max(position - leading, 0), len(cleaned)) for position in mapped]
+    
+    return cleaned, mapped
+
+
+STREAM_HEADER_LOOKAHEAD = 40  # Paginas que el modo stream lee por delante para detectar cabeceras
+
+
+def _iter_pages_with_lookahead(pages: Iterator[Tuple[int, str]], header_index: RunningHeaderIndex,
+                               lookahead: int) -> Iterator[Tuple[int, str]]:
+    """
+    Retiene `lookahead` paginas antes de emitirlas, registrando cada una en el indice al leerla.
+    
+    Cuando se emite la pagina k el indice ya contiene las paginas 1..k+lookahead:
+    sus cabeceras/pies se juzgan con las anteriores y con las siguientes, sin
+    leer el libro entero antes de la primera pagina.
+    """
+    pending = deque()
+    for page_number, raw_page in pages:
+        if raw_page:
+            header_index.add_page(raw_page, page_number)
+        pending.append((page_number, raw_page))
+        if len(pending) > lookahead:
+            yield pending.popleft()
+    while pending:
+        yield pending.popleft()
 
 
-def extract_and_clean_pdf(pdf_path: str) -> str:
-    """Extrae y limpia texto de un PDF en un solo paso."""
-    raw_text = extract_text_from_pdf(pdf_path)
-    cleaned_text = clean_text(raw_text)
-    return cleaned_text
+def iter_pdf_pages(pdf_path: str, backend: str = 'auto', strip_headers: bool = True,
+                   ocr_language: Optional[str] = DEFAULT_OCR_LANGUAGE,
+                   header_lookahead: int = STREAM_HEADER_LOOKAHEAD) -> Iterator[Tuple[int, str]]:
+    """
+    Extrae y limpia el PDF pagina a pagina (generador).
+    
+    Permite que las siguientes etapas empiecen a trabajar antes de que
+    termine la extraccion. Solo se mantiene en memoria la pagina actual:
+    los motores liberan su cache de layout despues de cada pagina.
+    
+    Las palabras cortadas con guion al final de una pagina se unen con el
+    inicio de la siguiente, igual que hace clean_text sobre el texto completo.
+    
+    Las cabeceras/pies se detectan con el mismo indice que extract_document,
+    pero construido a medida que se leen las paginas: cada pagina se juzga
+    con todas las anteriores y con las header_lookahead siguientes, que se
+    retienen sin limpiar. Cada pagina se extrae una sola vez y la primera
+    sale en cuanto se han leido header_lookahead + 1 paginas. Una linea que
+    solo se revela como cabecera mas adelante en el libro puede quedarse en
+    las primeras paginas; `benchmark_pdf_backends.py --check-stream` muestra
+    las diferencias con el modo normal.
+    
+    Las paginas escaneadas (solo imagen) se pasan por OCR en el momento,
+    una a una, si Tesseract esta instalado y ocr_language no es None.
+    
+    Args:
+        header_lookahead: Paginas leidas por delante para detectar cabeceras
+                          (solo con strip_headers)
+    
+    Yields:
+        Tuplas (numero de pagina empezando en 1, texto limpio de la pagina).
+        Las paginas sin texto se omiten.
+    """
+    pending_page = None
+    pending_text = ''
+    stats = BoilerplateStats()
+    pdf_backend = get_backend(backend)
+    use_ocr = bool(ocr_language) and is_ocr_available()
+    
+    def raw_pages() -> Iterator[Tuple[int, str]]:
+        for page_number, raw_page in enumerate(pdf_backend.iter_page_texts(pdf_path), 1):
+            if use_ocr and needs_ocr(raw_page) and pdf_backend.image_page_indices(pdf_path, [page_number - 1]):
+                raw_page = ocr_page(pdf_path, page_number - 1, pdf_backend.name, ocr_language)
+            yield page_number, raw_page
+    
+    header_index = None
+    pages = raw_pages()
+    if strip_headers:
+        header_index = RunningHeaderIndex()
+        pages = _iter_pages_with_lookahead(pages, header_index, header_lookahead)
+    
+    for page_number, raw_page in pages:
+        if header_index is not None and raw_page:
+            raw_page = header_index.strip_page(raw_page, stats, page_number)
+        page_text = clean_text(raw_page)
+        
+        if not page_text:
+            continue
+        
+        if pending_page is not None:
+            # Completar la palabra cortada de la pagina anterior
+            carried = _TRAILING_HYPHEN.search(pending_text) if pending_text.endswith('-') else None
+            if carried and page_text[0].isalnum():
+                pending_text = pending_text[:carried.start()].rstrip()
+                page_text = carried.group(1) + page_text
+            if pending_text:
+                yield pending_page, pending_text
+        
+        pending_page, pending_text = page_number, page_text
+    
+    if pending_page is not None and pending_text:
+        yield pending_page, pending_text
+    
+    if strip_headers:
+        print_boilerplate_stats(stats)
+
+
+def text_cache_key(pdf_path: str, cache: TextCache, backend: str = 'auto', strip_headers: bool = True,
+                   ocr_language: Optional[str] = DEFAULT_OCR_LANGUAGE) -> str:
+    """Clave de cache del texto limpio: hash del PDF + versiones de motor, extractor, limpieza y OCR."""
+    return cache.make_key(pdf_path, get_backend(backend).version(), EXTRACTOR_VERSION, CLEAN_TEXT_VERSION,
+                          f"headers-{int(strip_headers)}", ocr_engine_tag(ocr_language))
+
+
+# --- Modo de memoria acotada ---
+
+DEFAULT_LOW_MEMORY_WINDOW = 50  # Paginas por cada apertura del PDF
+
+
+def current_rss_mb() -> Optional[float]:
+    """Memoria residente actual del proceso en MB (None si no se puede medir)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import psutil  # Windows/macOS: opcional
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss / (1024 * 1024)
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Pico de memoria residente del proceso en MB (None si no se puede medir)."""
+    try:
+        import resource
+    except ImportError:
+        # Windows: no hay modulo resource, usar psutil si esta instalado
+        try:
+            import psutil
+        except ImportError:
+            return None
+        info = psutil.Process().memory_info()
+        return getattr(info, 'peak_wset', info.rss) / (1024 * 1024)
+    
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss esta en bytes en macOS y en KB en Linux
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+class PageSpool:
+    """
+    Texto de las paginas guardado en un archivo temporal en lugar de en memoria.
+    
+    Se comporta como una lista de solo lectura (len, indices, iteracion);
+    cada acceso lee la pagina del disco.
+    """
+    
+    def __init__(self):
+        self._file = tempfile.TemporaryFile()
+        self._spans = []
+    
+    def append(self, page_text: str) -> None:
+        data = page_text.encode('utf-8')
+        self._file.seek(0, os.SEEK_END)
+        self._spans.append((self._file.tell(), len(data)))
+        self._file.write(data)
+    
+    def __len__(self) -> int:
+        return len(self._spans)
+    
+    def __setitem__(self, index: int, page_text: str) -> None:
+        # El texto anterior queda en el archivo sin usar; solo cambia el indice
+        data = page_text.encode('utf-8')
+        self._file.seek(0, os.SEEK_END)
+        self._spans[index] = (self._file.tell(), len(data))
+        self._file.write(data)
+    
+    def __getitem__(self, index: int) -> str:
+        offset, length = self._spans[index]
+        self._file.seek(offset)
+        return self._file.read(length).decode('utf-8')
+    
+    def __iter__(self) -> Iterator[str]:
+        for index in range(len(self._spans)):
+            yield self[index]
+    
+    def close(self) -> None:
+        self._file.close()
+
+
+def iter_pages_low_memory(pdf_path: str, backend: str = 'auto', window: int = DEFAULT_LOW_MEMORY_WINDOW,
+                          max_rss_mb: Optional[float] = None, layout: bool = False) -> Iterator:
+    """
+    Recorre las paginas abriendo el PDF por ventanas de `window` paginas.
+    
+    Al cerrar el PDF al final de cada ventana se liberan los objetos de
+    pagina y las caches del parser, asi la memoria no crece con el numero
+    de paginas del libro.
+    
+    Con max_rss_mb, si la memoria del proceso supera el limite se cierra la
+    ventana en curso, se libera la memoria y la ventana se reduce a la mitad.
+    Si con ventanas de una pagina se sigue superando, se lanza MemoryError
+    (mejor fallar este libro que agotar la memoria de los demas).
+    
+    Yields:
+        El texto de cada pagina, o (texto, lineas) con layout
+    """
+    pdf_backend = get_backend(backend)
+    total_pages = pdf_backend.page_count(pdf_path)
+    read_pages = pdf_backend.iter_page_layouts if layout else pdf_backend.iter_page_texts
+    
+    page_index = 0
+    while page_index < total_pages:
+        window_end = min(total_pages, page_index + window)
+        over_limit = False
+        
+        pages = read_pages(pdf_path, page_index, window_end)
+        try:
+            for page in pages:
+                yield page
+                page_index += 1
+                if max_rss_mb is not None and (current_rss_mb() or 0.0) > max_rss_mb:
+                    over_limit = True
+                    break
+        finally:
+            # Cierra el PDF aunque la ventana no se haya terminado
+            pages.close()
+        
+        pdf_backend.release_memory()
+        gc.collect()
+        
+        if over_limit:
+            rss = current_rss_mb() or 0.0
+            if window == 1 and rss > max_rss_mb:
+                raise MemoryError(f"La extraccion supera el limite de memoria ({rss:.0f} MB > {max_rss_mb:.0f} MB) "
+                                  f"incluso leyendo el PDF pagina a pagina")
+            window = max(1, window // 2)
+
+
+def _extract_raw_pages_low_memory(pdf_path: str, backend_name: str, layout: bool = False,
+                                  max_rss_mb: Optional[float] = None) -> Tuple[PageSpool, Optional[List[List[LayoutLine]]]]:
+    """Extrae las paginas por ventanas guardando su texto en disco a medida que se leen."""
+    spool = PageSpool()
+    page_lines = [] if layout else None
+    
+    start_time = time.perf_counter()
+    for page in iter_pages_low_memory(pdf_path, backend_name, max_rss_mb=max_rss_mb, layout=layout):
+        if layout:
+            page_text, lines = page
+            page_lines.append(lines)
+        else:
+            page_text = page
+        spool.append(page_text)
+    
+    elapsed = time.perf_counter() - start_time
+    pages_per_second = len(spool) / elapsed if elapsed > 0 else 0.0
+    print(f"   ⏱️  {len(spool)} paginas en {elapsed:.1f}s "
+          f"({pages_per_second:.1f} pag/s, memoria acotada, motor {backend_name})")
+    
+    return spool, page_lines
 
+
+def print_peak_memory(max_rss_mb: Optional[float] = None) -> None:
+    """Muestra el pico de memoria del proceso (y el limite, si hay)."""
+    peak = peak_rss_mb()
+    if peak is None:
+        print("   🧠 Pico de memoria: no disponible (instala psutil para medirlo)")
+        return
+    limit = f" (limite {max_rss_mb:.0f} MB)" if max_rss_mb else ""
+    print(f"   🧠 Pico de memoria (RSS): {peak:.0f} MB{limit}")
+
+
+# --- OCR de paginas escaneadas ---
+
+def _ocr_image_pages(pdf_path: str, raw_pages, backend_name: str, language: Optional[str] = DEFAULT_OCR_LANGUAGE,
+                     workers: int = 0) -> List[int]:
+    """
+    Sustituye el texto de las paginas escaneadas por su OCR (en el mismo orden de paginas).
+    
+    Una pagina es candidata si casi no tiene texto y contiene imagenes; las
+    paginas en blanco no se envian al OCR. Muestra cuantas paginas vienen
+    del texto del PDF y cuantas del OCR.
+    
+    Args:
+        raw_pages: Lista (o PageSpool) con el texto de cada pagina; se modifica
+        language: Idioma de Tesseract (None = no hacer OCR, solo informar)
+        workers: Procesos de OCR (0 = uno por CPU)
+    
+    Returns:
+        Numeros de pagina (empezando en 1) cuyo texto viene del OCR
+    """
+    empty_pages = [index for index, page_text in enumerate(raw_pages) if needs_ocr(page_text)]
+    if not empty_pages:
+        return []
+    
+    image_pages = get_backend(backend_name).image_page_indices(pdf_path, empty_pages)
+    recognized = {}
+    
+    if image_pages and language and is_ocr_available():
+        recognized = ocr_pages(pdf_path, image_pages, backend_name, language=language, workers=workers)
+        for index, page_text in recognized.items():
+            raw_pages[index] = page_text
+    elif image_pages:
+        sample = ', '.join(str(index + 1) for index in image_pages[:10])
+        more = '...' if len(image_pages) > 10 else ''
+        reason = "OCR desactivado" if not language else "instala Tesseract y pytesseract para leerlas"
+        print(f"   ⚠️  {len(image_pages)} pagina(s) escaneadas sin texto ({reason}): {sample}{more}")
+    
+    ocr_page_numbers = [index + 1 for index, page_text in sorted(recognized.items()) if not needs_ocr(page_text)]
+    text_pages = len(raw_pages) - len(empty_pages)
+    print(f"   📄 Paginas: {text_pages} con texto, {len(ocr_page_numbers)} por OCR, "
+          f"{len(empty_pages) - len(ocr_page_numbers)} sin texto")
+    
+    return ocr_page_numbers
+
+
+# --- Extraccion incremental (manifiesto de paginas) ---
+
+# Version del formato del manifiesto (huellas + texto sin limpiar de cada pagina)
+PAGE_MANIFEST_VERSION = "2"  # huellas con los recursos de cada pagina
+
+
+def page_manifest_key(pdf_path: str, cache: TextCache, page_count: int, backend: str = 'auto') -> str:
+    """
+    Clave del manifiesto de paginas de un PDF.
+    
+    Depende del nombre del archivo, del numero de paginas y del motor, no
+    del contenido, para encontrar el manifiesto de la version anterior
+    cuando llega un PDF revisado. Dos libros distintos con el mismo nombre
+    solo comparten manifiesto si ademas tienen las mismas paginas; una
+    revision que anade o quita paginas se extrae completa. El texto guardado
+    es el del motor sin limpiar, asi que no depende de clean_text ni de la
+    eliminacion de cabeceras.
+    """
+    return cache.make_source_key(Path(pdf_path).name, f"{page_count}-paginas", get_backend(backend).version(),
+                                 EXTRACTOR_VERSION, f"manifest-{PAGE_MANIFEST_VERSION}")
+
+
+def load_page_manifest(cache: TextCache, key: str) -> Optional[Tuple[List[str], List[str]]]:
+    """Devuelve (huellas, texto sin limpiar de cada pagina) o None si no hay manifiesto."""
+    stored = cache.get(key)
+    if stored is None:
+        return None
+    try:
+        manifest = json.loads(stored)
+    except ValueError:
+        return None
+    fingerprints = manifest.get('fingerprints', [])
+    pages = manifest.get('pages', [])
+    if len(fingerprints) != len(pages):
+        return None
+    return fingerprints, pages
+
+
+def save_page_manifest(cache: TextCache, key: str, pdf_path: str, fingerprints: List[str], raw_pages: Sequence[str]) -> None:
+    """Guarda las huellas y el texto sin limpiar de cada pagina junto a la cache de texto."""
+    manifest = {'fingerprints': fingerprints, 'pages': list(raw_pages)}
+    cache.put(key, json.dumps(manifest, ensure_ascii=False), meta={
+        'source': Path(pdf_path).name,
+        'kind': 'page-manifest',
+        'pages': len(raw_pages),
+    })
+
+
+def _page_runs(indices: List[int]) -> List[Tuple[int, int]]:
+    """Agrupa indices de pagina ordenados en rangos contiguos [inicio, fin)."""
+    runs = []
+    for index in indices:
+        if runs and runs[-1][1] == index:
+            runs[-1] = (runs[-1][0], index + 1)
+        else:
+            runs.append((index, index + 1))
+    return runs
+
+
+def _extract_page_indices(pdf_path: str, indices: List[int], workers: int, backend_name: str) -> Dict[int, str]:
+    """Extrae solo las paginas indicadas (agrupadas en rangos contiguos)."""
+    runs = _page_runs(sorted(indices))
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    
+    if workers > 1 and len(runs) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(runs))) as executor:
+            results = list(executor.map(
+                _extract_page_range,
+                [pdf_path] * len(runs),
+                [start for start, _ in runs],
+                [end for _, end in runs],
+                [backend_name] * len(runs),
+            ))
+    else:
+        results = [_extract_page_range(pdf_path, start, end, backend_name) for start, end in runs]
+    
+    extracted = {}
+    for (start, _), texts in zip(runs, results):
+        for offset, page_text in enumerate(texts):
+            extracted[start + offset] = page_text
+    return extracted
+
+
+def _update_raw_pages(pdf_path: str, old_fingerprints: List[str], old_pages: List[str], fingerprints: List[str],
+                      workers: int, backend_name: str) -> List[str]:
+    """
+    Reutiliza las paginas con la misma huella y extrae solo las nuevas o modificadas.
+    
+    Las paginas se emparejan por posicion y huella (bloques iguales de
+    difflib, como en changed_text_ranges): una pagina solo hereda el texto
+    de la pagina antigua alineada con ella, nunca el de otra pagina que
+    comparta huella.
+    """
+    reused = {}
+    matcher = difflib.SequenceMatcher(None, old_fingerprints, fingerprints, autojunk=False)
+    for old_start, new_start, size in matcher.get_matching_blocks():
+        for offset in range(size):
+            reused[new_start + offset] = old_pages[old_start + offset]
+    missing = [i for i in range(len(fingerprints)) if i not in reused]
+    
+    start_time = time.perf_counter()
+    extracted = _extract_page_indices(pdf_path, missing, workers, backend_name) if missing else {}
+    elapsed = time.perf_counter() - start_time
+    print(f"   🔁 Extraccion incremental: {len(missing)}/{len(fingerprints)} pagina(s) nuevas o modificadas "
+          f"({elapsed:.1f}s, motor {backend_name})")
+    
+    return [extracted[i] if i in extracted else reused[i] for i in range(len(fingerprints))]
+
+
+def _merge_ranges(ranges: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Une rangos [inicio, fin) que se solapan o se tocan."""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def changed_text_ranges(old_fingerprints: List[str], old_pages: List[str], fingerprints: List[str], pages: List[str],
+                        page_offsets: List[int], text_length: int) -> List[Tuple[int, int]]:
+    """
+    Rangos [inicio, fin) del texto limpio nuevo que cambiaron respecto a la version anterior.
+    
+    Las paginas se alinean por huella (difflib), asi que insertar o borrar
+    paginas no marca como cambiadas las siguientes. Una pagina con la misma
+    huella tambien cuenta como cambiada si su texto final es distinto (por
+    ejemplo, porque una cabecera ahora se elimina). Las paginas borradas
+    dan un rango vacio en el punto donde estaban.
+    
+    Args:
+        old_fingerprints, old_pages: Huellas y texto (sin cabeceras) de la version anterior
+        fingerprints, pages: Huellas y texto (sin cabeceras) de la version nueva
+        page_offsets: Inicio de cada pagina nueva en el texto limpio
+        text_length: Longitud del texto limpio nuevo
+    """
+    def page_range(start_page: int, end_page: int) -> Tuple[int, int]:
+        start = page_offsets[start_page] if start_page < len(page_offsets) else text_length
+        end = page_offsets[end_page] if end_page < len(page_offsets) else text_length
+        return start, end
+    
+    ranges = []
+    matcher = difflib.SequenceMatcher(None, old_fingerprints, fingerprints, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            for old_index, new_index in zip(range(i1, i2), range(j1, j2)):
+                if old_pages[old_index] != pages[new_index]:
+                    ranges.append(page_range(new_index, new_index + 1))
+        else:
+            # replace / insert: las paginas nuevas; delete: rango vacio
+            ranges.append(page_range(j1, j2))
+    
+    return _merge_ranges(ranges)
+
+
+@dataclass
+class ExtractedDocument:
+    """Texto limpio de un PDF con la posicion de cada pagina y el esquema de titulos."""
+    text: str
+    page_offsets: List[int] = field(default_factory=list)  # Inicio de cada pagina en text
+    outline: List[OutlineEntry] = field(default_factory=list)    # Titulos detectados por tipografia
+    bookmarks: List[OutlineEntry] = field(default_factory=list)  # Marcadores (indice) del PDF
+    # Rangos [inicio, fin) de text que cambiaron respecto a la version anterior
+    # del mismo PDF ([] = nada, None = desconocido: todo el texto es nuevo)
+    changed_ranges: Optional[List[Tuple[int, int]]] = None
+    ocr_pages: List[int] = field(default_factory=list)  # Paginas (desde 1) cuyo texto viene del OCR
+
+
+def _join_pages(page_texts: Sequence[str]) -> Tuple[str, List[int]]:
+    """Une las paginas con saltos de linea y devuelve el inicio de cada una."""
+    offsets = []
+    position = 0
+    for page_text in page_texts:
+        offsets.append(position)
+        if page_text:
+            position += len(page_text) + 1
+    # Las paginas sin texto se descartan igual que en extract_text_from_pdf
+    return '\n'.join(text for text in page_texts if text), offsets
+
+
+def read_bookmarks(pdf_path: str, text: str, page_offsets: List[int], backend: str = 'auto') -> List[OutlineEntry]:
+    """
+    Lee los marcadores del PDF y los situa en el texto limpio.
+    
+    Cada marcador se busca por su titulo dentro de su pagina; si el titulo
+    no aparece tal cual, se usa el inicio de la pagina a la que apunta.
+    Leer el indice no analiza el contenido de las paginas, asi que es casi
+    gratis incluso cuando el texto viene de la cache.
+    """
+    try:
+        toc = get_backend(backend).get_toc(pdf_path)
+    except Exception as e:
+        print(f"   ⚠️  No se pudo leer el indice del PDF: {e}")
+        return []
+    
+    if not toc:
+        return []
+    
+    bookmarks = locate_outline(toc, text, page_offsets, page_start_fallback=True)
+    print(f"   🔖 Indice del PDF: {len(bookmarks)} marcador(es)")
+    return bookmarks
+
+
+def extract_document(pdf_path: str, workers: int = 1, cache: Optional[TextCache] = None, backend: str = 'auto',
+                     strip_headers: bool = True, layout: bool = False, low_memory: bool = False,
+                     max_rss_mb: Optional[float] = None, ocr_language: Optional[str] = DEFAULT_OCR_LANGUAGE,
+                     ocr_workers: int = 0) -> ExtractedDocument:
+    """
+    Extrae y limpia un PDF conservando la posicion de cada pagina en el texto.
+    
+    Con cache se guarda ademas un manifiesto con la huella y el texto sin
+    limpiar de cada pagina. Si llega una version revisada del mismo PDF
+    (mismo nombre y numero de paginas, otro contenido), solo se extraen las
+    paginas cuya huella cambio; el resto se reutiliza y el texto se vuelve a
+    limpiar completo. Si alguna huella se repite dentro del PDF se extrae
+    todo.
+    Con low_memory no hay manifiesto (ni extraccion incremental): calcular
+    las huellas y guardar el texto de todas las paginas de una vez saltaria
+    el limite de memoria.
+    
+    Args:
+        pdf_path: Ruta del PDF
+        workers: Procesos para extraer en paralelo (0 = uno por CPU)
+        cache: Cache de texto (None = sin cache)
+        backend: Motor de extraccion ('auto', 'pdfplumber' o 'pymupdf')
+        strip_headers: Quitar cabeceras, pies y numeros de pagina repetidos
+        layout: Leer tamano de letra, negrita y posicion de cada linea y
+                construir el esquema de titulos (outline) del libro
+        low_memory: Leer el PDF por ventanas de paginas (reabriendolo) y
+                    guardar el texto de cada pagina en disco a medida que se
+                    extrae. Ignora workers (un solo proceso por libro)
+        max_rss_mb: Limite de memoria del proceso en MB (implica low_memory)
+        ocr_language: Idioma de Tesseract para las paginas escaneadas (solo
+                      imagen). None = sin OCR: esas paginas quedan vacias
+        ocr_workers: Procesos de OCR (0 = uno por CPU)
+    
+    Returns:
+        ExtractedDocument con el texto limpio, el inicio de cada pagina y,
+        con layout, los titulos detectados con su posicion en el texto.
+        Los marcadores del PDF, si tiene, se leen siempre. changed_ranges
+        indica que partes del texto cambiaron en una extraccion incremental
+    """
+    if cache is not None:
+        key = text_cache_key(pdf_path, cache, backend, strip_headers, ocr_language)
+        cached_text = cache.get(key)
+        meta = cache.get_meta(key) if cached_text is not None else {}
+        # El esquema solo esta en cache si se extrajo con layout y la misma version
+        if cached_text is not None and (not layout or meta.get('outline_version') == OUTLINE_VERSION):
+            print(f"   ♻️  Texto recuperado de la cache ({len(cached_text)} caracteres)")
+            page_offsets = meta.get('page_offsets', [])
+            return ExtractedDocument(
+                text=cached_text,
+                page_offsets=page_offsets,
+                outline=[OutlineEntry(**entry) for entry in meta.get('outline', [])],
+                bookmarks=read_bookmarks(pdf_path, cached_text, page_offsets, backend),
+                changed_ranges=[],
+                ocr_pages=meta.get('ocr_pages', []),
+            )
+    
+    backend_name = get_backend(backend).name
+    low_memory = low_memory or max_rss_mb is not None
+    if low_memory:
+        workers = 1
+    
+    # El manifiesto abre y resume todas las paginas de una vez y guarda su
+    # texto en un solo JSON: fuera de las ventanas de memoria acotada, asi
+    # que con low_memory no se usa
+    use_manifest = cache is not None and not low_memory
+    manifest = None
+    if use_manifest:
+        fingerprints = get_backend(backend_name).page_fingerprints(pdf_path)
+        manifest_key = page_manifest_key(pdf_path, cache, len(fingerprints), backend_name)
+        # El modo layout necesita las metricas de todas las paginas: extraccion completa
+        if not layout:
+            manifest = load_page_manifest(cache, manifest_key)
+        # Huellas repetidas (paginas que el hash no distingue): no se puede
+        # saber que texto corresponde a cada una, extraccion completa
+        if manifest is not None and (len(set(fingerprints)) < len(fingerprints)
+                                     or len(set(manifest[0])) < len(manifest[0])):
+            print("   ⚠️  Paginas con la misma huella: extraccion completa en vez de incremental")
+            manifest = None
+    
+    page_lines = None
+    if manifest is not None:
+        old_fingerprints, old_raw_pages = manifest
+        raw_pages = _update_raw_pages(pdf_path, old_fingerprints, old_raw_pages, fingerprints, workers, backend_name)
+    elif low_memory:
+        raw_pages, page_lines = _extract_raw_pages_low_memory(pdf_path, backend_name, layout=layout, max_rss_mb=max_rss_mb)
+    else:
+        raw_pages, page_lines = _extract_raw_pages(pdf_path, workers, backend_name, layout=layout)
+    
+    # Antes del manifiesto: asi el texto del OCR tampoco se repite en la proxima version
+    ocr_page_numbers = _ocr_image_pages(pdf_path, raw_pages, backend_name, ocr_language, ocr_workers)
+    
+    if use_manifest:
+        save_page_manifest(cache, manifest_key, pdf_path, fingerprints, raw_pages)
+    
+    page_texts = _strip_pages(raw_pages, strip_headers)
+    raw_text, raw_offsets = _join_pages(page_texts)
+    cleaned_text, page_offsets = clean_text_with_offsets(raw_text, raw_offsets)
+    del raw_text
+    if isinstance(raw_pages, PageSpool):
+        raw_pages.close()
+    
+    changed_ranges = None
+    if manifest is not None:
+        old_page_texts = old_raw_pages
+        if strip_headers:
+            old_page_texts, _ = strip_running_headers(old_raw_pages)
+        changed_ranges = changed_text_ranges(old_fingerprints, old_page_texts, fingerprints, page_texts,
+                                             page_offsets, len(cleaned_text))
+        changed_chars = sum(end - start for start, end in changed_ranges)
+        print(f"   ✏️  {len(changed_ranges)} rango(s) de texto modificados ({changed_chars} caracteres)")
+    
+    outline = []
+    if layout:
+        outline = locate_outline(classify_headings(page_lines), cleaned_text, page_offsets)
+        levels = ', '.join(f"nivel {level}: {count}" for level, count in sorted(outline_levels(outline).items()))
+        print(f"   🔠 {len(outline)} titulo(s) detectado(s) por tipografia ({levels or 'ninguno'})")
+    
+    if cache is not None:
+        meta = {
+            'source': Path(pdf_path).name,
+            'backend': backend_name,
+            'chars': len(cleaned_text),
+            'page_offsets': page_offsets,
+            'ocr_pages': ocr_page_numbers,
+        }
+        if layout:
+            meta['outline_version'] = OUTLINE_VERSION
+            meta['outline'] = [asdict(entry) for entry in outline]
+        cache.put(key, cleaned_text, meta=meta)
+    
+    if low_memory:
+        print_peak_memory(max_rss_mb)
+    
+    return ExtractedDocument(text=cleaned_text, page_offsets=page_offsets, outline=outline,
+                             bookmarks=read_bookmarks(pdf_path, cleaned_text, page_offsets, backend_name),
+                             changed_ranges=changed_ranges, ocr_pages=ocr_page_numbers)
+
+
+def extract_and_clean_pdf(pdf_path: str, workers: int = 1, cache: Optional[TextCache] = None, backend: str = 'auto',
+                          strip_headers: bool = True) -> str:
+    """
+    Extrae y limpia texto de un PDF en un solo paso.
+    
+    Si se pasa una cache y el mismo PDF ya se proceso con la misma version
+    del extractor y de clean_text, se devuelve el texto guardado sin abrir el PDF.
+    """
+    return extract_document(pdf_path, workers=workers, cache=cache, backend=backend, strip_headers=strip_headers).text
@@ -0,0 +1,111 @@
+"""OCR (Tesseract) de las paginas de un PDF que solo contienen imagenes."""
+import functools
+import importlib.util
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+
+DEFAULT_OCR_LANGUAGE = 'spa'
+OCR_DPI = 300               # Resolucion de renderizado (Tesseract rinde mejor a ~300 ppp)
+OCR_MIN_TEXT_CHARS = 10     # Una pagina con menos caracteres visibles se considera sin texto
+
+
+def needs_ocr(page_text: str) -> bool:
+    """Indica si el texto extraido de una pagina es tan escaso que la pagina es una imagen."""
+    return sum(1 for c in page_text if c.isalnum()) < OCR_MIN_TEXT_CHARS
+
+
+@functools.lru_cache(maxsize=None)
+def tesseract_version() -> Optional[str]:
+    """Version de Tesseract instalada, o None si falta pytesseract, Pillow o el ejecutable."""
+    if importlib.util.find_spec('pytesseract') is None or importlib.util.find_spec('PIL') is None:
+        return None
+    import pytesseract  # pip install pytesseract (requiere Tesseract instalado)
+    try:
+        return str(pytesseract.get_tesseract_version())
+    except Exception:
+        return None
+
+
+def is_ocr_available() -> bool:
+    """Indica si se puede hacer OCR en esta maquina."""
+    return tesseract_version() is not None
+
+
+def ocr_engine_tag(language: Optional[str]) -> str:
+    """Identificador del OCR para la clave de cache (cambia al instalar Tesseract o cambiar de idioma)."""
+    if not language or not is_ocr_available():
+        return "ocr-none"
+    return f"tesseract-{tesseract_version()}-{language}"
+
+
+def ocr_page(pdf_path: str, page_index: int, backend_name: str, language: str = DEFAULT_OCR_LANGUAGE,
+             dpi: int = OCR_DPI) -> str:
+    """
+    Renderiza una pagina y devuelve su texto reconocido por Tesseract.
+    
+    Se ejecuta dentro del proceso de OCR: asi solo viaja entre procesos el
+    numero de pagina y el texto, no la imagen.
+    """
+    import pytesseract
+    from pdf_extractor import get_backend
+    
+    image = get_backend(backend_name).render_page(pdf_path, page_index, dpi)
+    try:
+        return pytesseract.image_to_string(image, lang=language)
+    finally:
+        image.close()
+
+
+def _ocr_page_safe(pdf_path: str, page_index: int, backend_name: str, language: str, dpi: int) -> Optional[str]:
+    """ocr_page que devuelve None en lugar de fallar (una pagina rota no detiene el libro)."""
+    try:
+        return ocr_page(pdf_path, page_index, backend_name, language, dpi)
+    except Exception as e:
+        print(f"   ⚠️  OCR fallido en la pagina {page_index + 1}: {e}")
+        return None
+
+
+def ocr_pages(pdf_path: str, page_indices: List[int], backend_name: str, language: str = DEFAULT_OCR_LANGUAGE,
+              workers: int = 0, dpi: int = OCR_DPI) -> Dict[int, str]:
+    """
+    Hace OCR de varias paginas en un pool de procesos.
+    
+    Args:
+        pdf_path: Ruta del PDF
+        page_indices: Paginas a reconocer (indices empezando en 0)
+        backend_name: Motor de PDF usado para renderizar
+        language: Idioma de Tesseract ('spa', 'spa+eng', ...)
+        workers: Procesos de OCR (0 = uno por CPU)
+        dpi: Resolucion de renderizado
+    
+    Returns:
+        Diccionario indice de pagina -> texto reconocido (las paginas cuyo
+        OCR falla no aparecen)
+    """
+    if not page_indices:
+        return {}
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(page_indices))
+    
+    start_time = time.perf_counter()
+    args = ([pdf_path] * len(page_indices), page_indices, [backend_name] * len(page_indices),
+            [language] * len(page_indices), [dpi] * len(page_indices))
+    
+    if workers == 1:
+        results = list(map(_ocr_page_safe, *args))
+    else:
+        # map() devuelve los textos en el orden de las paginas
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_ocr_page_safe, *args))
+    
+    elapsed = time.perf_counter() - start_time
+    recognized = {index: text for index, text in zip(page_indices, results) if text is not None}
+    pages_per_second = len(page_indices) / elapsed if elapsed > 0 else 0.0
+    print(f"   🔍 OCR: {len(page_indices)} pagina(s) en {elapsed:.1f}s "
+          f"({pages_per_second:.2f} pag/s, {workers} proceso(s), tesseract {language})")
+    
+    return recognized
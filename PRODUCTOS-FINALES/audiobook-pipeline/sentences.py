@@ -0,0 +1,126 @@
+"""
+Segmentacion de frases en espanol: un recorrido del texto y un array de finales.
+
+La segmentacion por minutos, el resumen y la division en chunks para TTS
+usan este modulo, asi todos cortan las frases con las mismas reglas. Cada
+capitulo adaptado se indexa una sola vez: el resumen recibe ese indice y
+devuelve el de su propio texto (join_sentences, sin volver a recorrerlo),
+que es el que usan los chunks de TTS.
+"""
+import re
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+# Abreviaturas que terminan en punto sin terminar la frase ("Sr. Garcia", "pag. 12"),
+# agrupadas por longitud: cada grupo es un lookbehind de ancho fijo
+ABBREVIATIONS = (
+    'Sr', 'Dr', 'Ud', 'Vd', 'Av', 'St', 'pp', 'ej', 'vs', 'Nº',
+    'Sra', 'Dra', 'Uds', 'Vds', 'Sta', 'Sto', 'Lic', 'Ing', 'pág', 'núm', 'cap', 'vol', 'art', 'fig', 'Mr', 'Mrs',
+    'Srta', 'Prof', 'págs', 'caps', 'vols', 'Excmo', 'Excma', 'aprox',
+)
+_LOWER = 'a-záéíóúüñ'
+
+
+def _abbreviation_lookbehinds(abbreviations: Sequence[str]) -> str:
+    by_length = {}
+    for abbreviation in abbreviations:
+        by_length.setdefault(len(abbreviation), []).append(re.escape(abbreviation))
+    return ''.join(f"(?<!\\b(?:{'|'.join(words)})\\.)" for _, words in sorted(by_length.items()))
+
+
+# Final de frase: puntuacion final (y comillas o parentesis de cierre) seguida
+# de espacio y de algo que no sea una minuscula ni un inciso de dialogo
+# ("¿Vienes? —pregunto"), o un parrafo en blanco. No cortan las abreviaturas
+# de ABBREVIATIONS ni las iniciales ("J. R. Jimenez")
+SENTENCE_END_RE = re.compile(
+    r'(?:\.' + _abbreviation_lookbehinds(ABBREVIATIONS) + r'(?<!\b[A-ZÁÉÍÓÚÑ]\.)|[!?…])[.!?…]*["\'»”’)\]]*'
+    r'(?=\s*\Z|\s+(?![—–][^\S\n]*[' + _LOWER + r'])[^\s' + _LOWER + r'])'
+    r'|\n[^\S\n]*\n'
+)
+
+
+def sentence_ends(text: str) -> np.ndarray:
+    """
+    Indice de frases del texto: posicion donde termina cada una.
+    
+    Un solo recorrido con SENTENCE_END_RE. Los finales de parrafo tambien
+    cuentan como final de frase; cada frase va del final de la anterior (0
+    la primera) al suyo e incluye el espacio que la separa de la anterior.
+    
+    Returns:
+        Array creciente (int64) con el final de cada frase; el ultimo es
+        len(text) (vacio solo si el texto esta vacio)
+    """
+    ends = np.fromiter((match.end() for match in SENTENCE_END_RE.finditer(text)), dtype=np.int64)
+    if len(text) and (not len(ends) or ends[-1] < len(text)):
+        ends = np.append(ends, len(text))
+    return ends
+
+
+def sentence_spans(text: str, ends: Optional[np.ndarray] = None) -> List[Tuple[int, int]]:
+    """Tramos (inicio, fin) de las frases no vacias del texto, a partir de su indice (se calcula si falta)."""
+    if ends is None:
+        ends = sentence_ends(text)
+    spans = []
+    start = 0
+    for end in ends.tolist():
+        if text[start:end].strip():
+            spans.append((start, end))
+        start = end
+    return spans
+
+
+def join_sentences(text: str, spans: Sequence[Tuple[int, int]]) -> Tuple[str, np.ndarray]:
+    """
+    Une las frases indicadas (sin espacios en los extremos) con un espacio.
+    
+    Returns:
+        (texto unido, indice de frases de ese texto): los finales salen de
+        las longitudes de las frases, sin volver a recorrer el texto
+    """
+    sentences = [text[start:end].strip() for start, end in spans]
+    lengths = np.fromiter((len(sentence) + 1 for sentence in sentences), dtype=np.int64, count=len(sentences))
+    return ' '.join(sentences), np.cumsum(lengths) - 1
+
+
+def split_into_chunks(text: str, max_chars: int, ends: Optional[np.ndarray] = None) -> List[str]:
+    """
+    Divide el texto en trozos de como mucho max_chars que terminan en final de frase.
+    
+    Cada trozo acaba en el ultimo final de frase que cabe (searchsorted en el
+    indice). Una frase mas larga que max_chars se corta en el ultimo espacio
+    que cabe, o en max_chars si no hay ninguno.
+    
+    Args:
+        text: Texto a dividir
+        max_chars: Maximo de caracteres por trozo
+        ends: Indice de frases de text (se calcula si falta)
+    
+    Returns:
+        Lista de trozos sin espacios en los extremos (sin trozos vacios)
+    """
+    if ends is None:
+        ends = sentence_ends(text)
+    chunks = []
+    start = 0
+    
+    while len(text) - start > max_chars:
+        limit = start + max_chars
+        i = int(np.searchsorted(ends, limit, side='right')) - 1
+        if i >= 0 and ends[i] > start:
+            cut = int(ends[i])
+        else:
+            # Frase demasiado larga: cortar en el ultimo espacio que cabe
+            space = max(text.rfind(' ', start + 1, limit), text.rfind('\n', start + 1, limit))
+            cut = space if space > start else limit
+        chunk = text[start:cut].strip()
+        if chunk:
+            chunks.append(chunk)
+        start = cut
+    
+    chunk = text[start:].strip()
+    if chunk:
+        chunks.append(chunk)
+    return chunks
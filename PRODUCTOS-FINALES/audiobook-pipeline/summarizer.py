@@ -0,0 +1,181 @@
+"""
+Resumen extractivo LSA con matriz dispersa y SVD truncada aleatoria (numpy).
+
+Coste para un texto de W palabras, n frases y m terminos distintos:
+- Tokenizacion y matriz: O(W) (una regex por frase; la raiz de cada
+  palabra distinta se calcula una vez por proceso)
+- SVD: O(nnz * l * (2q + 2) + (n + m) * l^2), con nnz <= W entradas no
+  nulas, l = LSA_DIMENSIONS + OVERSAMPLING columnas y q = POWER_ITERATIONS
+- Seleccion: O(n log n)
+
+Es decir, lineal en el tamano del texto: la SVD densa de sumy es
+O(n * m * min(n, m)) y una matriz de n x m en memoria.
+"""
+import functools
+import re
+from typing import List, Optional, Tuple
+
+import numpy as np
+from sumy.nlp.stemmers import Stemmer
+from sumy.utils import get_stop_words
+
+from sentences import join_sentences, sentence_ends, sentence_spans
+
+
+LSA_DIMENSIONS = 10       # Temas latentes con los que se puntua cada frase
+OVERSAMPLING = 8          # Columnas extra de la proyeccion aleatoria (precision de la SVD)
+POWER_ITERATIONS = 2      # Iteraciones de potencia (separan mejor los valores singulares)
+TF_SMOOTHING = 0.4        # Frecuencia normalizada: 0.4 + 0.6 * tf / tf maxima de la frase (como sumy)
+RANDOM_SEED = 0           # Proyeccion fija: el mismo texto da siempre el mismo resumen
+MIN_SENTENCES = 3
+
+WORD_RE = re.compile(r'[^\W\d_]+')
+
+
+@functools.lru_cache(maxsize=None)
+def _stop_words(language: str) -> frozenset:
+    return frozenset(word.lower() for word in get_stop_words(language))
+
+
+@functools.lru_cache(maxsize=None)
+def _stemmer(language: str) -> Stemmer:
+    return Stemmer(language)
+
+
+@functools.lru_cache(maxsize=200_000)
+def _stem(word: str, language: str) -> str:
+    return _stemmer(language)(word)
+
+
+class _SparseMatrix:
+    """Matriz dispersa frases x terminos en formato COO, con los productos que necesita la SVD."""
+    
+    def __init__(self, rows: np.ndarray, cols: np.ndarray, values: np.ndarray, shape: Tuple[int, int]):
+        self.rows = rows
+        self.cols = cols
+        self.values = values
+        self.shape = shape
+    
+    def dot(self, dense: np.ndarray) -> np.ndarray:
+        """A @ dense (dense de m x l)."""
+        return np.column_stack([
+            np.bincount(self.rows, weights=self.values * dense[self.cols, j], minlength=self.shape[0])
+            for j in range(dense.shape[1])
+        ])
+    
+    def transpose_dot(self, dense: np.ndarray) -> np.ndarray:
+        """A.T @ dense (dense de n x l)."""
+        return np.column_stack([
+            np.bincount(self.cols, weights=self.values * dense[self.rows, j], minlength=self.shape[1])
+            for j in range(dense.shape[1])
+        ])
+
+
+def term_matrix(text: str, sentences: List[Tuple[int, int]], language: str = 'spanish') -> _SparseMatrix:
+    """
+    Matriz frases x terminos (raices sin palabras vacias) con frecuencia normalizada.
+    
+    Cada entrada no nula vale TF_SMOOTHING + (1 - TF_SMOOTHING) * tf / tf
+    maxima de su frase; las celdas sin el termino quedan a cero (sumy las
+    pone a TF_SMOOTHING, lo que hace la matriz densa).
+    """
+    stop_words = _stop_words(language)
+    vocabulary = {}
+    sentence_ids = []
+    term_ids = []
+    
+    for sentence_id, (start, end) in enumerate(sentences):
+        for word in WORD_RE.findall(text[start:end].lower()):
+            if word in stop_words:
+                continue
+            term_ids.append(vocabulary.setdefault(_stem(word, language), len(vocabulary)))
+            sentence_ids.append(sentence_id)
+    
+    shape = (len(sentences), len(vocabulary))
+    if not term_ids:
+        empty = np.zeros(0, dtype=np.int64)
+        return _SparseMatrix(empty, empty, np.zeros(0), shape)
+    
+    # Frecuencia de cada (frase, termino): claves unicas ordenadas por frase
+    keys, counts = np.unique(np.asarray(sentence_ids, dtype=np.int64) * len(vocabulary)
+                             + np.asarray(term_ids, dtype=np.int64), return_counts=True)
+    rows, cols = np.divmod(keys, len(vocabulary))
+    max_counts = np.zeros(len(sentences))
+    np.maximum.at(max_counts, rows, counts)
+    values = TF_SMOOTHING + (1.0 - TF_SMOOTHING) * counts / max_counts[rows]
+    return _SparseMatrix(rows, cols, values, shape)
+
+
+def lsa_sentence_ranks(matrix: _SparseMatrix, dimensions: int = LSA_DIMENSIONS) -> np.ndarray:
+    """
+    Puntuacion LSA de cada frase con una SVD truncada aleatoria (Halko et al.).
+    
+    La puntuacion de la frase j es sqrt(sum_i sigma_i^2 * u_ji^2) sobre las
+    primeras `dimensions` componentes, como el ranking de sumy.
+    """
+    n_sentences, n_terms = matrix.shape
+    columns = min(dimensions + OVERSAMPLING, n_sentences, n_terms)
+    if columns == 0:
+        return np.zeros(n_sentences)
+    
+    rng = np.random.default_rng(RANDOM_SEED)
+    basis, _ = np.linalg.qr(matrix.dot(rng.standard_normal((n_terms, columns))))
+    for _ in range(POWER_ITERATIONS):
+        basis, _ = np.linalg.qr(matrix.transpose_dot(basis))
+        basis, _ = np.linalg.qr(matrix.dot(basis))
+    
+    # B = Q^T A es pequena (l x m): su SVD densa es barata
+    small = matrix.transpose_dot(basis).T
+    small_u, sigma, _ = np.linalg.svd(small, full_matrices=False)
+    u = basis @ small_u
+    
+    k = min(dimensions, len(sigma))
+    return np.sqrt(((sigma[:k] ** 2) * (u[:, :k] ** 2)).sum(axis=1))
+
+
+def summarize(text: str, reduction_percent: float = 0.15, language: str = 'spanish') -> str:
+    """
+    Resumen extractivo: conserva las frases mejor puntuadas por LSA, en su orden.
+    
+    Args:
+        text: Texto a resumir
+        reduction_percent: Fraccion de frases a quitar (0.15 = 15%)
+        language: Idioma de las palabras vacias y del stemmer
+    
+    Returns:
+        Frases conservadas unidas por espacios, o el texto sin cambios si
+        tiene menos de MIN_SENTENCES frases o no hay nada que quitar
+    """
+    return summarize_indexed(text, reduction_percent, language)[0]
+
+
+def summarize_indexed(text: str, reduction_percent: float = 0.15, language: str = 'spanish',
+                      ends: Optional[np.ndarray] = None) -> Tuple[str, np.ndarray]:
+    """
+    summarize con el indice de frases: recibe el del texto y devuelve el del resumen.
+    
+    Args:
+        text: Texto a resumir
+        reduction_percent: Fraccion de frases a quitar (0.15 = 15%)
+        language: Idioma de las palabras vacias y del stemmer
+        ends: Indice de frases de text (sentences.sentence_ends; se calcula si falta)
+    
+    Returns:
+        (resumen, indice de frases del resumen). El indice sale de las
+        frases conservadas (sentences.join_sentences); si no hay nada que
+        quitar se devuelven el texto y su indice sin cambios
+    """
+    if ends is None:
+        ends = sentence_ends(text)
+    sentences = sentence_spans(text, ends)
+    if len(sentences) < MIN_SENTENCES:
+        return text, ends
+    
+    target = max(MIN_SENTENCES, int(len(sentences) * (1 - reduction_percent)))
+    if target >= len(sentences):
+        return text, ends
+    
+    ranks = lsa_sentence_ranks(term_matrix(text, sentences, language))
+    # Orden estable: a igual puntuacion gana la frase anterior
+    keep = np.sort(np.argsort(-ranks, kind='stable')[:target])
+    return join_sentences(text, [sentences[i] for i in keep])
@@ -0,0 +1,179 @@
+"""Cache en disco (direccionada por contenido) del texto extraido de los PDFs y de los capitulos adaptados."""
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+
+DEFAULT_CACHE_DIR = Path('cache') / 'texto'
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024  # 512 MB
+
+
+def file_sha256(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """Calcula el hash SHA-256 del contenido de un archivo leyendo por bloques."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class TextCache:
+    """
+    Cache de texto en disco con expulsion LRU por tamano.
+    
+    Cada entrada es un archivo `<clave>.txt` (UTF-8) con un `<clave>.json`
+    opcional de metadatos. La clave se obtiene del hash del contenido del PDF
+    mas las versiones del extractor y de la limpieza, asi que cualquier cambio
+    en el PDF o en el codigo invalida la entrada sin tener que borrarla.
+    
+    El orden LRU se basa en la fecha de modificacion: cada acierto la
+    actualiza y al superar max_bytes se borran primero las mas antiguas.
+    """
+    
+    def __init__(self, cache_dir: Path = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+    
+    def make_key(self, file_path: str, *versions: str) -> str:
+        """Clave de cache para un archivo y las versiones del codigo que lo procesa."""
+        digest = hashlib.sha256(file_sha256(file_path).encode('ascii'))
+        for version in versions:
+            digest.update(b'|' + str(version).encode('utf-8'))
+        return digest.hexdigest()
+    
+    def make_source_key(self, source_name: str, *versions: str) -> str:
+        """
+        Clave para un archivo por su nombre (no por su contenido).
+        
+        Sirve para encontrar datos de una version anterior del mismo archivo,
+        por ejemplo el manifiesto de paginas de un PDF revisado.
+        """
+        digest = hashlib.sha256(b'source|' + source_name.encode('utf-8'))
+        for version in versions:
+            digest.update(b'|' + str(version).encode('utf-8'))
+        return digest.hexdigest()
+    
+    def make_text_key(self, text: str, *versions: str) -> str:
+        """Clave de cache para un texto (por ejemplo un capitulo) y las versiones del codigo que lo procesa."""
+        digest = hashlib.sha256(b'text|' + hashlib.sha256(text.encode('utf-8', 'surrogatepass')).digest())
+        for version in versions:
+            digest.update(b'|' + str(version).encode('utf-8'))
+        return digest.hexdigest()
+    
+    def _text_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.txt"
+    
+    def _meta_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+    
+    def contains(self, key: str) -> bool:
+        """Indica si existe una entrada para la clave (sin marcarla como usada)."""
+        return self._text_path(key).exists()
+    
+    def get(self, key: str) -> Optional[str]:
+        """Devuelve el texto guardado o None si no esta en cache."""
+        text_path = self._text_path(key)
+        try:
+            text = text_path.read_text(encoding='utf-8')
+        except (FileNotFoundError, UnicodeDecodeError):
+            return None
+        
+        # Marcar como usada recientemente (orden LRU)
+        try:
+            os.utime(text_path)
+        except OSError:
+            pass
+        
+        return text
+    
+    def get_meta(self, key: str) -> dict:
+        """Devuelve los metadatos de una entrada (dict vacio si no hay)."""
+        try:
+            return json.loads(self._meta_path(key).read_text(encoding='utf-8'))
+        except (FileNotFoundError, ValueError):
+            return {}
+    
+    def put(self, key: str, text: str, meta: Optional[dict] = None) -> None:
+        """Guarda el texto (escritura atomica) y aplica la expulsion LRU."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        
+        if meta is not None:
+            self._write_atomic(self._meta_path(key), json.dumps(meta, ensure_ascii=False))
+        self._write_atomic(self._text_path(key), text)
+        
+        self.evict(keep=key)
+    
+    def _write_atomic(self, path: Path, content: str) -> None:
+        """Escribe en un archivo temporal y lo renombra para no dejar entradas a medias."""
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(content)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+    
+    def _entries(self) -> list:
+        """Lista (fecha de uso, tamano total, clave) de todas las entradas."""
+        entries = []
+        if not self.cache_dir.exists():
+            return entries
+        
+        for text_path in self.cache_dir.glob('*.txt'):
+            key = text_path.stem
+            try:
+                stat = text_path.stat()
+            except FileNotFoundError:
+                continue
+            size = stat.st_size
+            meta_path = self._meta_path(key)
+            if meta_path.exists():
+                size += meta_path.stat().st_size
+            entries.append((stat.st_mtime, size, key))
+        
+        return entries
+    
+    def size_bytes(self) -> int:
+        """Tamano total ocupado por la cache."""
+        return sum(size for _, size, _ in self._entries())
+    
+    def evict(self, keep: Optional[str] = None) -> int:
+        """Borra las entradas menos usadas hasta quedar por debajo de max_bytes."""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        
+        for _, size, key in entries:
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            self.remove(key)
+            total -= size
+            removed += 1
+        
+        return removed
+    
+    def remove(self, key: str) -> None:
+        """Elimina una entrada (texto y metadatos)."""
+        for path in (self._text_path(key), self._meta_path(key)):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+    
+    def clear(self) -> int:
+        """Vacia la cache y devuelve el numero de entradas borradas."""
+        entries = self._entries()
+        for _, _, key in entries:
+            self.remove(key)
+        if self.cache_dir.exists():
+            # Restos de escrituras interrumpidas
+            for temp_path in self.cache_dir.glob('*.tmp'):
+                temp_path.unlink()
+        return len(entries)
@@ -0,0 +1,216 @@
+"""Deteccion de titulos por rasgos del texto (sin tipografia ni indice), vectorizada con numpy."""
+import re
+from collections import Counter
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from layout_outline import MAX_HEADING_LENGTH, MAX_HEADING_PAGES
+
+
+HEADING_SCORE_THRESHOLD = 4.5   # Puntuacion minima de un titulo (subirla = menos titulos)
+MIN_HEADINGS = 3                # Con menos titulos se consideran falsos positivos
+
+# Peso de cada rasgo en la puntuacion de una linea
+KEYWORD_WEIGHT = 3.0            # "CAPITULO UNO", "Parte II", "Epilogo"
+NUMBER_ONLY_WEIGHT = 2.5        # La linea es solo un numero ("IV", "12.")
+NUMBERED_WEIGHT = 1.0           # Empieza por numeracion ("3. El regreso")
+ALL_CAPS_WEIGHT = 2.0           # Todo en mayusculas (al menos ALL_CAPS_MIN_LETTERS letras)
+BLANK_BEFORE_WEIGHT = 1.0       # Linea en blanco antes
+BLANK_AFTER_WEIGHT = 0.5        # Linea en blanco despues
+NEXT_PARAGRAPH_WEIGHT = 1.0     # La siguiente linea con texto es de un parrafo (larga)
+SHORT_WEIGHT = 1.0              # Como mucho SHORT_MAX_WORDS palabras
+END_PUNCTUATION_WEIGHT = -2.0   # Termina en . , ; (final de frase)
+LOWER_START_WEIGHT = -2.0       # Empieza en minuscula (continuacion de frase)
+
+ALL_CAPS_MIN_LETTERS = 4
+SHORT_MAX_WORDS = 10
+CAPS_TITLE_MAX_WORDS = 6        # Un titulo solo en mayusculas ("EL REGRESO") tiene como mucho 6 palabras
+PARAGRAPH_LINE_RATIO = 0.8      # Una linea de parrafo mide al menos el 80% de la linea tipica
+
+# Numero romano bien formado (I-MMMCMXCIX): "MIL" o "CIVIL" no lo son
+_ROMAN = r'(?=[IVXLCDM])M{0,3}(?:CM|CD|D?C{0,3})(?:XC|XL|L?X{0,3})(?:IX|IV|V?I{0,3})(?<=[IVXLCDM])'
+_NUMBER_WORDS = (
+    r'uno|dos|tres|cuatro|cinco|seis|siete|ocho|nueve|diez|once|doce|trece|catorce|quince|'
+    r'dieci[a-zñ]+|veinte|veinti[a-zñ]+|treinta|'
+    r'primer[oa]?|segund[oa]|tercer[oa]?|cuart[oa]|quint[oa]|sext[oa]|s[ée]ptim[oa]|octav[oa]|noven[oa]|d[ée]cim[oa]|'
+    + _ROMAN + r'|\d+'
+)
+# Palabra clave de capitulo con su numero (en cifras, romano o con letras), o seccion sin numero
+KEYWORD_HEADING_RE = re.compile(
+    r'^[^\S\n]*(?:(?:cap[íi]tulo|cap\.|parte|part|libro|secci[óo]n|lecci[óo]n|tema|canto|jornada)'
+    r'[^\S\n]+(?:' + _NUMBER_WORDS + r')\b'
+    r'|(?:pr[óo]logo|ep[íi]logo|introducci[óo]n|conclusi[óo]n|pre[áa]mbulo|ap[ée]ndice|pref[áa]cio)\b)',
+    re.IGNORECASE | re.MULTILINE
+)
+# Numeracion al inicio de la linea: cifras seguidas de . ) - : o de espacio ("3 El regreso"), o un
+# romano en mayusculas suelto: seguido de . ) - : o solo en la linea ("IV. El fin", "IV"; no "MI CASA")
+NUMBERED_LINE_RE = re.compile(
+    r'^[^\S\n]*(?:(?:' + _ROMAN + r'|\d{1,3})(?:[.)\-–—:]|[^\S\n]*(?=\n)|[^\S\n]*\Z)|\d{1,3}[^\S\n]+)',
+    re.MULTILINE
+)
+NUMBER_ONLY_RE = re.compile(r'^[^\S\n]*(?:' + _ROMAN + r'|\d{1,3})[.)]?[^\S\n]*$', re.MULTILINE)
+
+# Clases de caracteres (texto codificado en latin-1: un byte por caracter, como en str)
+_CODES = range(256)
+_IS_SPACE = np.array([chr(code).isspace() for code in _CODES])
+_IS_UPPER = np.array([chr(code).isupper() for code in _CODES])
+_IS_LOWER = np.array([chr(code).islower() for code in _CODES])
+_END_PUNCTUATION = np.zeros(256, dtype=bool)
+_END_PUNCTUATION[[ord(c) for c in '.,;']] = True
+
+
+def _lines_matching(pattern: re.Pattern, text: str, line_starts: np.ndarray) -> np.ndarray:
+    """Mascara de las lineas donde pattern coincide (una busqueda sobre todo el texto)."""
+    mask = np.zeros(len(line_starts), dtype=bool)
+    positions = np.fromiter((match.start() for match in pattern.finditer(text)), dtype=np.int64)
+    mask[np.searchsorted(line_starts, positions, side='right') - 1] = True
+    return mask
+
+
+def text_line_starts(text: str) -> np.ndarray:
+    """Posicion donde empieza cada linea (como line_start_offsets, pero en un array)."""
+    codes = np.frombuffer(text.encode('latin-1', 'replace'), dtype=np.uint8)
+    return np.concatenate(([0], np.flatnonzero(codes == 10) + 1))
+
+
+def score_lines(text: str, line_starts: Optional[Sequence[int]] = None) -> np.ndarray:
+    """Puntuacion de titulo de cada linea del texto (ver _score_and_anchor_lines)."""
+    return _score_and_anchor_lines(text, line_starts)[0]
+
+
+def _score_and_anchor_lines(text: str, line_starts: Optional[Sequence[int]] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Puntuacion de titulo de cada linea del texto y mascara de lineas ancladas.
+    
+    Todos los rasgos se calculan a la vez sobre el libro entero: el texto
+    se pasa a un array de bytes (latin-1, un byte por caracter) y las sumas
+    por linea salen de np.add.reduceat sobre el indice de lineas. Solo las
+    palabras clave y la numeracion usan regex, una busqueda cada una.
+    
+    Args:
+        text: Texto del libro
+        line_starts: Posicion donde empieza cada linea (se calcula si falta)
+    
+    Returns:
+        (array con la puntuacion de cada linea (suma ponderada de los rasgos),
+         mascara de las lineas que pueden abrir un titulo: con palabra clave o
+         numeracion, o en mayusculas aisladas por lineas en blanco)
+    """
+    # Los caracteres fuera de latin-1 (comillas tipograficas, rayas) pasan a '?': no cambian las posiciones
+    codes = np.frombuffer(text.encode('latin-1', 'replace') + b'\n', dtype=np.uint8)
+    if line_starts is None:
+        line_starts = np.concatenate(([0], np.flatnonzero(codes[:-1] == 10) + 1))
+    line_starts = np.asarray(line_starts, dtype=np.int64)
+    line_ends = np.append(line_starts[1:] - 1, len(text))
+    lengths = line_ends - line_starts
+    line_count = len(line_starts)
+    
+    is_space = _IS_SPACE[codes]
+    visible = np.add.reduceat(~is_space, line_starts, dtype=np.int64)
+    upper = np.add.reduceat(_IS_UPPER[codes], line_starts, dtype=np.int64)
+    letters = upper + np.add.reduceat(_IS_LOWER[codes], line_starts, dtype=np.int64)
+    word_starts = ~is_space & np.concatenate(([True], is_space[:-1]))
+    words = np.add.reduceat(word_starts, line_starts, dtype=np.int64)
+    del is_space, word_starts
+    
+    blank = visible == 0
+    first_codes = codes[line_starts]
+    last_codes = codes[np.maximum(line_ends - 1, line_starts)]
+    
+    # Longitud de la siguiente linea con texto (sin lineas en blanco)
+    indices = np.where(blank, line_count, np.arange(line_count))
+    next_visible = np.append(np.minimum.accumulate(indices[::-1])[::-1][1:], line_count)
+    next_lengths = np.append(lengths, 0)[next_visible]
+    typical_length = np.median(lengths[~blank]) if (~blank).any() else 0
+    
+    blank_before = np.concatenate(([True], blank[:-1]))
+    blank_after = np.append(blank[1:], True)
+    all_caps = (letters >= ALL_CAPS_MIN_LETTERS) & (upper == letters)
+    keyword = _lines_matching(KEYWORD_HEADING_RE, text, line_starts)
+    number_only = _lines_matching(NUMBER_ONLY_RE, text, line_starts)
+    numbered = _lines_matching(NUMBERED_LINE_RE, text, line_starts)
+    
+    score = (
+        KEYWORD_WEIGHT * keyword
+        + NUMBER_ONLY_WEIGHT * number_only
+        + NUMBERED_WEIGHT * numbered
+        + ALL_CAPS_WEIGHT * all_caps
+        + BLANK_BEFORE_WEIGHT * blank_before
+        + BLANK_AFTER_WEIGHT * blank_after
+        + NEXT_PARAGRAPH_WEIGHT * (next_lengths >= PARAGRAPH_LINE_RATIO * typical_length)
+        + SHORT_WEIGHT * (words <= SHORT_MAX_WORDS)
+        + END_PUNCTUATION_WEIGHT * _END_PUNCTUATION[last_codes]
+        + LOWER_START_WEIGHT * _IS_LOWER[first_codes]
+    )
+    # Las lineas vacias o demasiado largas nunca son titulos
+    score[blank | (lengths > MAX_HEADING_LENGTH)] = -np.inf
+    
+    # Titulo solo en mayusculas ("EL REGRESO"): aislado entre lineas en blanco,
+    # corto, empieza por letra (no una cita con comillas o raya), sin
+    # puntuacion final y seguido de un parrafo
+    caps_title = (
+        all_caps & blank_before & blank_after
+        & (words <= CAPS_TITLE_MAX_WORDS)
+        & _IS_UPPER[first_codes]
+        & ~_END_PUNCTUATION[last_codes]
+        & (next_lengths >= PARAGRAPH_LINE_RATIO * typical_length)
+    )
+    return score, keyword | number_only | numbered | caps_title
+
+
+def detect_heading_lines(text: str, line_starts: Optional[Sequence[int]] = None,
+                         threshold: float = HEADING_SCORE_THRESHOLD) -> List[Tuple[int, str]]:
+    """
+    Titulos del texto segun su puntuacion (score_lines).
+    
+    Un titulo tiene que empezar en una linea con palabra clave o numeracion
+    ("CAPITULO UNO", "IV", "3. El regreso") o en un titulo en mayusculas
+    con su contexto: entre lineas en blanco, de como mucho
+    CAPS_TITLE_MAX_WORDS palabras, sin comillas, raya ni puntuacion final y
+    seguido de un parrafo ("EL REGRESO"). Otras lineas que solo puntuan por
+    la forma, como un epigrafe entre comillas con su autor, no abren
+    capitulo, pero si completan el titulo anterior: los titulos en varias
+    lineas seguidas ("CAPITULO UNO" / "EL COMIENZO"), aunque haya lineas en
+    blanco entre ellas, se unen en el primero. Los textos repetidos en mas de MAX_HEADING_PAGES lineas
+    (cabeceras que no se eliminaron) se descartan.
+    
+    Args:
+        text: Texto del libro
+        line_starts: Posicion donde empieza cada linea (se calcula si falta)
+        threshold: Puntuacion minima de un titulo
+    
+    Returns:
+        Lista de (numero de linea, titulo), como detect_chapter_patterns;
+        vacia si hay menos de MIN_HEADINGS titulos
+    """
+    if line_starts is None:
+        line_starts = text_line_starts(text)
+    scores, anchored = _score_and_anchor_lines(text, line_starts)
+    total_lines = len(line_starts)
+    
+    candidates = []
+    for i in np.flatnonzero(scores >= threshold):
+        line_end = line_starts[i + 1] - 1 if i + 1 < total_lines else len(text)
+        candidates.append((int(i), int(line_end), text[line_starts[i]:line_end].strip(), bool(anchored[i])))
+    
+    repeated = Counter(title.lower() for _, _, title, _ in candidates)
+    headings = []
+    previous_end = None
+    for i, line_end, title, is_anchored in candidates:
+        if repeated[title.lower()] > MAX_HEADING_PAGES or not any(c.isalnum() for c in title):
+            continue
+        if previous_end is not None and not text[previous_end:line_starts[i]].strip():
+            # Titulo en varias lineas (solo separadas por lineas en blanco): se unen en la primera
+            headings[-1] = (headings[-1][0], f"{headings[-1][1]} {title}")
+        elif is_anchored:
+            headings.append((i, title))
+        else:
+            # Solo forma de titulo, sin palabra clave, numero ni contexto de titulo: no abre capitulo
+            previous_end = None
+            continue
+        previous_end = line_end
+    
+    if len(headings) < MIN_HEADINGS:
+        return []
+    return headings